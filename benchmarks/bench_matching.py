@@ -0,0 +1,72 @@
+"""Time a full job-to-caregiver match on synthetic data.
+
+Usage::
+
+    python -m benchmarks.bench_matching --jobs 50000 --caregivers 100000 --top-k 10
+
+Feeds random rows straight into ``part3_app.matching.CaregiverMatcher`` (no
+database) with the type and city mix of ``part3_app.datagen`` and reports how
+long scoring every job takes.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from decimal import Decimal
+from typing import List
+
+from part3_app.datagen import CAREGIVING_TYPES, CITIES
+from part3_app.matching import CaregiverMatcher, _numpy
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=50_000)
+    parser.add_argument("--caregivers", type=int, default=100_000)
+    parser.add_argument("--applications-per-job", type=int, default=3)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    types = list(CAREGIVING_TYPES)
+    caregivers = []
+    for caregiver_id in range(1, args.caregivers + 1):
+        caregiving_type = rng.choice(types)
+        low, high = CAREGIVING_TYPES[caregiving_type]
+        rate = Decimal(f"{rng.uniform(low, high):.2f}")
+        caregivers.append((caregiver_id, caregiving_type, rng.choice(CITIES), rate))
+    jobs = [(job_id, rng.choice(types), rng.choice(CITIES), job_id) for job_id in range(1, args.jobs + 1)]
+    applications = [
+        (job_id, rng.randint(1, args.caregivers))
+        for job_id in range(1, args.jobs + 1)
+        for _ in range(args.applications_per_job)
+    ]
+
+    matcher = CaregiverMatcher()
+    matcher.top_k = args.top_k
+    matcher.np = np = _numpy()
+    started = time.perf_counter()
+    matcher._store_caregivers(*matcher._caregiver_arrays(caregivers))
+    matcher._store_jobs(*matcher._job_arrays(jobs))
+    matcher._store_applications(*matcher._application_arrays(set(applications)))
+    loaded = time.perf_counter()
+    matcher._rescore(np.arange(len(matcher.job_ids)))
+    scored = time.perf_counter()
+
+    print(json.dumps({
+        "jobs": args.jobs,
+        "caregivers": args.caregivers,
+        "top_k": args.top_k,
+        "load_seconds": round(loaded - started, 3),
+        "score_seconds": round(scored - loaded, 3),
+        "jobs_per_second": round(args.jobs / (scored - loaded)),
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
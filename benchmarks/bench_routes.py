@@ -0,0 +1,260 @@
+"""Benchmark every generated route through the Flask test client.
+
+Usage::
+
+    python -m benchmarks.bench_routes --scale 100 --scale 1000 \\
+        --database-url sqlite:////tmp/bench.db \\
+        --database-url postgresql://localhost/caregiver_bench \\
+        --output bench.json
+
+For each database and scale the schema is recreated and filled by
+``part3_app.datagen`` with ``scale`` users, then
+dashboard/list/create/edit/delete are driven for every resource. Latency
+percentiles, throughput and average query counts (from the Server-Timing
+header) come from a timed pass; peak Python memory comes from a separate,
+smaller pass under tracemalloc so it does not skew the timings.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault("SQL_INSTRUMENTATION", "1")
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+import sqlalchemy  # noqa: E402
+
+from part3_app import create_app  # noqa: E402
+from part3_app import fulltext  # noqa: E402
+from part3_app.datagen import generate  # noqa: E402
+from part3_app.instrumentation import recent_requests  # noqa: E402
+from part3_app.models import db  # noqa: E402
+from part3_app.resources import RESOURCES  # noqa: E402
+
+ORDER = ["users", "caregivers", "members", "addresses", "jobs", "job_applications", "appointments"]
+FAR_FUTURE = date(2100, 1, 1)
+
+
+class RouteDriver:
+    """Builds valid form payloads and remembers the records it created."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self.created: Dict[str, List[Dict[str, Any]]] = {name: [] for name in ORDER}
+        self.sequence = 0
+
+    def form_for(self, resource: str, index: int) -> Dict[str, str]:
+        self.sequence += 1
+        n = self.sequence
+        created = self.created
+        if resource == "users":
+            return {"email": f"bench{n}@bench.test", "given_name": "Bench", "surname": f"User{n}", "city": "Astana", "password": "secret"}
+        if resource == "caregivers":
+            return {"caregiver_user_id": str(created["users"][2 * index]["user_id"]), "gender": "Male", "caregiving_type": "elderly", "hourly_rate": "12.50"}
+        if resource == "members":
+            return {"member_user_id": str(created["users"][2 * index + 1]["user_id"]), "house_rules": "Quiet hours.", "dependent_description": "Grandmother"}
+        if resource == "addresses":
+            return {"member_user_id": str(created["members"][index]["member_user_id"]), "house_number": "5", "street": "Abay", "town": "Astana"}
+        if resource == "jobs":
+            return {"member_user_id": str(created["members"][index]["member_user_id"]), "required_caregiving_type": "elderly", "other_requirements": "Patient", "date_posted": "2025-06-01"}
+        if resource == "job_applications":
+            return {"caregiver_user_id": str(created["caregivers"][index]["caregiver_user_id"]), "job_id": str(created["jobs"][index]["job_id"]), "date_applied": "2025-06-02"}
+        if resource == "appointments":
+            day = FAR_FUTURE + timedelta(days=n)
+            return {
+                "caregiver_user_id": str(created["caregivers"][index]["caregiver_user_id"]),
+                "member_user_id": str(created["members"][index]["member_user_id"]),
+                "appointment_date": day.isoformat(),
+                "appointment_time": "09:00",
+                "work_hours": "2",
+                "status": "pending",
+            }
+        raise KeyError(resource)
+
+    def remember(self, resource: str, form: Dict[str, str]) -> None:
+        cfg = RESOURCES[resource]
+        model = cfg["model"]
+        pk_columns = [getattr(model, pk) for pk in cfg["pk"]]
+        if all(pk in form for pk in cfg["pk"]):
+            pk = {name: int(form[name]) for name in cfg["pk"]}
+        else:
+            with self.app.app_context():
+                (value,) = db.session.execute(sqlalchemy.select(sqlalchemy.func.max(pk_columns[0]))).one()
+            pk = {cfg["pk"][0]: value}
+        self.created[resource].append(pk)
+
+
+def _pk_path(resource: str, pk: Dict[str, Any]) -> str:
+    return "/".join(str(pk[name]) for name in RESOURCES[resource]["pk"])
+
+
+def _query_count(response) -> int | None:
+    for header in response.headers.get_all("Server-Timing"):
+        if 'desc="' in header:
+            return int(header.split('desc="', 1)[1].split(" ", 1)[0])
+    return None
+
+
+def _summarise(resource: str, route: str, samples: List[float], queries: List[int], elapsed: float) -> Dict[str, Any]:
+    ordered = sorted(samples)
+    cuts = statistics.quantiles(ordered, n=100, method="inclusive") if len(ordered) > 1 else ordered * 99
+    return {
+        "resource": resource,
+        "route": route,
+        "requests": len(samples),
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+        "throughput_rps": round(len(samples) / elapsed, 1) if elapsed else None,
+        "queries_avg": round(statistics.mean(queries), 2) if queries else None,
+    }
+
+
+def _complete(response):
+    """Read and close the body; streamed list pages render (and query) only then."""
+    response.get_data()
+    response.close()
+    return response
+
+
+def _drive(call: Callable[[int], Any], count: int):
+    samples, queries = [], []
+    started = time.perf_counter()
+    for index in range(count):
+        before = time.perf_counter()
+        response = call(index)
+        streamed = response.is_streamed
+        _complete(response)
+        samples.append(time.perf_counter() - before)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{response.request.method} {response.request.path} -> {response.status_code}")
+        count_ = _query_count(response)
+        if count_ is None and streamed and (recent := recent_requests()):
+            # Streamed pages are summarised on close, without Server-Timing.
+            count_ = recent[0]["count"]
+        if count_ is not None:
+            queries.append(count_)
+    return samples, queries, time.perf_counter() - started
+
+
+def _peak_kb(call: Callable[[int], Any], count: int) -> float:
+    tracemalloc.start()
+    try:
+        for index in range(count):
+            _complete(call(index))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+def run(database_url: str, scale: int, requests: int, memory_samples: int) -> List[Dict[str, Any]]:
+    os.environ["DATABASE_URL"] = database_url
+    app = create_app()
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    results: List[Dict[str, Any]] = []
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        generate(users=scale, seed=scale)
+        fulltext.rebuild(db.engine, app.config["FTS_LANGUAGE"])
+        db.session.remove()
+
+    # Requests run outside an app context so each one gets a fresh session,
+    # as it would under a real server.
+    client = app.test_client()
+    driver = RouteDriver(app)
+
+    def measure(resource: str, route: str, call: Callable[[int], Any], count: int, memory: bool = True):
+        samples, queries, elapsed = _drive(call, count)
+        result = _summarise(resource, route, samples, queries, elapsed)
+        result["peak_kb"] = _peak_kb(call, min(memory_samples, count)) if memory else None
+        results.append(result)
+
+    measure("*", "dashboard", lambda i: client.get("/"), requests)
+    for resource in ORDER:
+        measure(resource, "list", lambda i, r=resource: client.get(f"/{r}"), requests)
+
+    # Each create/delete touches a distinct record, so memory is only sampled
+    # for the repeatable routes.
+    for resource in ORDER:
+        def create(i, r=resource):
+            form = driver.form_for(r, i)
+            response = client.post(f"/{r}/create", data=form)
+            driver.remember(r, form)
+            return response
+        count = requests * 2 if resource == "users" else requests
+        measure(resource, "create", create, count, memory=False)
+
+    for resource in ORDER:
+        def edit(i, r=resource):
+            path = f"/{r}/edit/{_pk_path(r, driver.created[r][i])}"
+            client.get(path)
+            return client.post(path, data=driver.form_for(r, i))
+        measure(resource, "edit", edit, requests)
+
+    for resource in reversed(ORDER):
+        def delete(i, r=resource):
+            pk = driver.created[r].pop()
+            return client.post(f"/{r}/delete/{_pk_path(r, pk)}")
+        measure(resource, "delete", delete, min(requests, len(driver.created[resource])), memory=False)
+    return results
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", action="append", dest="database_urls")
+    parser.add_argument("--scale", action="append", type=int, dest="scales")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--memory-samples", type=int, default=5)
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout.")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+        },
+        "runs": [],
+    }
+    for database_url in args.database_urls or ["sqlite:////tmp/caregiver_bench.db"]:
+        for scale in args.scales or [100]:
+            entry = {"database": sqlalchemy.engine.make_url(database_url).render_as_string(hide_password=True), "scale": scale}
+            try:
+                entry["results"] = run(database_url, scale, args.requests, args.memory_samples)
+            except (sqlalchemy.exc.SQLAlchemyError, ImportError, RuntimeError) as exc:
+                entry["error"] = str(exc)
+            report["runs"].append(entry)
+            print(f"{entry['database']} scale={scale}: {'error: ' + entry['error'] if 'error' in entry else 'ok'}", file=sys.stderr)
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(payload)
+    else:
+        print(payload)
+    return 1 if any("error" in entry for entry in report["runs"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Measure cold import and app start-up time against a budget.
+
+Usage::
+
+    python -m benchmarks.bench_startup --runs 5 --import-budget-ms 600 --startup-budget-ms 150
+
+Each sample is a fresh interpreter, as a new gunicorn worker or CLI call
+would be. ``import`` times ``import part3_app``; ``startup`` times
+``create_app()`` in that process against a database whose schema is already
+current (the first, schema-creating start is reported separately). Exits
+non-zero when a median exceeds its budget.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+import part3_app
+imported = time.perf_counter()
+part3_app.create_app()
+print(json.dumps({"import_ms": (imported - started) * 1000, "startup_ms": (time.perf_counter() - imported) * 1000}))
+"""
+
+
+def _sample(env: Dict[str, str]) -> Dict[str, float]:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--database-url", help="Defaults to a temporary SQLite file.")
+    parser.add_argument("--import-budget-ms", type=float, default=600)
+    parser.add_argument("--startup-budget-ms", type=float, default=150)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ)
+        env["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(directory, 'startup.db')}"
+        first = _sample(env)
+        samples = [_sample(env) for _ in range(args.runs)]
+
+    report = {
+        "first_start": {name: round(value, 1) for name, value in first.items()},
+        "import_ms": round(statistics.median(s["import_ms"] for s in samples), 1),
+        "startup_ms": round(statistics.median(s["startup_ms"] for s in samples), 1),
+        "budget": {"import_ms": args.import_budget_ms, "startup_ms": args.startup_budget_ms},
+    }
+    report["within_budget"] = (
+        report["import_ms"] <= args.import_budget_ms and report["startup_ms"] <= args.startup_budget_ms
+    )
+    print(json.dumps(report, indent=2))
+    return 0 if report["within_budget"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
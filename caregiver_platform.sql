@@ -24,14 +24,14 @@ CREATE TABLE CAREGIVER (
     gender VARCHAR(20),
     caregiving_type VARCHAR(50),
     hourly_rate DECIMAL(6,2),
-    FOREIGN KEY (caregiver_user_id) REFERENCES "USER"(user_id)
+    FOREIGN KEY (caregiver_user_id) REFERENCES "USER"(user_id) ON DELETE CASCADE
 );
 
 CREATE TABLE MEMBER (
     member_user_id INT PRIMARY KEY,
     house_rules TEXT,
     dependent_description TEXT,
-    FOREIGN KEY (member_user_id) REFERENCES "USER"(user_id)
+    FOREIGN KEY (member_user_id) REFERENCES "USER"(user_id) ON DELETE CASCADE
 );
 
 CREATE TABLE ADDRESS (
@@ -39,7 +39,7 @@ CREATE TABLE ADDRESS (
     house_number VARCHAR(20),
     street VARCHAR(100),
     town VARCHAR(100),
-    FOREIGN KEY (member_user_id) REFERENCES MEMBER(member_user_id)
+    FOREIGN KEY (member_user_id) REFERENCES MEMBER(member_user_id) ON DELETE CASCADE
 );
 
 CREATE TABLE JOB (
@@ -48,7 +48,7 @@ CREATE TABLE JOB (
     required_caregiving_type VARCHAR(50),
     other_requirements TEXT,
     date_posted DATE,
-    FOREIGN KEY (member_user_id) REFERENCES MEMBER(member_user_id)
+    FOREIGN KEY (member_user_id) REFERENCES MEMBER(member_user_id) ON DELETE CASCADE
 );
 
 CREATE TABLE JOB_APPLICATION (
@@ -56,8 +56,8 @@ CREATE TABLE JOB_APPLICATION (
     job_id INT,
     date_applied DATE,
     PRIMARY KEY (caregiver_user_id, job_id),
-    FOREIGN KEY (caregiver_user_id) REFERENCES CAREGIVER(caregiver_user_id),
-    FOREIGN KEY (job_id) REFERENCES JOB(job_id)
+    FOREIGN KEY (caregiver_user_id) REFERENCES CAREGIVER(caregiver_user_id) ON DELETE CASCADE,
+    FOREIGN KEY (job_id) REFERENCES JOB(job_id) ON DELETE CASCADE
 );
 
 CREATE TABLE APPOINTMENT (
@@ -68,10 +68,46 @@ CREATE TABLE APPOINTMENT (
     appointment_time TIME,
     work_hours INT,
     status VARCHAR(20),
-    FOREIGN KEY (caregiver_user_id) REFERENCES CAREGIVER(caregiver_user_id),
-    FOREIGN KEY (member_user_id) REFERENCES MEMBER(member_user_id)
+    FOREIGN KEY (caregiver_user_id) REFERENCES CAREGIVER(caregiver_user_id) ON DELETE CASCADE,
+    FOREIGN KEY (member_user_id) REFERENCES MEMBER(member_user_id) ON DELETE CASCADE
 );
 
+CREATE INDEX ix_appointment_caregiver_date ON APPOINTMENT (caregiver_user_id, appointment_date);
+CREATE INDEX ix_appointment_date_caregiver ON APPOINTMENT (appointment_date, caregiver_user_id);
+CREATE INDEX ix_appointment_member ON APPOINTMENT (member_user_id);
+CREATE INDEX ix_appointment_status_date ON APPOINTMENT (status, appointment_date);
+CREATE INDEX ix_caregiver_type_rate ON CAREGIVER (caregiving_type, hourly_rate);
+CREATE INDEX ix_job_member ON JOB (member_user_id);
+CREATE INDEX ix_job_type_posted ON JOB (required_caregiving_type, date_posted);
+CREATE INDEX ix_job_application_job ON JOB_APPLICATION (job_id);
+
+-- Cold tier filled by `flask archive`: past appointments and applications to closed jobs.
+CREATE TABLE JOB_APPLICATION_ARCHIVE (
+    caregiver_user_id INT,
+    job_id INT,
+    date_applied DATE,
+    PRIMARY KEY (caregiver_user_id, job_id),
+    FOREIGN KEY (caregiver_user_id) REFERENCES CAREGIVER(caregiver_user_id) ON DELETE CASCADE,
+    FOREIGN KEY (job_id) REFERENCES JOB(job_id) ON DELETE CASCADE
+);
+
+CREATE TABLE APPOINTMENT_ARCHIVE (
+    appointment_id INT PRIMARY KEY,
+    caregiver_user_id INT NOT NULL,
+    member_user_id INT NOT NULL,
+    appointment_date DATE,
+    appointment_time TIME,
+    work_hours INT,
+    status VARCHAR(20),
+    FOREIGN KEY (caregiver_user_id) REFERENCES CAREGIVER(caregiver_user_id) ON DELETE CASCADE,
+    FOREIGN KEY (member_user_id) REFERENCES MEMBER(member_user_id) ON DELETE CASCADE
+);
+
+CREATE INDEX ix_job_application_archive_job ON JOB_APPLICATION_ARCHIVE (job_id);
+CREATE INDEX ix_appointment_archive_caregiver_date ON APPOINTMENT_ARCHIVE (caregiver_user_id, appointment_date);
+CREATE INDEX ix_appointment_archive_date_caregiver ON APPOINTMENT_ARCHIVE (appointment_date, caregiver_user_id);
+CREATE INDEX ix_appointment_archive_member ON APPOINTMENT_ARCHIVE (member_user_id);
+
 
 INSERT INTO "USER" (email, given_name, surname, city, phone_number, profile_description, password) VALUES
 ('raim@mail.com','Raim','Sultan','Almaty','+77014578987','Father that needs help','password1'),
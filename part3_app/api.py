@@ -0,0 +1,289 @@
+"""JSON API generated from ``RESOURCES``.
+
+    GET    /api/<resource>?fields=a,b&after=&before=&per_page=
+    GET    /api/<resource>/<key>?fields=a,b
+    POST   /api/<resource>            one object or a list of objects
+    PATCH  /api/<resource>/<key>
+    DELETE /api/<resource>/<key>
+    POST   /api/<resource>/batch      {"create": [...], "update": [...], "delete": [...]}
+
+``<key>`` is the primary key, comma separated for composite keys (the same
+format as the list cursors). Reads select plain column tuples and never build
+ORM objects, and return the export columns, so write-only fields such as
+``password`` (``"export": False``) are accepted but never sent back; writes go through the ORM so validators, booking checks and
+write events still apply, but a whole request is one flush and one commit.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import Blueprint, abort, current_app, jsonify, request
+from sqlalchemy import tuple_
+from sqlalchemy.exc import IntegrityError
+from werkzeug.exceptions import HTTPException
+
+from .models import db
+from .resources import (
+    RESOURCES,
+    _cast_value,
+    _export_columns,
+    _json_record,
+    _keyset_page,
+    _page_size,
+    _parse_cursor,
+)
+
+bp = Blueprint("api", __name__, url_prefix="/api")
+
+
+class BatchError(ValueError):
+    """Raised when any operation of a batch is invalid; nothing is written."""
+
+    def __init__(self, errors: List[Dict[str, Any]], status: int = 422) -> None:
+        super().__init__("; ".join(error["error"] for error in errors))
+        self.errors = errors
+        self.status = status
+
+
+def _config(resource: str) -> Dict[str, Any]:
+    if resource not in RESOURCES:
+        abort(404)
+    return RESOURCES[resource]
+
+
+def _columns(cfg) -> List[Tuple[str, str]]:
+    """Primary key columns plus the fields named in ``?fields=`` (default: all).
+
+    Only exportable fields can be named; asking for a secret one is a 400.
+    """
+    columns = _export_columns(cfg)
+    raw = request.args.get("fields")
+    if not raw:
+        return columns
+    wanted = {name.strip() for name in raw.split(",") if name.strip()}
+    if wanted - {name for name, _ in columns}:
+        abort(400)
+    return [(name, parser) for name, parser in columns if name in cfg["pk"] or name in wanted]
+
+
+def _key(cfg, raw: str) -> Dict[str, int]:
+    return dict(zip(cfg["pk"], _parse_cursor(raw, cfg["pk"])))
+
+
+def _parse(cfg, payload: Any, partial: bool) -> Dict[str, Any]:
+    """Cast a JSON object with the form-field parsers.
+
+    Creates may also carry explicit primary keys; updates only change the
+    fields present in the payload.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("expected a JSON object")
+    form_names = {f["name"] for f in cfg["form_fields"]}
+    fields = [(pk, "int", False) for pk in cfg["pk"] if pk not in form_names]
+    fields += [(f["name"], f.get("parser", "string"), f.get("required", False)) for f in cfg["form_fields"]]
+    values: Dict[str, Any] = {}
+    for name, parser, required in fields:
+        if name not in payload and (partial or not required):
+            continue
+        raw = payload.get(name)
+        try:
+            value = _cast_value(None if raw is None else str(raw), parser)
+        except ArithmeticError:
+            # decimal.InvalidOperation for non-numeric rates.
+            raise ValueError(f"{name}: invalid number") from None
+        except ValueError as exc:
+            raise ValueError(f"{name}: {exc}") from None
+        if value is None and required:
+            raise ValueError(f"{name}: value is required")
+        values[name] = value
+    return values
+
+
+def _pk_of(cfg, payload: Any) -> Tuple[int, ...]:
+    if not isinstance(payload, dict):
+        raise ValueError("expected a JSON object")
+    try:
+        return tuple(int(payload[pk]) for pk in cfg["pk"])
+    except KeyError as exc:
+        raise ValueError(f"{exc.args[0]}: primary key is required") from None
+    except (TypeError, ValueError):
+        raise ValueError("primary key must be an integer") from None
+
+
+def _load(cfg, keys: List[Tuple[int, ...]]) -> Dict[Tuple[int, ...], Any]:
+    """Fetch every targeted record with a single IN query."""
+    if not keys:
+        return {}
+    model = cfg["model"]
+    pk_columns = [getattr(model, pk) for pk in cfg["pk"]]
+    if len(pk_columns) > 1:
+        condition = tuple_(*pk_columns).in_(keys)
+    else:
+        condition = pk_columns[0].in_([key[0] for key in keys])
+    return {
+        tuple(getattr(record, pk) for pk in cfg["pk"]): record
+        for record in model.query.filter(condition)
+    }
+
+
+def apply_batch(
+    resource: str,
+    create: Optional[List[Any]] = None,
+    update: Optional[List[Any]] = None,
+    delete: Optional[List[Any]] = None,
+) -> Dict[str, Any]:
+    """Apply creates, updates and deletes to ``resource`` in one transaction.
+
+    Raises ``BatchError`` listing every bad operation (by op and index) and
+    rolls back; otherwise returns the created keys and affected counts.
+    """
+    cfg = RESOURCES[resource]
+    model = cfg["model"]
+    create, update, delete = create or [], update or [], delete or []
+    if len(create) + len(update) + len(delete) > current_app.config["API_MAX_BATCH"]:
+        raise BatchError([{"error": f"at most {current_app.config['API_MAX_BATCH']} operations per batch"}], 413)
+
+    errors: List[Dict[str, Any]] = []
+    created = []
+    for index, payload in enumerate(create):
+        try:
+            record = model()
+            for name, value in _parse(cfg, payload, partial=False).items():
+                setattr(record, name, value)
+        except ValueError as exc:
+            errors.append({"op": "create", "index": index, "error": str(exc)})
+            continue
+        created.append(record)
+
+    targets: Dict[str, List[Tuple[int, Tuple[int, ...], Any]]] = {"update": [], "delete": []}
+    for op, payloads in (("update", update), ("delete", delete)):
+        for index, payload in enumerate(payloads):
+            try:
+                targets[op].append((index, _pk_of(cfg, payload), payload))
+            except ValueError as exc:
+                errors.append({"op": op, "index": index, "error": str(exc)})
+    records = _load(cfg, [key for op in targets for _, key, _ in targets[op]])
+
+    for index, key, payload in targets["update"]:
+        record = records.get(key)
+        if record is None:
+            errors.append({"op": "update", "index": index, "error": "record not found"})
+            continue
+        try:
+            for name, value in _parse(cfg, payload, partial=True).items():
+                if name not in cfg["pk"]:
+                    setattr(record, name, value)
+        except ValueError as exc:
+            errors.append({"op": "update", "index": index, "error": str(exc)})
+    for index, key, _ in targets["delete"]:
+        if key not in records:
+            errors.append({"op": "delete", "index": index, "error": "record not found"})
+
+    if errors:
+        db.session.rollback()
+        raise BatchError(errors)
+
+    db.session.add_all(created)
+    for _, key, _ in targets["delete"]:
+        db.session.delete(records[key])
+    try:
+        db.session.flush()
+    except IntegrityError as exc:
+        db.session.rollback()
+        raise BatchError([{"error": str(exc.orig)}], 409) from None
+    except ValueError as exc:
+        db.session.rollback()
+        raise BatchError([{"error": str(exc)}]) from None
+    keys = [{pk: getattr(record, pk) for pk in cfg["pk"]} for record in created]
+    db.session.commit()
+    return {"created": keys, "updated": len(targets["update"]), "deleted": len(targets["delete"])}
+
+
+def _batch_response(resource: str, status: int = 200, **operations):
+    try:
+        result = apply_batch(resource, **operations)
+    except BatchError as exc:
+        return jsonify({"errors": exc.errors}), exc.status
+    return jsonify(result), status
+
+
+def _json_body() -> Any:
+    payload = request.get_json(silent=True)
+    if payload is None:
+        abort(400)
+    return payload
+
+
+@bp.errorhandler(HTTPException)
+def _http_error(exc: HTTPException):
+    return jsonify({"errors": [{"error": exc.description}]}), exc.code
+
+
+@bp.route("/<resource>", methods=["GET"])
+def list_records(resource):
+    cfg = _config(resource)
+    model = cfg["model"]
+    columns = _columns(cfg)
+    rows, prev_cursor, next_cursor = _keyset_page(
+        model,
+        cfg["pk"],
+        _parse_cursor(request.args.get("after"), cfg["pk"]),
+        _parse_cursor(request.args.get("before"), cfg["pk"]),
+        _page_size(),
+        query=db.session.query(*[getattr(model, name) for name, _ in columns]),
+    )
+    return jsonify(
+        {
+            "data": [_json_record(row, columns) for row in rows],
+            "prev": prev_cursor,
+            "next": next_cursor,
+        }
+    )
+
+
+@bp.route("/<resource>/<key>", methods=["GET"])
+def get_record(resource, key):
+    cfg = _config(resource)
+    model = cfg["model"]
+    columns = _columns(cfg)
+    row = (
+        db.session.query(*[getattr(model, name) for name, _ in columns])
+        .filter_by(**_key(cfg, key))
+        .first()
+    )
+    if row is None:
+        abort(404)
+    return jsonify(_json_record(row, columns))
+
+
+@bp.route("/<resource>", methods=["POST"])
+def create_records(resource):
+    _config(resource)
+    payload = _json_body()
+    return _batch_response(resource, 201, create=payload if isinstance(payload, list) else [payload])
+
+
+@bp.route("/<resource>/<key>", methods=["PATCH"])
+def update_record(resource, key):
+    cfg = _config(resource)
+    payload = _json_body()
+    if not isinstance(payload, dict):
+        abort(400)
+    return _batch_response(resource, update=[{**payload, **_key(cfg, key)}])
+
+
+@bp.route("/<resource>/<key>", methods=["DELETE"])
+def delete_record(resource, key):
+    cfg = _config(resource)
+    return _batch_response(resource, delete=[_key(cfg, key)])
+
+
+@bp.route("/<resource>/batch", methods=["POST"])
+def batch(resource):
+    _config(resource)
+    payload = _json_body()
+    if not isinstance(payload, dict) or set(payload) - {"create", "update", "delete"}:
+        abort(400)
+    if not all(isinstance(payload.get(op, []), list) for op in ("create", "update", "delete")):
+        abort(400)
+    return _batch_response(resource, **payload)
@@ -1,26 +1,114 @@
 import os
+import time
+from typing import Optional
 
 from flask import Flask
+from sqlalchemy import event
 
+from . import api, archive, availability, changes, fulltext, instrumentation, matching, reporting, schema, write_events
+from .bulk_import import bp as bulk_import_bp
 from .config import Config
+from .counters import counters
 from .models import db
-from .resources import register_resource_routes
+from .page_cache import page_cache
+from .replicas import replica_router
+from .resources import RESOURCES, register_resource_routes
+from .search import bp as search_bp, caregiver_index
+
+
+def _sqlite_pragma_listener(pragmas):
+    def apply(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return apply
+
+
+def _configure_engine(app: Flask) -> None:
+    """Apply per-backend connection settings and log them.
+
+    SQLite reports its PRAGMAs back; pool settings are logged as configured.
+    """
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name == "sqlite":
+            pragmas = Config.sqlite_pragmas()
+            event.listen(engine, "connect", _sqlite_pragma_listener(pragmas))
+            with engine.connect() as connection:
+                effective = {
+                    name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+                    for name in pragmas
+                }
+        else:
+            options = app.config["SQLALCHEMY_ENGINE_OPTIONS"]
+            effective = {"pool": type(engine.pool).__name__}
+            effective.update(
+                (name, options[name])
+                for name in ("pool_size", "max_overflow", "pool_timeout", "pool_recycle", "pool_pre_ping")
+                if name in options
+            )
+        app.config["DATABASE_ENGINE_SETTINGS"] = effective
+        app.logger.info(
+            "Database engine %s: %s",
+            engine.url.render_as_string(hide_password=True),
+            ", ".join(f"{name}={value}" for name, value in effective.items()),
+        )
 
 
 def create_app() -> Flask:
+    started = time.perf_counter()
     app = Flask(__name__, instance_relative_config=True, template_folder="templates", static_folder="static")
     app.config.from_object(Config)
     os.makedirs(app.instance_path, exist_ok=True)
     app.config["SQLALCHEMY_DATABASE_URI"] = Config.database_uri(app.instance_path)
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = Config.engine_options(app.config["SQLALCHEMY_DATABASE_URI"])
 
     db.init_app(app)
+    _configure_engine(app)
+    replica_router.init_app(app)
+    write_events.install(db.session)
+    changes.feed.install(db.session)
+    changes.feed.init_app(app)
+    availability.install(db.session)
+    reporting.reports.install(db.session)
+    reporting.reports.init_app(app)
+    instrumentation.init_app(app)
+    counters.init_app(app, {name: cfg["model"] for name, cfg in RESOURCES.items()})
+    page_cache.init_app(app)
     app.jinja_env.globals["getattr"] = getattr
+    caregiver_index.init_app(app)
+    matching.matcher.init_app(app)
     register_resource_routes(app)
+    app.register_blueprint(api.bp)
+    app.register_blueprint(search_bp)
+    app.register_blueprint(bulk_import_bp)
+    app.register_blueprint(availability.bp)
+    app.register_blueprint(fulltext.bp)
+    app.register_blueprint(schema.bp)
+    app.register_blueprint(reporting.bp)
+    app.register_blueprint(matching.bp)
+    app.register_blueprint(changes.bp)
+    app.register_blueprint(archive.bp)
 
     with app.app_context():
-        db.create_all()
+        if done := schema.ensure_schema(db.engine, app.config["FTS_LANGUAGE"]):
+            app.logger.info("Schema updated: %s", "; ".join(done))
 
+    app.config["STARTUP_SECONDS"] = time.perf_counter() - started
+    app.logger.info("App created in %.1f ms", app.config["STARTUP_SECONDS"] * 1000)
     return app
 
 
-app = create_app()
+_app: Optional[Flask] = None
+
+
+def __getattr__(name: str):
+    """Build ``app`` on first use (``gunicorn part3_app.app:app``), not on import."""
+    global _app
+    if name != "app":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if _app is None:
+        _app = create_app()
+    return _app
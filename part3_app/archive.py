@@ -0,0 +1,104 @@
+"""Hot/cold archival of appointment and application history.
+
+``flask archive`` moves two kinds of row into ``appointment_archive`` and
+``job_application_archive``: appointments dated before the cutoff, and
+applications to jobs posted before it (closed jobs). Rows move in batches of
+``ARCHIVE_BATCH_SIZE``, and each batch copies, deletes and logs its rows in
+one transaction, so a row is never in both tiers or in neither. The archive
+tables keep ON DELETE CASCADE foreign keys to caregivers, members and jobs.
+
+Hot-path lists, counts and booking lookups only walk the small hot indexes.
+Archived rows stay readable through the list and export views with
+``?archived=1``. Reports and booking conflict checks read both tiers through
+``with_archived``.
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+
+import click
+from flask import Blueprint, current_app
+from sqlalchemy import delete, insert, select, tuple_, union_all
+
+from . import changes
+from .models import Appointment, AppointmentArchive, Job, JobApplication, JobApplicationArchive, db
+from .resources import RESOURCES
+from .write_events import WriteEvent, publish
+
+bp = Blueprint("archive", __name__, cli_group=None)
+
+ARCHIVES = {Appointment: AppointmentArchive, JobApplication: JobApplicationArchive}
+
+
+def with_archived(model, *conditions: Callable):
+    """``model``'s hot and archived rows as one subquery with its columns.
+
+    Each ``condition(entity)`` is applied to both tiers separately, so each
+    side of the UNION ALL uses its own indexes.
+    """
+    selects = []
+    for entity in (model, ARCHIVES[model]):
+        statement = select(*[getattr(entity, column.key) for column in model.__table__.columns])
+        selects.append(statement.where(*[condition(entity) for condition in conditions]))
+    return union_all(*selects).subquery()
+
+
+def _move(model, condition, batch_size: int) -> int:
+    """Copy rows matching ``condition`` into the archive and delete them, batch by batch."""
+    archive = ARCHIVES[model]
+    resource = next(name for name, cfg in RESOURCES.items() if cfg["model"] is model)
+    pk_fields = RESOURCES[resource]["pk"]
+    pk_columns = [getattr(model, name) for name in pk_fields]
+    columns = [column.key for column in model.__table__.columns]
+    moved = 0
+    while True:
+        with db.engine.begin() as connection:
+            keys = connection.execute(
+                select(*pk_columns).where(condition).order_by(*pk_columns).limit(batch_size)
+            ).all()
+            if not keys:
+                break
+            if len(pk_columns) > 1:
+                batch = tuple_(*pk_columns).in_([tuple(key) for key in keys])
+            else:
+                batch = pk_columns[0].in_([key[0] for key in keys])
+            connection.execute(
+                insert(archive.__table__).from_select(
+                    columns, select(*[getattr(model, name) for name in columns]).where(batch)
+                )
+            )
+            connection.execute(delete(model.__table__).where(batch))
+            changes.record(connection, [(resource, ",".join(map(str, key)), "archive") for key in keys])
+        moved += len(keys)
+    return moved
+
+
+def archive(before: date, batch_size: Optional[int] = None) -> Dict[str, int]:
+    """Move history older than ``before`` to the cold tier; returns counts moved."""
+    batch_size = batch_size or current_app.config["ARCHIVE_BATCH_SIZE"]
+    closed_jobs = select(Job.job_id).where(Job.date_posted < before)
+    moved = {
+        "appointments": _move(Appointment, Appointment.appointment_date < before, batch_size),
+        "job_applications": _move(JobApplication, JobApplication.job_id.in_(closed_jobs), batch_size),
+    }
+    events: List[WriteEvent] = []
+    for model, count in zip((Appointment, JobApplication), moved.values()):
+        if count:
+            events += [WriteEvent(model, "bulk", ()), WriteEvent(ARCHIVES[model], "bulk", ())]
+    if events:
+        publish(events)
+    return moved
+
+
+@bp.cli.command("archive")
+@click.option("--before", type=click.DateTime(formats=["%Y-%m-%d"]), help="Cutoff date (default: ARCHIVE_AFTER_DAYS ago).")
+@click.option("--batch-size", type=int, default=None)
+def archive_command(before, batch_size):
+    """Move past appointments and applications of closed jobs to the archive tables."""
+    cutoff = before.date() if before else date.today() - timedelta(days=current_app.config["ARCHIVE_AFTER_DAYS"])
+    moved = archive(cutoff, batch_size)
+    click.echo(
+        f"Archived {moved['appointments']} appointments and "
+        f"{moved['job_applications']} job applications before {cutoff.isoformat()}."
+    )
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from flask import Blueprint, abort, jsonify, request
+from sqlalchemy import event, select
+from sqlalchemy.engine import Connection
+
+from .models import Appointment, Caregiver, User, db
+
+bp = Blueprint("availability", __name__)
+
+# Statuses that no longer hold the caregiver's time.
+INACTIVE_STATUSES = ("declined", "cancelled")
+# Bookings are limited to one day, so only the previous day can spill over.
+MAX_WORK_HOURS = 24
+
+Interval = Tuple[datetime, datetime]
+
+
+class BookingError(ValueError):
+    """Raised when an appointment is invalid or overlaps another booking."""
+
+
+def _interval(appointment_date, appointment_time, work_hours) -> Optional[Interval]:
+    if appointment_date is None or appointment_time is None or not work_hours:
+        return None
+    start = datetime.combine(appointment_date, appointment_time)
+    return start, start + timedelta(hours=work_hours)
+
+
+def _overlaps(a: Interval, b: Interval) -> bool:
+    return a[0] < b[1] and b[0] < a[1]
+
+
+def _booked_intervals(session, day_from: date, day_to: date, caregiver_ids=None):
+    """Yield (appointment_id, caregiver_id, interval) for active bookings.
+
+    Only appointments starting between ``day_from - 1`` and ``day_to`` can
+    overlap that window; the range is answered from the date indexes.
+    """
+    # Imported here: archive imports resources, which imports this module.
+    from .archive import with_archived
+
+    conditions = [
+        lambda entity: entity.appointment_date.between(day_from - timedelta(days=1), day_to),
+        lambda entity: entity.status.is_(None) | entity.status.notin_(INACTIVE_STATUSES),
+    ]
+    if caregiver_ids is not None:
+        conditions.append(lambda entity: entity.caregiver_user_id.in_(caregiver_ids))
+    # Archived appointments are in the past, but a back-dated booking must
+    # still not overlap them; the archive side is one index probe.
+    appointments = with_archived(Appointment, *conditions)
+    statement = select(
+        appointments.c.appointment_id,
+        appointments.c.caregiver_user_id,
+        appointments.c.appointment_date,
+        appointments.c.appointment_time,
+        appointments.c.work_hours,
+    )
+    for appointment_id, caregiver_id, day, start, hours in session.execute(statement):
+        interval = _interval(day, start, hours)
+        if interval is not None:
+            yield appointment_id, caregiver_id, interval
+
+
+def lock_caregivers(executor, caregiver_ids: Iterable[int]) -> None:
+    """Serialize bookings for these caregivers until the transaction ends.
+
+    Without this, two transactions could both read "no overlap" and then
+    both insert. Postgres locks the caregiver rows in id order, so
+    concurrent batches can't deadlock. SQLite has only a database-wide
+    write lock, so this starts the transaction with BEGIN IMMEDIATE before
+    the overlap check reads anything. ``executor`` is a Session or a
+    Connection.
+    """
+    caregiver_ids = sorted(set(caregiver_ids))
+    if not caregiver_ids:
+        return
+    connection = executor if isinstance(executor, Connection) else executor.connection()
+    if connection.dialect.name == "sqlite":
+        raw = connection.connection.driver_connection
+        # pysqlite opens transactions lazily, on the first write; if one is
+        # already open, this connection already holds the write lock.
+        if not raw.in_transaction:
+            raw.execute("BEGIN IMMEDIATE")
+        return
+    connection.execute(
+        select(Caregiver.caregiver_user_id)
+        .where(Caregiver.caregiver_user_id.in_(caregiver_ids))
+        .order_by(Caregiver.caregiver_user_id)
+        .with_for_update()
+    ).all()
+
+
+def check_appointment(session, appointment: Appointment, pending: Dict[int, List[Interval]]) -> None:
+    if appointment.work_hours is not None and not 0 < appointment.work_hours <= MAX_WORK_HOURS:
+        raise BookingError(f"Work hours must be between 1 and {MAX_WORK_HOURS}.")
+    if appointment.status in INACTIVE_STATUSES:
+        return
+    interval = _interval(appointment.appointment_date, appointment.appointment_time, appointment.work_hours)
+    if interval is None:
+        return
+    caregiver_id = appointment.caregiver_user_id
+    clashes = [other for other in pending.get(caregiver_id, []) if _overlaps(interval, other)]
+    if not clashes:
+        booked = _booked_intervals(session, interval[0].date(), interval[1].date(), [caregiver_id])
+        clashes = [
+            other
+            for appointment_id, _, other in booked
+            if appointment_id != appointment.appointment_id and _overlaps(interval, other)
+        ]
+    if clashes:
+        start, end = clashes[0]
+        raise BookingError(
+            f"Caregiver {caregiver_id} is already booked from "
+            f"{start:%Y-%m-%d %H:%M} to {end:%Y-%m-%d %H:%M}."
+        )
+    pending.setdefault(caregiver_id, []).append(interval)
+
+
+def _check_flush(session, flush_context, instances) -> None:
+    candidates = [obj for obj in session.new if isinstance(obj, Appointment)]
+    candidates += [
+        obj
+        for obj in session.dirty
+        if isinstance(obj, Appointment) and session.is_modified(obj, include_collections=False)
+    ]
+    if not candidates:
+        return
+    pending: Dict[int, List[Interval]] = {}
+    with session.no_autoflush:
+        lock_caregivers(
+            session,
+            (a.caregiver_user_id for a in candidates if a.caregiver_user_id is not None and a.status not in INACTIVE_STATUSES),
+        )
+        for appointment in candidates:
+            check_appointment(session, appointment, pending)
+
+
+def install(session) -> None:
+    """Reject overlapping bookings whenever appointments are flushed."""
+    if not event.contains(session, "before_flush", _check_flush):
+        event.listen(session, "before_flush", _check_flush)
+
+
+def free_caregivers(
+    day: date,
+    start: time,
+    hours: int,
+    caregiving_type: Optional[str] = None,
+    city: Optional[str] = None,
+    limit: int = 50,
+) -> List[Dict[str, object]]:
+    slot = _interval(day, start, hours)
+    busy: Set[int] = {
+        caregiver_id
+        for _, caregiver_id, interval in _booked_intervals(db.session, slot[0].date(), slot[1].date())
+        if _overlaps(slot, interval)
+    }
+    statement = (
+        select(
+            Caregiver.caregiver_user_id,
+            User.given_name,
+            User.surname,
+            User.city,
+            Caregiver.caregiving_type,
+            Caregiver.hourly_rate,
+        )
+        .join(User, User.user_id == Caregiver.caregiver_user_id)
+        .order_by(Caregiver.caregiver_user_id)
+    )
+    if busy:
+        statement = statement.where(Caregiver.caregiver_user_id.notin_(busy))
+    if caregiving_type:
+        statement = statement.where(Caregiver.caregiving_type == caregiving_type)
+    if city:
+        statement = statement.where(User.city == city)
+    return [row._asdict() for row in db.session.execute(statement.limit(limit))]
+
+
+def _arg(name: str, parse):
+    raw = request.args.get(name)
+    if not raw:
+        abort(400)
+    try:
+        return parse(raw)
+    except ValueError:
+        abort(400)
+
+
+@bp.route("/availability")
+def free():
+    hours = _arg("hours", int)
+    if not 0 < hours <= MAX_WORK_HOURS:
+        abort(400)
+    caregivers = free_caregivers(
+        _arg("date", date.fromisoformat),
+        _arg("start", time.fromisoformat),
+        hours,
+        caregiving_type=request.args.get("caregiving_type"),
+        city=request.args.get("city"),
+        limit=max(0, request.args.get("limit", 50, type=int)),
+    )
+    for caregiver in caregivers:
+        if caregiver["hourly_rate"] is not None:
+            caregiver["hourly_rate"] = f"{caregiver['hourly_rate']:.2f}"
+    return jsonify(caregivers)
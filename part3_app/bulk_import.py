@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import click
+from flask import Blueprint, abort, current_app, render_template, request
+from sqlalchemy import inspect
+from sqlalchemy.exc import SQLAlchemyError
+
+from . import changes
+from .availability import BookingError, check_appointment, lock_caregivers
+from .models import Appointment, db
+from .resources import RESOURCES, _cast_value
+from .write_events import WriteEvent, publish
+
+bp = Blueprint("bulk_import", __name__, cli_group=None)
+
+IMPORT_FORMATS = ("csv", "jsonl")
+
+
+@dataclass
+class ImportReport:
+    written: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+
+def open_text(binary) -> io.TextIOWrapper:
+    """Decode an upload as UTF-8, keeping undecodable bytes for ``read_rows`` to report."""
+    return io.TextIOWrapper(binary, encoding="utf-8", errors="surrogateescape", newline="")
+
+
+def _utf8(text: Any) -> bool:
+    if not isinstance(text, str):
+        return True
+    try:
+        text.encode("utf-8")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def read_rows(stream: Iterable[str], fmt: str) -> Iterator[Any]:
+    """Yield one item per row: a dict, or a ``ValueError`` for a row that can't be read.
+
+    Bad rows are yielded rather than raised so they are numbered and
+    reported like any other invalid row, and the rest of the file still
+    loads. ``stream`` should come from ``open_text``.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as exc:
+                yield ValueError(f"invalid CSV: {exc}")
+                continue
+            if all(_utf8(key) and _utf8(value) for key, value in row.items()):
+                yield row
+            else:
+                yield ValueError("row is not valid UTF-8")
+    elif fmt == "jsonl":
+        for line in stream:
+            if not line.strip():
+                continue
+            if not _utf8(line):
+                yield ValueError("line is not valid UTF-8")
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                yield ValueError(f"invalid JSON: {exc}")
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def _row_parser(cfg):
+    """Build a function turning one raw row into column values for ``cfg``."""
+    model = cfg["model"]
+    form_names = {f["name"] for f in cfg["form_fields"]}
+    fields = [(pk, "int", False) for pk in cfg["pk"] if pk not in form_names]
+    fields += [
+        (f["name"], f.get("parser", "string"), f.get("required", False))
+        for f in cfg["form_fields"]
+    ]
+    validators = {
+        name: method for name, (method, _) in inspect(model).validators.items()
+    }
+    stub = model()
+
+    def parse(raw: Any) -> Dict[str, Any]:
+        if isinstance(raw, ValueError):
+            raise raw
+        if not isinstance(raw, dict):
+            raise ValueError("expected a JSON object")
+        values: Dict[str, Any] = {}
+        for name, parser, required in fields:
+            value = raw.get(name)
+            try:
+                value = _cast_value(None if value is None else str(value), parser)
+            except ArithmeticError:
+                # decimal.InvalidOperation for non-numeric rates.
+                raise ValueError(f"{name}: invalid number") from None
+            except (ValueError, TypeError) as exc:
+                raise ValueError(f"{name}: {exc}") from None
+            if value is None:
+                if required:
+                    raise ValueError(f"{name}: value is required")
+                if name in cfg["pk"]:
+                    continue
+            elif name in validators:
+                try:
+                    value = validators[name](stub, name, value)
+                except TypeError as exc:
+                    raise ValueError(f"{name}: {exc}") from None
+            values[name] = value
+        return values
+
+    return parse
+
+
+def _statement(table, pk_fields: List[str], columns: Tuple[str, ...], upsert: bool):
+    dialect = db.engine.dialect
+    if not upsert or dialect.name not in ("sqlite", "postgresql"):
+        statement = table.insert()
+    else:
+        # Imported here: the dialect packages are only needed for upserts and
+        # cost noticeable time at startup.
+        from sqlalchemy.dialects import postgresql, sqlite
+
+        insert = (postgresql if dialect.name == "postgresql" else sqlite).insert(table)
+        updates = {name: insert.excluded[name] for name in columns if name not in pk_fields}
+        if not updates:
+            statement = insert.on_conflict_do_nothing(index_elements=pk_fields)
+        else:
+            statement = insert.on_conflict_do_update(index_elements=pk_fields, set_=updates)
+    if dialect.insert_executemany_returning:
+        # The written keys go to the change log; skipped conflicts return nothing.
+        statement = statement.returning(*[table.c[pk] for pk in pk_fields])
+    return statement
+
+
+def _write(
+    connection,
+    statement,
+    rows: List[Tuple[int, Dict[str, Any]]],
+    report: ImportReport,
+    log,
+    prepare: Optional[Callable] = None,
+) -> None:
+    """Insert ``rows`` in one transaction, bisecting on failure to find bad rows.
+
+    ``prepare(connection, rows)`` runs whenever a new transaction is about to
+    start (after an earlier commit, and before each retry) and returns the
+    rows still to write; appointments relock and recheck their caregivers.
+    """
+    if prepare is not None and not connection.in_transaction():
+        rows = prepare(connection, rows)
+        if not rows:
+            return
+    try:
+        result = connection.execute(statement, [values for _, values in rows])
+        if result.returns_rows:
+            keys = result.all()
+            log(connection, keys)
+            written = len(keys)
+        else:
+            # No RETURNING on this backend: ON CONFLICT skips are not reported.
+            written = len(rows)
+        connection.commit()
+        report.written += written
+    except SQLAlchemyError as exc:
+        connection.rollback()
+        if len(rows) == 1:
+            report.errors.append((rows[0][0], str(getattr(exc, "orig", None) or exc)))
+            return
+        middle = len(rows) // 2
+        _write(connection, statement, rows[:middle], report, log, prepare)
+        _write(connection, statement, rows[middle:], report, log, prepare)
+
+
+def _check_bookings(connection, rows: List[Tuple[int, Dict[str, Any]]], report: ImportReport):
+    """Drop and report appointment rows that overlap a booking, as form and API writes do.
+
+    The caregivers stay locked until the transaction ends; ``_write`` calls
+    this again whenever it starts a new one.
+    """
+    appointments = [(number, values, Appointment(**values)) for number, values in rows]
+    lock_caregivers(connection, (a.caregiver_user_id for _, _, a in appointments if a.caregiver_user_id is not None))
+    pending: Dict[int, List[Any]] = {}
+    valid = []
+    for number, values, appointment in appointments:
+        try:
+            check_appointment(connection, appointment, pending)
+        except BookingError as exc:
+            report.errors.append((number, str(exc)))
+            continue
+        valid.append((number, values))
+    if not valid:
+        connection.rollback()
+    return valid
+
+
+def _sync_sequence(connection, table, pk_fields: List[str]) -> None:
+    """Move a Postgres serial past explicitly imported ids."""
+    if connection.dialect.name != "postgresql" or len(pk_fields) != 1:
+        return
+    column = table.c[pk_fields[0]]
+    if column is not table.autoincrement_column:
+        return
+    connection.exec_driver_sql(
+        f"SELECT setval(pg_get_serial_sequence('{table.name}', '{column.name}'), "
+        f"COALESCE(MAX({column.name}), 1)) FROM \"{table.name}\""
+    )
+    connection.commit()
+
+
+def import_rows(
+    resource: str,
+    rows: Iterable[Any],
+    batch_size: int | None = None,
+    upsert: bool = False,
+) -> ImportReport:
+    """Validate and insert ``rows`` into ``resource`` in batched transactions.
+
+    Each batch is parsed with the resource's form-field parsers and written as
+    one multi-row INSERT (``ON CONFLICT`` upsert when ``upsert`` is set).
+    Appointments also get the double-booking check. Rows that fail parsing,
+    the booking check or the database constraints are reported by their
+    1-based row number; the rest of the batch is still committed.
+    """
+    cfg = RESOURCES[resource]
+    table = cfg["model"].__table__
+    batch_size = batch_size or current_app.config["IMPORT_BATCH_SIZE"]
+    parse = _row_parser(cfg)
+    report = ImportReport()
+    numbered = enumerate(rows, start=1)
+    op = "upsert" if upsert else "insert"
+
+    def log(connection, keys) -> None:
+        changes.record(connection, [(resource, ",".join(map(str, key)), op) for key in keys])
+
+    prepare = partial(_check_bookings, report=report) if cfg["model"] is Appointment else None
+
+    with db.engine.connect() as connection:
+        while batch := list(islice(numbered, batch_size)):
+            parsed: List[Tuple[int, Dict[str, Any]]] = []
+            for number, raw in batch:
+                try:
+                    parsed.append((number, parse(raw)))
+                except ValueError as exc:
+                    report.errors.append((number, str(exc)))
+            if prepare is not None:
+                # One check over the whole batch, so rows in different column
+                # groups are checked against each other too.
+                parsed = prepare(connection, parsed)
+            groups: Dict[Tuple[str, ...], List[Tuple[int, Dict[str, Any]]]] = {}
+            for number, values in parsed:
+                groups.setdefault(tuple(values), []).append((number, values))
+            for columns, group in groups.items():
+                _write(connection, _statement(table, cfg["pk"], columns, upsert), group, report, log, prepare)
+        _sync_sequence(connection, table, cfg["pk"])
+
+    if report.written:
+        publish([WriteEvent(cfg["model"], "bulk", ())])
+    report.errors.sort()
+    return report
+
+
+@bp.route("/<resource>/import", methods=["GET", "POST"])
+def upload(resource):
+    if resource not in RESOURCES:
+        abort(404)
+    report = None
+    if request.method == "POST":
+        upload_file = request.files.get("file")
+        if upload_file is None or not upload_file.filename:
+            abort(400)
+        fmt = "jsonl" if upload_file.filename.endswith((".jsonl", ".json")) else "csv"
+        stream = open_text(upload_file.stream)
+        report = import_rows(resource, read_rows(stream, fmt), upsert=bool(request.form.get("upsert")))
+    return render_template(
+        "resource_import.html",
+        resource=resource,
+        config=RESOURCES[resource],
+        report=report,
+        resources=RESOURCES,
+    )
+
+
+@bp.cli.command("import-rows")
+@click.argument("resource", type=click.Choice(list(RESOURCES)))
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(IMPORT_FORMATS), default=None)
+@click.option("--batch-size", type=int, default=None)
+@click.option("--upsert", is_flag=True, help="Update rows whose primary key already exists.")
+def import_command(resource, path, fmt, batch_size, upsert):
+    """Bulk load a CSV or JSON-Lines file into RESOURCE."""
+    fmt = fmt or ("jsonl" if path.endswith((".jsonl", ".json")) else "csv")
+    with open(path, "rb") as binary, open_text(binary) as handle:
+        report = import_rows(resource, read_rows(handle, fmt), batch_size, upsert)
+    click.echo(f"{report.written} rows written, {report.failed} failed")
+    for number, message in report.errors:
+        click.echo(f"  row {number}: {message}", err=True)
@@ -0,0 +1,398 @@
+"""Change feed for mirroring resources without re-downloading them.
+
+Every ORM write to a ``RESOURCES`` model (forms and the JSON API), every
+bulk-imported row and every archived row adds a ``change_log`` row in the
+same transaction, holding the resource, its primary key, the operation and a
+sequence number. The operations are:
+
+``insert``, ``update``, ``delete``
+    Form and API writes. Rows the database removes by ON DELETE CASCADE are
+    looked up before the delete and logged as deletes too.
+``insert``, ``upsert``
+    Bulk imports, without and with ``--upsert``. An upserted row may have
+    been created or updated.
+``archive``
+    ``flask archive`` moved the row to the resource's archive table. It is
+    gone from the resource but still readable with ``?archived=1``.
+
+Clients poll ``GET /changes?since=<seq>`` or keep ``GET /changes/stream``
+(server-sent events) open. Either way they read one range of the sequence
+index, so a sync costs the number of changes, not the table size.
+
+Entries older than ``CHANGE_LOG_RETENTION_DAYS`` or beyond the newest
+``CHANGE_LOG_MAX_ROWS`` are trimmed every ``CHANGE_LOG_TRIM_SECONDS``. A
+client whose ``since`` has been trimmed away (or lies past the newest entry)
+gets 410, or a ``reset`` event on the stream. Every answer carries ``oldest``
+and ``head``, the first kept and the newest sequence numbers: a client that
+must re-download notes ``head``, downloads the resources, then resumes with
+``since=<head>``. Changes made during the download are replayed on top, and
+replaying them is harmless since each entry names the row, not its values.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import click
+from flask import Blueprint, Response, abort, current_app, jsonify, request
+from sqlalchemy import delete, event, func, inspect, insert, or_, select, text, tuple_
+
+from .models import db
+from .resources import RESOURCES
+from .write_events import WriteEvent, flush_events, subscribe
+
+bp = Blueprint("changes", __name__, cli_group=None)
+
+_INFO_KEY = "change_log_cascades"
+_PENDING_KEY = "change_log_pending"
+_COMMITTING_KEY = "change_log_committing"
+_CHUNK = 500
+_KEEP_ALIVE_SECONDS = 15
+# Postgres hands out sequence numbers before commit, so concurrent writers
+# could commit them out of order and a client polling in between would skip
+# one. Writers take this advisory lock to log, just before they commit, so it
+# covers only the change log insert and the commit itself.
+_LOCK_KEY = 0x6368616E6765
+
+change_log = db.Table(
+    "change_log",
+    db.Column("seq", db.Integer, primary_key=True, autoincrement=True),
+    db.Column("resource", db.String(50), nullable=False),
+    db.Column("key", db.String(100), nullable=False),
+    db.Column("op", db.String(10), nullable=False),
+    db.Column("changed_at", db.DateTime, nullable=False),
+    db.Index("ix_change_log_resource_seq", "resource", "seq"),
+    # Never reuse a sequence number, even after every row has been trimmed.
+    sqlite_autoincrement=True,
+)
+
+_RESOURCE_OF = {cfg["model"]: name for name, cfg in RESOURCES.items()}
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _chunks(values: Iterable[Any]) -> Iterable[List[Any]]:
+    values = list(values)
+    for start in range(0, len(values), _CHUNK):
+        yield values[start:start + _CHUNK]
+
+
+def record(connection, entries: Iterable[Tuple[str, str, str]]) -> None:
+    """Log ``(resource, key, op)`` entries in ``connection``'s transaction.
+
+    ``key`` is the primary key in ``RESOURCES[resource]["pk"]`` order, comma
+    separated, as in the JSON API URLs. Call this right before committing:
+    on Postgres it holds every other logging writer off until then.
+    """
+    now = _utcnow()
+    rows = [{"resource": resource, "key": key, "op": op, "changed_at": now} for resource, key, op in entries]
+    if not rows:
+        return
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+    connection.execute(insert(change_log), rows)
+
+
+def _key(model, pk: Tuple[Any, ...]) -> str:
+    """Format a mapper-ordered primary key in the resource's ``pk`` order."""
+    values = dict(zip((column.key for column in inspect(model).primary_key), pk))
+    return ",".join(str(values[name]) for name in RESOURCES[_RESOURCE_OF[model]]["pk"])
+
+
+def _cascading(mapper) -> List[Any]:
+    return [r for r in mapper.relationships if r.passive_deletes and r.cascade.delete]
+
+
+def _columns(mapper) -> List[Any]:
+    """Primary key plus the columns the mapper's cascading children refer to."""
+    columns = list(mapper.primary_key)
+    for relationship in _cascading(mapper):
+        columns += [local for local, _ in relationship.local_remote_pairs if local not in columns]
+    return columns
+
+
+def _capture_cascades(session, flush_context, instances) -> None:
+    """Find the rows ON DELETE CASCADE will remove while they still exist."""
+    pending = []
+    for instance in session.deleted:
+        mapper = inspect(instance).mapper
+        if _cascading(mapper):
+            values = {column: getattr(instance, mapper.get_property_by_column(column).key) for column in _columns(mapper)}
+            pending.append((mapper, [values]))
+    if not pending:
+        return
+    found: Dict[type, Set[Tuple[Any, ...]]] = session.info.setdefault(_INFO_KEY, {})
+    with session.no_autoflush:
+        while pending:
+            mapper, parents = pending.pop()
+            for relationship in _cascading(mapper):
+                child = relationship.mapper
+                columns = _columns(child)
+                locals_ = [local for local, _ in relationship.local_remote_pairs]
+                remotes = [remote for _, remote in relationship.local_remote_pairs]
+                target = tuple_(*remotes) if len(remotes) > 1 else remotes[0]
+                keys = {tuple(parent[local] for local in locals_) for parent in parents}
+                if len(remotes) == 1:
+                    keys = {key[0] for key in keys}
+                seen = found.setdefault(child.class_, set())
+                children = []
+                for chunk in _chunks(keys):
+                    for row in session.execute(select(*columns).where(target.in_(chunk))):
+                        values = dict(zip(columns, row))
+                        pk = tuple(values[column] for column in child.primary_key)
+                        if pk not in seen:
+                            seen.add(pk)
+                            children.append(values)
+                if children:
+                    pending.append((child, children))
+
+
+def _collect_flush(session, flush_context) -> None:
+    """Queue this flush's entries; they are written just before commit."""
+    cascaded = session.info.pop(_INFO_KEY, {})
+    entries: Dict[Tuple[str, str], str] = {}
+    for write in flush_events(session):
+        if write.op != "cascade" and write.model in _RESOURCE_OF:
+            entries[_RESOURCE_OF[write.model], _key(write.model, write.pk)] = write.op
+    for model, keys in cascaded.items():
+        if model in _RESOURCE_OF:
+            for pk in keys:
+                entries.setdefault((_RESOURCE_OF[model], _key(model, pk)), "delete")
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    pending += [(resource, key, op) for (resource, key), op in entries.items()]
+    if session.info.get(_COMMITTING_KEY):
+        # Flushed by commit itself, after ``_record_pending`` already ran.
+        _write_pending(session)
+
+
+def _write_pending(session) -> None:
+    entries = session.info.pop(_PENDING_KEY, None)
+    if entries:
+        # Bind to the primary even when this request reads from a replica.
+        record(session.connection(bind_arguments={"clause": insert(change_log)}), entries)
+
+
+def _record_pending(session) -> None:
+    session.flush()
+    session.info[_COMMITTING_KEY] = True
+    _write_pending(session)
+
+
+def _discard(session, *args) -> None:
+    for key in (_INFO_KEY, _PENDING_KEY, _COMMITTING_KEY):
+        session.info.pop(key, None)
+
+
+def trim(retention_days: float, max_rows: int) -> int:
+    """Delete entries past either bound, always keeping the newest one.
+
+    Keeping the newest entry lets ``bounds`` tell which ``since`` values
+    are still complete. Returns the number of entries deleted.
+    """
+    with db.engine.begin() as connection:
+        newest = connection.execute(select(func.max(change_log.c.seq))).scalar()
+        if newest is None:
+            return 0
+        bounds = []
+        if max_rows:
+            bounds.append(change_log.c.seq <= newest - max_rows)
+        if retention_days:
+            bounds.append(change_log.c.changed_at < _utcnow() - timedelta(days=retention_days))
+        if not bounds:
+            return 0
+        result = connection.execute(delete(change_log).where(change_log.c.seq < newest, or_(*bounds)))
+        return result.rowcount
+
+
+class ChangeFeed:
+    """Installs the logging hooks, trims the log and wakes waiting streams."""
+
+    def __init__(self) -> None:
+        self._app = None
+        self._interval = 0.0
+        self._trimmed_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._trimming = False
+        self._changed = threading.Condition()
+
+    def init_app(self, app) -> None:
+        self.reset()
+        self._app = app
+        self._interval = app.config["CHANGE_LOG_TRIM_SECONDS"]
+        subscribe(self._on_write)
+
+    def reset(self) -> None:
+        """Forget the last trim, so another app trims on its first write."""
+        self._trimmed_at = None
+
+    def install(self, session) -> None:
+        if event.contains(session, "after_flush", _collect_flush):
+            return
+        event.listen(session, "before_flush", _capture_cascades)
+        event.listen(session, "after_flush", _collect_flush)
+        event.listen(session, "before_commit", _record_pending)
+        event.listen(session, "after_commit", _discard)
+        event.listen(session, "after_rollback", _discard)
+
+    def _on_write(self, events: List[WriteEvent]) -> None:
+        with self._changed:
+            self._changed.notify_all()
+        self.maybe_trim()
+
+    def wait(self, timeout: float) -> None:
+        """Block until this process commits a write or ``timeout`` passes."""
+        with self._changed:
+            self._changed.wait(timeout)
+
+    def maybe_trim(self) -> None:
+        """Start a background trim if the last one is older than the interval."""
+        if self._trimmed_at is not None and time.monotonic() - self._trimmed_at < self._interval:
+            return
+        with self._lock:
+            if self._trimming:
+                return
+            self._trimming = True
+
+        def run():
+            try:
+                with self._app.app_context():
+                    config = self._app.config
+                    trim(config["CHANGE_LOG_RETENTION_DAYS"], config["CHANGE_LOG_MAX_ROWS"])
+                self._trimmed_at = time.monotonic()
+            finally:
+                self._trimming = False
+
+        threading.Thread(target=run, name="change-log-trim", daemon=True).start()
+
+
+feed = ChangeFeed()
+
+
+def bounds() -> Tuple[int, int]:
+    """``(oldest, head)``: the first kept and the newest sequence numbers, 0 if none."""
+    oldest, head = db.session.execute(select(func.min(change_log.c.seq), func.max(change_log.c.seq))).one()
+    return oldest or 0, head or 0
+
+
+def read(since: int, resources: List[str], limit: int, oldest: int, head: int) -> Optional[List[Dict[str, Any]]]:
+    """Entries after ``since`` (oldest first), or None if ``since`` is not a
+    position in the log ``bounds`` describes: trimmed away or past the head.
+    """
+    if since > head or since < oldest - 1:
+        return None
+    statement = select(change_log).where(change_log.c.seq > since)
+    if resources:
+        statement = statement.where(change_log.c.resource.in_(resources))
+    rows = db.session.execute(statement.order_by(change_log.c.seq).limit(limit))
+    return [
+        {
+            "seq": row.seq,
+            "resource": row.resource,
+            "op": row.op,
+            "pk": dict(zip(RESOURCES[row.resource]["pk"], map(int, row.key.split(",")))),
+            "at": row.changed_at.isoformat() + "Z",
+        }
+        for row in rows
+    ]
+
+
+def _since(default: Optional[str] = None) -> int:
+    raw = request.args.get("since", default) or "0"
+    try:
+        since = int(raw)
+    except ValueError:
+        abort(400)
+    if since < 0:
+        abort(400)
+    return since
+
+
+def _resources() -> List[str]:
+    resources = request.args.getlist("resource")
+    if any(name not in RESOURCES for name in resources):
+        abort(400)
+    return resources
+
+
+def _limit() -> int:
+    limit = request.args.get("limit", current_app.config["MAX_PAGE_SIZE"], type=int)
+    if not 0 < limit <= current_app.config["MAX_PAGE_SIZE"]:
+        abort(400)
+    return limit
+
+
+@bp.route("/changes")
+def changes():
+    since, resources, limit = _since(), _resources(), _limit()
+    oldest, head = bounds()
+    entries = read(since, resources, limit + 1, oldest, head)
+    if entries is None:
+        return jsonify({
+            "error": "since is not in the change log; re-download, then resume from head",
+            "oldest": oldest,
+            "head": head,
+        }), 410
+    more = len(entries) > limit
+    entries = entries[:limit]
+    return jsonify({
+        "changes": entries,
+        "next": entries[-1]["seq"] if entries else since,
+        "more": more,
+        "oldest": oldest,
+        "head": head,
+    })
+
+
+@bp.route("/changes/stream")
+def stream():
+    """Server-sent events; reconnects resume from ``Last-Event-ID``.
+
+    A stream ends after ``CHANGES_STREAM_SECONDS`` so it never pins a worker
+    for good; EventSource clients reconnect where they left off.
+    """
+    since = _since(request.headers.get("Last-Event-ID"))
+    resources, limit = _resources(), _limit()
+    app = current_app._get_current_object()
+    poll = app.config["CHANGES_POLL_SECONDS"]
+    deadline = time.monotonic() + app.config["CHANGES_STREAM_SECONDS"]
+
+    def events(since: int):
+        yield f"retry: {int(poll * 1000)}\n\n"
+        sent_at = time.monotonic()
+        while time.monotonic() < deadline:
+            with app.app_context():
+                oldest, head = bounds()
+                entries = read(since, resources, limit, oldest, head)
+            if entries is None:
+                yield f"event: reset\ndata: {json.dumps({'oldest': oldest, 'head': head})}\n\n"
+                return
+            for entry in entries:
+                since = entry["seq"]
+                yield f"id: {since}\nevent: change\ndata: {json.dumps(entry)}\n\n"
+            if entries:
+                sent_at = time.monotonic()
+            elif time.monotonic() - sent_at >= _KEEP_ALIVE_SECONDS:
+                # A comment line keeps proxies from closing an idle stream.
+                yield ": keep-alive\n\n"
+                sent_at = time.monotonic()
+            if len(entries) < limit:
+                feed.wait(poll)
+
+    return Response(
+        events(since),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@bp.cli.command("changes-trim")
+def trim_command():
+    """Delete change log entries past the retention bounds."""
+    config = current_app.config
+    deleted = trim(config["CHANGE_LOG_RETENTION_DAYS"], config["CHANGE_LOG_MAX_ROWS"])
+    click.echo(f"Trimmed {deleted} change log entries.")
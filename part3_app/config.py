@@ -1,9 +1,43 @@
 import os
+from typing import Any, Dict
 
 
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    PAGE_SIZE = int(os.getenv("PAGE_SIZE", "50"))
+    MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+    IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "5000"))
+    API_MAX_BATCH = int(os.getenv("API_MAX_BATCH", "1000"))
+    COUNTER_RECONCILE_SECONDS = float(os.getenv("COUNTER_RECONCILE_SECONDS", "60"))
+    SEARCH_RECONCILE_SECONDS = float(os.getenv("SEARCH_RECONCILE_SECONDS", "60"))
+    REPORT_REBUILD_SECONDS = float(os.getenv("REPORT_REBUILD_SECONDS", "3600"))
+    MATCH_TOP_K = int(os.getenv("MATCH_TOP_K", "10"))
+    ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "365"))
+    ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+    CHANGE_LOG_RETENTION_DAYS = float(os.getenv("CHANGE_LOG_RETENTION_DAYS", "7"))
+    CHANGE_LOG_MAX_ROWS = int(os.getenv("CHANGE_LOG_MAX_ROWS", "1000000"))
+    CHANGE_LOG_TRIM_SECONDS = float(os.getenv("CHANGE_LOG_TRIM_SECONDS", "300"))
+    CHANGES_POLL_SECONDS = float(os.getenv("CHANGES_POLL_SECONDS", "1"))
+    CHANGES_STREAM_SECONDS = float(os.getenv("CHANGES_STREAM_SECONDS", "300"))
+    MATCH_OPEN_DAYS = int(os.getenv("MATCH_OPEN_DAYS", "0"))
+    PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "1") == "1"
+    PAGE_CACHE_URL = os.getenv("PAGE_CACHE_URL", "")
+    PAGE_CACHE_MAX_ENTRIES = int(os.getenv("PAGE_CACHE_MAX_ENTRIES", "512"))
+    PAGE_CACHE_TTL = int(os.getenv("PAGE_CACHE_TTL", "3600"))
+    FTS_LANGUAGE = os.getenv("FTS_LANGUAGE", "english")
+    SQL_INSTRUMENTATION = os.getenv("SQL_INSTRUMENTATION", "0") == "1"
+    SQL_DEBUG_PAGE = os.getenv("SQL_DEBUG_PAGE", "0") == "1"
+    SQL_SLOW_STATEMENTS = int(os.getenv("SQL_SLOW_STATEMENTS", "5"))
+    SQL_REPEAT_THRESHOLD = int(os.getenv("SQL_REPEAT_THRESHOLD", "5"))
+    SQL_EXPLAIN_THRESHOLD_MS = float(os.getenv("SQL_EXPLAIN_THRESHOLD_MS", "0"))
+
+    SQLALCHEMY_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    REPLICA_HEALTH_INTERVAL = float(os.getenv("REPLICA_HEALTH_INTERVAL", "5"))
+    REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+    REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+    REPLICA_CONNECT_TIMEOUT = float(os.getenv("REPLICA_CONNECT_TIMEOUT", "2"))
 
     @staticmethod
     def database_uri(instance_path: str) -> str:
@@ -12,3 +46,35 @@ class Config:
             return db_url
         return f"sqlite:///{os.path.join(instance_path, 'caregiver.db')}"
 
+    @staticmethod
+    def engine_options(database_uri: str) -> Dict[str, Any]:
+        """Return SQLAlchemy engine options tuned for the URI's backend."""
+        if database_uri.startswith("sqlite"):
+            busy_timeout_ms = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+            return {"connect_args": {"timeout": busy_timeout_ms / 1000}}
+        options: Dict[str, Any] = {
+            "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+            "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+            "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+            "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "1") == "1",
+        }
+        if database_uri.startswith("postgresql"):
+            settings = ["-c application_name=caregiver-platform"]
+            if statement_timeout := os.getenv("DB_STATEMENT_TIMEOUT_MS"):
+                settings.append(f"-c statement_timeout={int(statement_timeout)}")
+            options["connect_args"] = {"options": " ".join(settings)}
+        return options
+
+    @staticmethod
+    def sqlite_pragmas() -> Dict[str, Any]:
+        """Return PRAGMAs applied to every new SQLite connection."""
+        return {
+            "foreign_keys": "ON",
+            "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+            "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+            "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+            "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+            "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536")),
+            "temp_store": "MEMORY",
+        }
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select
+
+from .models import db
+from .replicas import use_primary
+from .write_events import WriteEvent, subscribe
+
+_DELTAS = {"insert": 1, "delete": -1}
+
+
+class CounterCache:
+    """Row counts per resource, adjusted on commit and reconciled periodically.
+
+    Counts are read with a single SELECT of scalar subqueries. After that the
+    dashboard only reads the in-process dict; committed inserts and deletes
+    move the numbers, and once ``COUNTER_RECONCILE_SECONDS`` have elapsed a
+    background thread recounts to repair any drift (cascades done by the
+    database, writes from other processes).
+    """
+
+    def __init__(self) -> None:
+        self._models: Dict[str, type] = {}
+        self._names: Dict[type, str] = {}
+        self._counts: Dict[str, int] = {}
+        self._loaded_at: Optional[float] = None
+        self.generation = 0
+        self._interval = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._app = None
+
+    def init_app(self, app, models: Dict[str, type]) -> None:
+        self.reset()
+        self._app = app
+        self._models = dict(models)
+        self._names = {model: name for name, model in models.items()}
+        self._interval = app.config["COUNTER_RECONCILE_SECONDS"]
+        subscribe(self._apply)
+
+    def snapshot(self) -> Dict[str, int]:
+        if not self._counts:
+            self.reconcile()
+        elif self._loaded_at is None or time.monotonic() - self._loaded_at > self._interval:
+            self._reconcile_in_background()
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self) -> None:
+        """Forget every count, e.g. before serving another app's database.
+
+        ``generation`` keeps counting up: it keys cached dashboard pages.
+        """
+        with self._lock:
+            self._counts = {}
+            self._loaded_at = None
+
+    def invalidate(self) -> None:
+        """Force a recount on the next snapshot (e.g. after a bulk load)."""
+        with self._lock:
+            self._loaded_at = None
+
+    def reconcile(self) -> None:
+        statement = select(
+            *[
+                select(func.count()).select_from(model).scalar_subquery().label(name)
+                for name, model in self._models.items()
+            ]
+        )
+        with use_primary():
+            row = db.session.execute(statement).one()
+        with self._lock:
+            self._counts = dict(row._mapping)
+            self._loaded_at = time.monotonic()
+            self.generation += 1
+
+    def _reconcile_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                with self._app.app_context():
+                    self.reconcile()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="counter-reconcile", daemon=True).start()
+
+    def _apply(self, events: List[WriteEvent]) -> None:
+        with self._lock:
+            if not self._counts:
+                return
+            for write in events:
+                name = self._names.get(write.model)
+                if name is None:
+                    continue
+                if write.op in ("bulk", "cascade"):
+                    self._loaded_at = None
+                elif write.op in _DELTAS:
+                    self._counts[name] += _DELTAS[write.op]
+
+
+counters = CounterCache()
@@ -0,0 +1,275 @@
+"""Deterministic synthetic data for capacity testing.
+
+    python -m part3_app.datagen --users 1_000_000 --seed 42 --reset
+
+Users are split into caregivers and members; every member gets an address,
+jobs are posted by members, caregivers apply to jobs of their type and
+appointments never overlap for a caregiver. Rows are generated in chunks and
+written with multi-row Core INSERTs, one transaction per chunk. The only
+per-user state kept between tables is a few compact arrays: ids, plus a
+one-byte city and caregiving type code per user, so memory stays small even
+for millions of users.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+from array import array
+from datetime import date, time, timedelta
+from typing import Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import func, insert, select
+
+from . import fulltext
+from .models import Address, Appointment, Caregiver, Job, JobApplication, Member, User, db
+from .write_events import WriteEvent, publish
+
+GIVEN_NAMES = [
+    "Aigerim", "Aruzhan", "Dana", "Madina", "Alina", "Zarina", "Kamila", "Mariam", "Aisha", "Dinara",
+    "Nurlan", "Arman", "Daniyar", "Yerlan", "Bekzat", "Timur", "Askar", "Ali", "Erzhan", "Rustem",
+]
+SURNAMES = [
+    "Akhmetov", "Bekov", "Sultanov", "Nurlanov", "Temirov", "Zhaksybekov", "Omarov", "Iskakov",
+    "Kassymov", "Abenov", "Serikov", "Mukhamedov", "Dzhaksybekov", "Tokayev", "Baimukhanov",
+]
+CITIES = [
+    "Almaty", "Astana", "Shymkent", "Karaganda", "Aktobe", "Taraz", "Pavlodar", "Oral",
+    "Aktau", "Atyrau", "Kostanay", "Zhezkazgan", "Talgar", "Semey", "Turkistan",
+]
+STREETS = ["Abay", "Dostyk", "Satpayev", "Tole Bi", "Karatau", "Ortalyk", "Kabanbay Batyr", "Seifullin"]
+CAREGIVING_TYPES = {"babysitter": (6.0, 15.0), "elderly": (9.0, 22.0), "playmate": (5.0, 12.0)}
+DEPENDENTS = {
+    "babysitter": ["{age}-year-old son.", "{age}-year-old daughter.", "Twins aged {age}."],
+    "elderly": ["Elderly mother needs support.", "Grandfather recovering from surgery.", "Elderly father with limited mobility."],
+    "playmate": ["{age}-year-old who loves board games.", "Energetic {age}-year-old boy.", "Shy {age}-year-old girl."],
+}
+HOUSE_RULES = ["No pets.", "No smoking.", "Hygiene is essential.", "Shoes off indoors.", "Quiet after 9pm.", "No screen time."]
+REQUIREMENTS = ["punctual", "experienced", "kind", "creative", "patient", "responsible", "first-aid certified", "speaks English"]
+STATUSES = ["accepted"] * 6 + ["pending"] * 3 + ["declined"]
+EPOCH = date(2024, 1, 1)
+TYPE_NAMES = list(CAREGIVING_TYPES)
+
+
+class Generator:
+    """Produces row dicts for each table from a single seeded RNG."""
+
+    def __init__(self, users: int, seed: int, caregiver_share: float) -> None:
+        self.users = users
+        self.rng = random.Random(seed)
+        self.caregiver_share = caregiver_share
+        self.cities = array("B")  # index into CITIES, by user_id - 1
+        self.caregiver_ids = array("l")
+        self.member_ids = array("l")
+        self.caregivers_by_type: Dict[str, array] = {kind: array("l") for kind in CAREGIVING_TYPES}
+        self.member_type = array("B")  # index into TYPE_NAMES, parallel to member_ids
+        self.jobs = 0
+
+    def user_rows(self) -> Iterator[dict]:
+        rng = self.rng
+        for user_id in range(1, self.users + 1):
+            given, surname, city = rng.choice(GIVEN_NAMES), rng.choice(SURNAMES), rng.choice(CITIES)
+            is_caregiver = rng.random() < self.caregiver_share
+            (self.caregiver_ids if is_caregiver else self.member_ids).append(user_id)
+            self.cities.append(CITIES.index(city))
+            yield {
+                "user_id": user_id,
+                "email": f"{given}.{surname}.{user_id}@example.com".lower(),
+                "given_name": given,
+                "surname": surname,
+                "city": city,
+                "phone_number": f"+7701{rng.randrange(10**7):07d}",
+                "profile_description": (
+                    f"{'Caregiver' if is_caregiver else 'Family'} based in {city}."
+                ),
+                "password": f"password{user_id}",
+            }
+
+    def caregiver_rows(self) -> Iterator[dict]:
+        rng = self.rng
+        for caregiver_id in self.caregiver_ids:
+            kind = rng.choice(list(CAREGIVING_TYPES))
+            low, high = CAREGIVING_TYPES[kind]
+            self.caregivers_by_type[kind].append(caregiver_id)
+            yield {
+                "caregiver_user_id": caregiver_id,
+                "photo": f"caregiver_{caregiver_id}.jpg",
+                "gender": rng.choice(("Female", "Male")),
+                "caregiving_type": kind,
+                "hourly_rate": round(rng.uniform(low, high) * 2) / 2,
+            }
+
+    def member_rows(self) -> Iterator[dict]:
+        rng = self.rng
+        for member_id in self.member_ids:
+            kind = rng.choice(TYPE_NAMES)
+            self.member_type.append(TYPE_NAMES.index(kind))
+            yield {
+                "member_user_id": member_id,
+                "house_rules": " ".join(rng.sample(HOUSE_RULES, 2)),
+                "dependent_description": rng.choice(DEPENDENTS[kind]).format(age=rng.randint(1, 12)),
+            }
+
+    def address_rows(self) -> Iterator[dict]:
+        rng = self.rng
+        for member_id in self.member_ids:
+            town = CITIES[self.cities[member_id - 1]] if rng.random() < 0.9 else rng.choice(CITIES)
+            yield {
+                "member_user_id": member_id,
+                "house_number": str(rng.randint(1, 250)),
+                "street": rng.choice(STREETS),
+                "town": town,
+            }
+
+    def job_rows(self) -> Iterator[dict]:
+        rng = self.rng
+        for member_id, kind in zip(self.member_ids, self.member_type):
+            for _ in range(rng.choice((0, 1, 1, 2, 3))):
+                self.jobs += 1
+                yield {
+                    "job_id": self.jobs,
+                    "member_user_id": member_id,
+                    "required_caregiving_type": TYPE_NAMES[kind],
+                    "other_requirements": rng.choice(REQUIREMENTS),
+                    "date_posted": EPOCH + timedelta(days=rng.randrange(700)),
+                }
+
+    def application_rows(self, jobs: List[dict]) -> Iterator[dict]:
+        rng = self.rng
+        for job in jobs:
+            pool = self.caregivers_by_type[job["required_caregiving_type"]]
+            if not pool:
+                continue
+            applicants = {pool[rng.randrange(len(pool))] for _ in range(rng.randint(0, 5))}
+            for caregiver_id in sorted(applicants):
+                yield {
+                    "caregiver_user_id": caregiver_id,
+                    "job_id": job["job_id"],
+                    "date_applied": job["date_posted"] + timedelta(days=rng.randint(0, 30)),
+                }
+
+    def appointment_rows(self) -> Iterator[dict]:
+        """Each caregiver works at most one shift per day, so bookings never overlap."""
+        rng = self.rng
+        # Last booked day offset per caregiver id; 0 means none yet.
+        last_day = array("l", [0]) * (self.users + 1)
+        for member_id, kind in zip(self.member_ids, self.member_type):
+            pool = self.caregivers_by_type[TYPE_NAMES[kind]]
+            if not pool:
+                continue
+            for _ in range(rng.choice((0, 1, 2, 3))):
+                caregiver_id = pool[rng.randrange(len(pool))]
+                first_day = rng.randrange(30)
+                day = (last_day[caregiver_id] or first_day) + rng.randint(1, 7)
+                last_day[caregiver_id] = day
+                yield {
+                    "caregiver_user_id": caregiver_id,
+                    "member_user_id": member_id,
+                    "appointment_date": EPOCH + timedelta(days=day),
+                    "appointment_time": time(rng.randint(7, 13), rng.choice((0, 30))),
+                    "work_hours": rng.randint(1, 8),
+                    "status": rng.choice(STATUSES),
+                }
+
+
+def _chunks(rows: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    batch: List[dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _load(connection, model, rows: Iterator[dict], batch_size: int) -> int:
+    total = 0
+    statement = insert(model.__table__)
+    for batch in _chunks(rows, batch_size):
+        connection.execute(statement, batch)
+        connection.commit()
+        total += len(batch)
+    return total
+
+
+def _sync_sequences(connection) -> None:
+    if connection.dialect.name != "postgresql":
+        return
+    for model in (User, Job, Appointment):
+        table = model.__table__
+        column = table.autoincrement_column
+        connection.execute(
+            select(
+                func.setval(
+                    func.pg_get_serial_sequence(f'"{table.name}"', column.name),
+                    func.coalesce(select(func.max(column)).scalar_subquery(), 1),
+                )
+            )
+        )
+    connection.commit()
+
+
+def generate(
+    users: int,
+    seed: int = 0,
+    caregiver_share: float = 0.4,
+    batch_size: int = 10_000,
+    log: Callable[[str], None] = lambda message: None,
+) -> Dict[str, int]:
+    """Populate empty tables with ``users`` users and related rows.
+
+    Must run inside an app context. Returns the number of rows per table.
+    """
+    generator = Generator(users, seed, caregiver_share)
+    counts: Dict[str, int] = {}
+    with db.engine.connect() as connection:
+        if connection.execute(select(User.user_id).limit(1)).first() is not None:
+            raise RuntimeError("Database already contains users; use --reset to regenerate.")
+        counts["user"] = _load(connection, User, generator.user_rows(), batch_size)
+        log(f"user: {counts['user']}")
+        counts["caregiver"] = _load(connection, Caregiver, generator.caregiver_rows(), batch_size)
+        counts["member"] = _load(connection, Member, generator.member_rows(), batch_size)
+        counts["address"] = _load(connection, Address, generator.address_rows(), batch_size)
+        log(f"caregiver: {counts['caregiver']}, member: {counts['member']}, address: {counts['address']}")
+
+        # Applications are drawn per chunk of jobs so only one chunk is held.
+        counts["job"] = counts["job_application"] = 0
+        for jobs in _chunks(generator.job_rows(), batch_size):
+            counts["job"] += _load(connection, Job, iter(jobs), batch_size)
+            counts["job_application"] += _load(
+                connection, JobApplication, generator.application_rows(jobs), batch_size
+            )
+        log(f"job: {counts['job']}, job_application: {counts['job_application']}")
+        counts["appointment"] = _load(connection, Appointment, generator.appointment_rows(), batch_size)
+        log(f"appointment: {counts['appointment']}")
+        _sync_sequences(connection)
+
+    publish([WriteEvent(model, "bulk", ()) for model in (User, Caregiver, Member, Address, Job, JobApplication, Appointment)])
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from .app import create_app
+
+    parser = argparse.ArgumentParser(description="Generate synthetic caregiver platform data.")
+    parser.add_argument("--users", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--caregiver-share", type=float, default=0.4)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate all tables first.")
+    args = parser.parse_args(argv)
+
+    app = create_app()
+    with app.app_context():
+        if args.reset:
+            # Recreating the tables drops the search triggers; loading without
+            # them and indexing once afterwards is also faster.
+            db.drop_all()
+            db.create_all()
+        generate(args.users, args.seed, args.caregiver_share, args.batch_size, log=print)
+        if args.reset:
+            fulltext.rebuild(db.engine, app.config["FTS_LANGUAGE"])
+
+
+if __name__ == "__main__":
+    main()
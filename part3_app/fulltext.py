@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+import click
+from flask import Blueprint, abort, current_app, jsonify, request, url_for
+from sqlalchemy import inspect, text
+
+from .models import db
+
+bp = Blueprint("fulltext", __name__, cli_group=None)
+
+TABLE = "fts_document"
+
+# Indexed sources. "slot" keeps SQLite rowids (ref * SLOTS + slot) unique
+# across kinds so trigger updates and deletes are rowid lookups.
+DOCUMENTS: Dict[str, Dict[str, Any]] = {
+    "user": {
+        "table": "user",
+        "key": "user_id",
+        "columns": ["given_name", "surname", "city", "profile_description"],
+        "resource": "users",
+        "slot": 1,
+    },
+    "member": {
+        "table": "member",
+        "key": "member_user_id",
+        "columns": ["house_rules", "dependent_description"],
+        "resource": "members",
+        "slot": 2,
+    },
+    "job": {
+        "table": "job",
+        "key": "job_id",
+        "columns": ["required_caregiving_type", "other_requirements"],
+        "resource": "jobs",
+        "slot": 3,
+    },
+}
+SLOTS = 4
+
+
+def _body(row: str, columns: List[str]) -> str:
+    return " || ' ' || ".join(f"coalesce({row}.{column}, '')" for column in columns)
+
+
+def _sqlite_ddl() -> List[str]:
+    """FTS5 table keyed by rowid = ref * SLOTS + slot, maintained by triggers."""
+    statements = [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+        "kind UNINDEXED, ref UNINDEXED, body, tokenize='porter unicode61')"
+    ]
+    for kind, spec in DOCUMENTS.items():
+        key, slot, table = spec["key"], spec["slot"], spec["table"]
+        insert = (
+            f"INSERT INTO {TABLE}(rowid, kind, ref, body) VALUES "
+            f"(new.{key} * {SLOTS} + {slot}, '{kind}', new.{key}, {_body('new', spec['columns'])});"
+        )
+        delete = f"DELETE FROM {TABLE} WHERE rowid = old.{key} * {SLOTS} + {slot};"
+        statements += [
+            f'CREATE TRIGGER IF NOT EXISTS {TABLE}_{kind}_ai AFTER INSERT ON "{table}" BEGIN {insert} END',
+            f'CREATE TRIGGER IF NOT EXISTS {TABLE}_{kind}_au AFTER UPDATE ON "{table}" BEGIN {delete} {insert} END',
+            f'CREATE TRIGGER IF NOT EXISTS {TABLE}_{kind}_ad AFTER DELETE ON "{table}" BEGIN {delete} END',
+        ]
+    return statements
+
+
+def _postgresql_ddl(language: str) -> List[str]:
+    """tsvector table with a GIN index, maintained by one trigger per source."""
+    statements = [
+        f"CREATE TABLE IF NOT EXISTS {TABLE} ("
+        "kind VARCHAR(16) NOT NULL, ref INTEGER NOT NULL, body TEXT NOT NULL, "
+        f"tsv tsvector GENERATED ALWAYS AS (to_tsvector('{language}', body)) STORED, "
+        "PRIMARY KEY (kind, ref))",
+        f"CREATE INDEX IF NOT EXISTS ix_{TABLE}_tsv ON {TABLE} USING GIN (tsv)",
+    ]
+    for kind, spec in DOCUMENTS.items():
+        key, table, function = spec["key"], spec["table"], f"{TABLE}_{kind}_sync"
+        statements += [
+            f"""CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM {TABLE} WHERE kind = '{kind}' AND ref = OLD.{key};
+        RETURN OLD;
+    END IF;
+    INSERT INTO {TABLE} (kind, ref, body) VALUES ('{kind}', NEW.{key}, {_body('NEW', spec['columns'])})
+    ON CONFLICT (kind, ref) DO UPDATE SET body = EXCLUDED.body;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql""",
+            f'DROP TRIGGER IF EXISTS {function} ON "{table}"',
+            f'CREATE TRIGGER {function} AFTER INSERT OR UPDATE OR DELETE ON "{table}" '
+            f"FOR EACH ROW EXECUTE FUNCTION {function}()",
+        ]
+    return statements
+
+
+def _backfill(connection) -> None:
+    connection.exec_driver_sql(f"DELETE FROM {TABLE}")
+    for kind, spec in DOCUMENTS.items():
+        key, table = spec["key"], spec["table"]
+        source = f'"{table}" AS src'
+        if connection.dialect.name == "sqlite":
+            connection.exec_driver_sql(
+                f"INSERT INTO {TABLE}(rowid, kind, ref, body) SELECT "
+                f"src.{key} * {SLOTS} + {spec['slot']}, '{kind}', src.{key}, "
+                f"{_body('src', spec['columns'])} FROM {source}"
+            )
+        else:
+            connection.exec_driver_sql(
+                f"INSERT INTO {TABLE} (kind, ref, body) SELECT '{kind}', src.{key}, "
+                f"{_body('src', spec['columns'])} FROM {source}"
+            )
+
+
+def install(engine, language: str = "english") -> None:
+    """Create the search table and triggers; backfill if the table is new."""
+    dialect = engine.dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        return
+    statements = _sqlite_ddl() if dialect == "sqlite" else _postgresql_ddl(language)
+    with engine.begin() as connection:
+        created = not inspect(connection).has_table(TABLE)
+        for statement in statements:
+            connection.exec_driver_sql(statement)
+        if created:
+            _backfill(connection)
+
+
+def _sqlite_query(terms: List[str]) -> str:
+    # Quote every term so user input can't use FTS5 query syntax.
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def search(query: str, kinds: Optional[List[str]] = None, limit: int = 20) -> List[Dict[str, Any]]:
+    terms = query.split()
+    if not terms:
+        return []
+    kinds = [kind for kind in (kinds or DOCUMENTS) if kind in DOCUMENTS]
+    if not kinds:
+        return []
+    params: Dict[str, Any] = {"limit": limit}
+    kind_filter = ", ".join(f":kind{index}" for index in range(len(kinds)))
+    params.update({f"kind{index}": kind for index, kind in enumerate(kinds)})
+
+    if db.engine.dialect.name == "sqlite":
+        params["query"] = _sqlite_query(terms)
+        statement = text(
+            f"SELECT kind, ref, snippet({TABLE}, 2, '[', ']', '...', 12) AS snippet, "
+            f"bm25({TABLE}) AS score FROM {TABLE} "
+            f"WHERE {TABLE} MATCH :query AND kind IN ({kind_filter}) ORDER BY score LIMIT :limit"
+        )
+    else:
+        params["query"] = " ".join(terms)
+        params["language"] = current_app.config["FTS_LANGUAGE"]
+        statement = text(
+            "SELECT kind, ref, ts_headline(CAST(:language AS regconfig), body, query, "
+            "'StartSel=[, StopSel=], MaxFragments=1') AS snippet, "
+            "-ts_rank(tsv, query) AS score "
+            f"FROM {TABLE}, websearch_to_tsquery(CAST(:language AS regconfig), :query) AS query "
+            f"WHERE tsv @@ query AND kind IN ({kind_filter}) ORDER BY score LIMIT :limit"
+        )
+    return [
+        {
+            "kind": row.kind,
+            "ref": row.ref,
+            "snippet": row.snippet,
+            "rank": round(-row.score, 4),
+            "url": url_for(
+                f"{DOCUMENTS[row.kind]['resource']}_edit",
+                **{DOCUMENTS[row.kind]["key"]: row.ref},
+            ),
+        }
+        for row in db.session.execute(statement, params)
+    ]
+
+
+def rebuild(engine, language: str = "english") -> None:
+    """Ensure the schema exists and regenerate every document from scratch."""
+    install(engine, language)
+    with engine.begin() as connection:
+        _backfill(connection)
+
+
+@bp.route("/search")
+def search_view():
+    query = request.args.get("q", "")
+    limit = request.args.get("limit", 20, type=int)
+    if not query.strip() or not 0 < limit <= 100:
+        abort(400)
+    return jsonify(search(query, request.args.getlist("kind"), limit))
+
+
+@bp.cli.command("fts-rebuild")
+def rebuild_command():
+    """Recreate the full-text search documents from the source tables."""
+    rebuild(db.engine, current_app.config["FTS_LANGUAGE"])
+    click.echo("Full-text index rebuilt.")
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional
+
+from flask import Blueprint, current_app, g, has_request_context, render_template, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .models import db
+from .resources import RESOURCES
+
+bp = Blueprint("debug", __name__, url_prefix="/_debug")
+
+_recent: Deque[Dict[str, Any]] = deque(maxlen=50)
+_recent_lock = threading.Lock()
+
+
+class QueryRecorder:
+    """Statements issued while serving one request."""
+
+    def __init__(self) -> None:
+        self.statements: List[Dict[str, Any]] = []
+        self.started = time.perf_counter()
+        self.explaining = False
+        # Kept here: a streamed body is summarised after the request is gone.
+        self.method = request.method
+        self.path = request.full_path.rstrip("?")
+
+    @property
+    def total_ms(self) -> float:
+        return sum(s["duration_ms"] for s in self.statements)
+
+    def summary(self, slow_count: int, repeat_threshold: int) -> Dict[str, Any]:
+        repeats = Counter(s["statement"] for s in self.statements)
+        return {
+            "method": self.method,
+            "path": self.path,
+            "count": len(self.statements),
+            "db_ms": round(self.total_ms, 3),
+            "request_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "slowest": sorted(self.statements, key=lambda s: s["duration_ms"], reverse=True)[:slow_count],
+            "repeated": [
+                {"statement": statement, "count": count}
+                for statement, count in repeats.most_common()
+                if count >= repeat_threshold
+            ],
+        }
+
+
+def _recorder() -> Optional[QueryRecorder]:
+    if not has_request_context():
+        return None
+    recorder = g.get("_sql_recorder")
+    if recorder is None or recorder.explaining:
+        return None
+    return recorder
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _recorder() is not None:
+        context._sql_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    recorder = _recorder()
+    started = getattr(context, "_sql_started", None)
+    if recorder is None or started is None:
+        return
+    recorder.statements.append(
+        {
+            "statement": statement,
+            "parameters": None if executemany else parameters,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            "plan": None,
+        }
+    )
+
+
+def _explain(recorder: QueryRecorder, threshold_ms: float) -> None:
+    prefix = "EXPLAIN QUERY PLAN " if db.engine.dialect.name == "sqlite" else "EXPLAIN "
+    recorder.explaining = True
+    try:
+        for entry in recorder.statements:
+            if entry["duration_ms"] < threshold_ms or entry["parameters"] is None:
+                continue
+            if not entry["statement"].lstrip().upper().startswith("SELECT"):
+                continue
+            with db.engine.connect() as connection:
+                rows = connection.exec_driver_sql(prefix + entry["statement"], entry["parameters"])
+                entry["plan"] = "\n".join(" ".join(str(v) for v in row) for row in rows)
+    finally:
+        recorder.explaining = False
+
+
+def _start_request() -> None:
+    g._sql_recorder = QueryRecorder()
+
+
+def _report(app, recorder: QueryRecorder, response=None) -> None:
+    config = app.config
+    if config["SQL_EXPLAIN_THRESHOLD_MS"] > 0:
+        _explain(recorder, config["SQL_EXPLAIN_THRESHOLD_MS"])
+    summary = recorder.summary(config["SQL_SLOW_STATEMENTS"], config["SQL_REPEAT_THRESHOLD"])
+    if response is not None:
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={summary["db_ms"]};desc="{summary["count"]} queries"',
+        )
+    if summary["repeated"]:
+        app.logger.warning(
+            "%s %s repeated %d statement(s), possible N+1",
+            summary["method"], summary["path"], len(summary["repeated"]),
+        )
+    with _recent_lock:
+        _recent.appendleft(summary)
+
+
+def _finish_request(response):
+    recorder = g.get("_sql_recorder")
+    if recorder is None or request.blueprint == bp.name:
+        g.pop("_sql_recorder", None)
+        return response
+    app = current_app._get_current_object()
+    if response.is_streamed:
+        # A streamed list page runs its queries while the body is sent, after
+        # this hook, so keep recording and summarise once the response is
+        # closed. Its headers are already sent by then: no Server-Timing.
+        def close() -> None:
+            with app.app_context():
+                _report(app, recorder)
+
+        response.call_on_close(close)
+        return response
+    g.pop("_sql_recorder")
+    _report(app, recorder, response)
+    return response
+
+
+def recent_requests() -> List[Dict[str, Any]]:
+    with _recent_lock:
+        return list(_recent)
+
+
+def init_app(app) -> None:
+    """Record per-request SQL when SQL_INSTRUMENTATION is on; no-op otherwise."""
+    if not app.config["SQL_INSTRUMENTATION"]:
+        return
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    if app.config["SQL_DEBUG_PAGE"]:
+        app.register_blueprint(bp)
+
+
+@bp.route("/queries")
+def queries():
+    return render_template("debug_queries.html", requests=recent_requests(), resources=RESOURCES)
@@ -0,0 +1,430 @@
+"""Batch matching of open jobs to caregivers.
+
+Every open job is scored against every caregiver of its required type (any
+caregiver when the job names no type)::
+
+    score = CITY_WEIGHT   if the caregiver's city is the member's town
+          + APPLIED_WEIGHT if the caregiver already applied to the job
+          + RATE_WEIGHT * RATE_REFERENCE / (RATE_REFERENCE + hourly_rate)
+
+Attributes are held as NumPy arrays (strings as integer codes, caregivers
+sorted by type so each type is one contiguous slice) and jobs are scored in
+blocks sharing a (type, town). Every weight is non-negative, so only the k
+best-rated caregivers of the type and of the town, plus each job's
+applicants, can reach its top ``MATCH_TOP_K``: a block is scored against
+those columns instead of every caregiver. Committed writes refresh
+incrementally: changed jobs are rescored alone, and a changed caregiver only
+rescores the jobs it could enter or leave the top-k of. NumPy is imported on
+first use, so the app still starts (and serves everything else) without it.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import click
+from flask import Blueprint, abort, current_app, jsonify, request
+from sqlalchemy import or_, select
+
+from .models import Address, Caregiver, Job, JobApplication, Member, User, db
+from .replicas import use_primary
+from .write_events import WriteEvent, subscribe
+
+bp = Blueprint("matching", __name__, cli_group=None)
+
+CITY_WEIGHT = 1.0
+APPLIED_WEIGHT = 0.5
+RATE_WEIGHT = 0.5
+RATE_REFERENCE = 10.0
+# Ties go to the lower caregiver id; far below any rate difference of a cent.
+_TIE_BREAK = 1e-13
+_BLOCK = 4096
+_CHUNK = 500
+_ANY = -1
+_NO_TOWN = -1
+_NO_CITY = -2
+_TRACKED = (Address, Caregiver, Job, JobApplication, Member, User)
+
+
+class MatchingUnavailable(RuntimeError):
+    """Raised when job matching is used without NumPy installed."""
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise MatchingUnavailable("Job matching needs NumPy: pip install numpy") from None
+    return numpy
+
+
+def _chunks(ids: Iterable[int]) -> Iterable[List[int]]:
+    ids = sorted(ids)
+    for start in range(0, len(ids), _CHUNK):
+        yield ids[start:start + _CHUNK]
+
+
+class CaregiverMatcher:
+    """Top-k caregivers for every open job, kept current by write events."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._stale_jobs: Set[int] = set()
+        self._stale_members: Set[int] = set()
+        self._stale_caregivers: Set[int] = set()
+        self._codes: Dict[str, int] = {}
+        self.top_k = 10
+        self.open_days = 0
+        self.np = None
+
+    def init_app(self, app) -> None:
+        self.reset()
+        self.top_k = app.config["MATCH_TOP_K"]
+        self.open_days = app.config["MATCH_OPEN_DAYS"]
+        subscribe(self._on_write)
+
+    def reset(self) -> None:
+        """Forget all matches and pending changes, e.g. before serving another app."""
+        with self._lock:
+            self._loaded = False
+            self._stale_jobs.clear()
+            self._stale_members.clear()
+            self._stale_caregivers.clear()
+            self._codes.clear()
+
+    def invalidate(self) -> None:
+        """Drop all matches so the next lookup rescores from the database."""
+        with self._lock:
+            self._loaded = False
+
+    def matches(self, job_id: int) -> Optional[List[Dict[str, Any]]]:
+        """Best caregivers for ``job_id``, or None if it is not an open job."""
+        with self._lock:
+            self._sync()
+            row = self._job_row(job_id)
+            if row is None:
+                return None
+            return self._results(row)
+
+    def rebuild(self) -> Dict[str, Any]:
+        """Rescore every open job; returns counts and the time taken."""
+        started = time.perf_counter()
+        with self._lock:
+            self._loaded = False
+            self._sync()
+            return {
+                "jobs": len(self.job_ids),
+                "caregivers": len(self.cg_ids),
+                "seconds": round(time.perf_counter() - started, 3),
+            }
+
+    def all_matches(self) -> Iterable[Dict[str, Any]]:
+        with self._lock:
+            self._sync()
+            return [
+                {"job_id": int(job_id), "matches": self._results(row)}
+                for row, job_id in enumerate(self.job_ids)
+            ]
+
+    # Loading
+
+    def _code(self, value: Optional[str], missing: int) -> int:
+        if value is None:
+            return missing
+        return self._codes.setdefault(value, len(self._codes))
+
+    def _sync(self) -> None:
+        if self.np is None:
+            self.np = _numpy()
+        # Matches are shared by every request, so read them from the primary.
+        with use_primary():
+            if not self._loaded:
+                self._stale_jobs.clear()
+                self._stale_members.clear()
+                self._stale_caregivers.clear()
+                self._store_caregivers(*self._caregiver_arrays(db.session.execute(self._caregiver_statement())))
+                self._store_jobs(*self._job_arrays(db.session.execute(self._job_statement())))
+                self._store_applications(*self._application_arrays(db.session.execute(self._application_statement())))
+                self._rescore(self.np.arange(len(self.job_ids)))
+                self._loaded = True
+                return
+            if self._stale_members:
+                members, self._stale_members = self.np.array(sorted(self._stale_members)), set()
+                self._stale_jobs.update(self.job_ids[self.np.isin(self.job_member, members)].tolist())
+            if self._stale_jobs:
+                stale, self._stale_jobs = self._stale_jobs, set()
+                self._refresh_jobs(stale)
+            if self._stale_caregivers:
+                stale, self._stale_caregivers = self._stale_caregivers, set()
+                self._refresh_caregivers(stale)
+
+    def _caregiver_statement(self):
+        return select(
+            Caregiver.caregiver_user_id,
+            Caregiver.caregiving_type,
+            User.city,
+            Caregiver.hourly_rate,
+        ).join(User, User.user_id == Caregiver.caregiver_user_id)
+
+    def _job_statement(self):
+        statement = select(
+            Job.job_id, Job.required_caregiving_type, Address.town, Job.member_user_id
+        ).outerjoin(Address, Address.member_user_id == Job.member_user_id)
+        if self.open_days:
+            since = date.today() - timedelta(days=self.open_days)
+            statement = statement.where(or_(Job.date_posted.is_(None), Job.date_posted >= since))
+        return statement
+
+    def _application_statement(self):
+        return select(JobApplication.job_id, JobApplication.caregiver_user_id)
+
+    def _caregiver_arrays(self, rows):
+        np = self.np
+        rows = list(rows)
+        ids = np.fromiter((row[0] for row in rows), np.int64, len(rows))
+        types = np.fromiter((self._code(row[1], _ANY) for row in rows), np.int32, len(rows))
+        cities = np.fromiter((self._code(row[2], _NO_CITY) for row in rows), np.int32, len(rows))
+        rates = np.fromiter((float("nan") if row[3] is None else row[3] for row in rows), np.float64, len(rows))
+        base = np.nan_to_num(RATE_WEIGHT * RATE_REFERENCE / (RATE_REFERENCE + rates)) - ids * _TIE_BREAK
+        return ids, types, cities, base
+
+    def _job_arrays(self, rows):
+        np = self.np
+        rows = list(rows)
+        ids = np.fromiter((row[0] for row in rows), np.int64, len(rows))
+        types = np.fromiter((self._code(row[1], _ANY) for row in rows), np.int32, len(rows))
+        towns = np.fromiter((self._code(row[2], _NO_TOWN) for row in rows), np.int32, len(rows))
+        members = np.fromiter((row[3] for row in rows), np.int64, len(rows))
+        return ids, types, towns, members
+
+    def _application_arrays(self, rows):
+        pairs = self.np.array(list(rows), self.np.int64).reshape(-1, 2)
+        return pairs[:, 0], pairs[:, 1]
+
+    def _store_caregivers(self, ids, types, cities, base) -> None:
+        order = self.np.lexsort((ids, types))
+        self.cg_ids, self.cg_type, self.cg_city, self.cg_base = ids[order], types[order], cities[order], base[order]
+        self._by_id = self.np.argsort(self.cg_ids)
+        codes, starts = self.np.unique(self.cg_type, return_index=True)
+        ends = list(starts[1:]) + [len(self.cg_type)]
+        self._slices = {int(code): slice(int(start), int(end)) for code, start, end in zip(codes, starts, ends)}
+
+    def _store_jobs(self, ids, types, towns, members, top_ids=None, top_scores=None) -> None:
+        np = self.np
+        if top_ids is None:
+            top_ids = np.full((len(ids), self.top_k), -1, np.int64)
+            top_scores = np.full((len(ids), self.top_k), -np.inf)
+        order = np.argsort(ids)
+        self.job_ids, self.job_type, self.job_town, self.job_member = ids[order], types[order], towns[order], members[order]
+        self.top_ids, self.top_scores = top_ids[order], top_scores[order]
+
+    def _store_applications(self, jobs, caregivers) -> None:
+        order = self.np.argsort(jobs, kind="stable")
+        self.app_job, self.app_cg = jobs[order], caregivers[order]
+
+    def _job_row(self, job_id: int) -> Optional[int]:
+        row = int(self.np.searchsorted(self.job_ids, job_id))
+        return row if row < len(self.job_ids) and self.job_ids[row] == job_id else None
+
+    def _results(self, row: int) -> List[Dict[str, Any]]:
+        return [
+            {"caregiver_user_id": int(caregiver_id), "score": round(float(score), 4)}
+            for caregiver_id, score in zip(self.top_ids[row], self.top_scores[row])
+            if caregiver_id >= 0
+        ]
+
+    # Scoring
+
+    def _rescore(self, rows) -> None:
+        """Recompute the top-k of the given (sorted) job rows.
+
+        Jobs are grouped by (type, town) since all jobs in a group share the
+        same candidates; applications are the only per-job difference.
+        """
+        np = self.np
+        if not len(rows):
+            return
+        self.top_ids[rows] = -1
+        self.top_scores[rows] = -np.inf
+        types = self.job_type[rows]
+        for code in np.unique(types):
+            columns = slice(0, len(self.cg_ids)) if code == _ANY else self._slices.get(int(code))
+            if columns is None or columns.start == columns.stop:
+                continue
+            group = rows[types == code]
+            towns = self.job_town[group]
+            for town in np.unique(towns):
+                same_town = group[towns == town]
+                for start in range(0, len(same_town), _BLOCK):
+                    self._score_block(same_town[start:start + _BLOCK], columns, int(town))
+
+    def _best(self, values, k: int):
+        """Indices of the ``k`` largest ``values``, in no particular order."""
+        if len(values) <= k:
+            return self.np.arange(len(values))
+        return self.np.argpartition(values, len(values) - k)[len(values) - k:]
+
+    def _score_block(self, rows, columns: slice, town: int) -> None:
+        np = self.np
+        k = self.top_k
+        # With non-negative weights a non-applicant can only make the top-k
+        # by leading the type, or the job's town, on rate.
+        base = self.cg_base[columns]
+        local = np.flatnonzero(self.cg_city[columns] == town)
+        candidates = np.union1d(self._best(base, k), local[self._best(base[local], k)]) + columns.start
+        scores = np.tile(self.cg_base[candidates] + (self.cg_city[candidates] == town) * CITY_WEIGHT, (len(rows), 1))
+        ids = np.tile(self.cg_ids[candidates], (len(rows), 1))
+
+        # Applicants get a column per application; their candidate cell, if
+        # any, is blanked so nobody is counted twice.
+        job_ids = self.job_ids[rows]
+        applied = np.flatnonzero(np.isin(self.app_job, job_ids))
+        positions = self._columns_of(self.app_cg[applied])
+        eligible = (positions >= columns.start) & (positions < columns.stop)
+        applied, positions = applied[eligible], positions[eligible]
+        app_rows = np.searchsorted(job_ids, self.app_job[applied])
+        index = np.minimum(np.searchsorted(candidates, positions), len(candidates) - 1)
+        hit = candidates[index] == positions
+        scores[app_rows[hit], index[hit]] = -np.inf
+        slots = np.arange(len(app_rows)) - np.searchsorted(app_rows, app_rows)
+        width = int(slots.max()) + 1 if len(slots) else 0
+        app_scores = np.full((len(rows), width), -np.inf)
+        app_ids = np.full((len(rows), width), -1, np.int64)
+        app_scores[app_rows, slots] = (
+            self.cg_base[positions] + (self.cg_city[positions] == town) * CITY_WEIGHT + APPLIED_WEIGHT
+        )
+        app_ids[app_rows, slots] = self.cg_ids[positions]
+        scores, ids = np.hstack([scores, app_scores]), np.hstack([ids, app_ids])
+
+        k = min(k, scores.shape[1])
+        best = np.argpartition(scores, scores.shape[1] - k, axis=1)[:, scores.shape[1] - k:]
+        best_scores = np.take_along_axis(scores, best, axis=1)
+        order = np.argsort(-best_scores, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_ids = np.take_along_axis(np.take_along_axis(ids, best, axis=1), order, axis=1)
+        self.top_ids[rows, :k] = np.where(np.isfinite(best_scores), best_ids, -1)
+        self.top_scores[rows, :k] = best_scores
+
+    def _columns_of(self, caregiver_ids):
+        """Array positions of ``caregiver_ids``; -1 for unknown caregivers."""
+        np = self.np
+        if not len(self.cg_ids):
+            return np.full(len(caregiver_ids), -1, np.int64)
+        by_id = self._by_id
+        found = by_id[np.minimum(np.searchsorted(self.cg_ids[by_id], caregiver_ids), len(by_id) - 1)]
+        return np.where(self.cg_ids[found] == caregiver_ids, found, -1)
+
+    def _rows_of(self, job_ids):
+        """Rows of the open jobs among ``job_ids``."""
+        np = self.np
+        if not len(self.job_ids):
+            return np.zeros(0, np.int64)
+        rows = np.minimum(np.searchsorted(self.job_ids, job_ids), len(self.job_ids) - 1)
+        return rows[self.job_ids[rows] == job_ids]
+
+    # Incremental refresh
+
+    def _refresh_jobs(self, job_ids: Set[int]) -> None:
+        np = self.np
+        stale = np.array(sorted(job_ids), np.int64)
+        keep = ~np.isin(self.job_ids, stale)
+        new = self._job_arrays(
+            row for chunk in _chunks(job_ids) for row in db.session.execute(self._job_statement().where(Job.job_id.in_(chunk)))
+        )
+        added = len(new[0])
+        self._store_jobs(
+            *(np.concatenate([old[keep], fresh]) for old, fresh in zip((self.job_ids, self.job_type, self.job_town, self.job_member), new)),
+            top_ids=np.concatenate([self.top_ids[keep], np.full((added, self.top_k), -1, np.int64)]),
+            top_scores=np.concatenate([self.top_scores[keep], np.full((added, self.top_k), -np.inf)]),
+        )
+        keep = ~np.isin(self.app_job, stale)
+        jobs, caregivers = self._application_arrays(
+            row
+            for chunk in _chunks(job_ids)
+            for row in db.session.execute(self._application_statement().where(JobApplication.job_id.in_(chunk)))
+        )
+        self._store_applications(np.concatenate([self.app_job[keep], jobs]), np.concatenate([self.app_cg[keep], caregivers]))
+        self._rescore(self._rows_of(stale))
+
+    def _refresh_caregivers(self, caregiver_ids: Set[int]) -> None:
+        np = self.np
+        stale = np.array(sorted(caregiver_ids), np.int64)
+        keep = ~np.isin(self.cg_ids, stale)
+        statement = self._caregiver_statement()
+        changed = self._caregiver_arrays(
+            row for chunk in _chunks(caregiver_ids) for row in db.session.execute(statement.where(Caregiver.caregiver_user_id.in_(chunk)))
+        )
+        self._store_caregivers(
+            *(np.concatenate([old[keep], new]) for old, new in zip((self.cg_ids, self.cg_type, self.cg_city, self.cg_base), changed))
+        )
+
+        # A job's top-k only moves if a changed caregiver was in it or now beats its k-th score.
+        affected = np.isin(self.top_ids, stale).any(axis=1)
+        for caregiver_id, type_code, city, base in zip(*changed):
+            scores = (self.job_town == city) * CITY_WEIGHT + base
+            scores[self._rows_of(self.app_job[self.app_cg == caregiver_id])] += APPLIED_WEIGHT
+            eligible = (self.job_type == type_code) | (self.job_type == _ANY)
+            affected |= eligible & (scores > self.top_scores[:, -1])
+        self._rescore(np.flatnonzero(affected))
+
+    def _on_write(self, events: List[WriteEvent]) -> None:
+        if any(write.op == "bulk" and write.model in _TRACKED for write in events):
+            self.invalidate()
+            return
+        jobs: Set[int] = set()
+        members: Set[int] = set()
+        caregivers: Set[int] = set()
+        # Cascaded deletes are covered by their parent's event: a deleted
+        # user, member or caregiver drops its jobs, address and applications.
+        for write in events:
+            if write.model is Job and write.op != "cascade":
+                jobs.add(write.pk[0])
+            elif write.model is JobApplication and write.op != "cascade":
+                jobs.add(write.pk[1])
+            elif write.model in (Address, Member) and write.op != "cascade":
+                members.add(write.pk[0])
+            elif write.model is Caregiver and write.op != "cascade":
+                caregivers.add(write.pk[0])
+            elif write.model is User and write.op == "update":
+                caregivers.add(write.pk[0])
+            elif write.model is User and write.op == "delete":
+                caregivers.add(write.pk[0])
+                members.add(write.pk[0])
+        if jobs or members or caregivers:
+            with self._lock:
+                self._stale_jobs |= jobs
+                self._stale_members |= members
+                self._stale_caregivers |= caregivers
+
+
+matcher = CaregiverMatcher()
+
+
+@bp.route("/jobs/<int:job_id>/matches")
+def job_matches(job_id):
+    try:
+        results = matcher.matches(job_id)
+    except MatchingUnavailable as exc:
+        abort(503, description=str(exc))
+    if results is None:
+        abort(404)
+    limit = request.args.get("limit", len(results), type=int)
+    return jsonify({"job_id": job_id, "matches": results[:max(0, limit)]})
+
+
+@bp.cli.command("match-jobs")
+@click.option("--output", type=click.File("w"), help="Write one JSON line of matches per job.")
+def match_command(output):
+    """Rescore every open job against every caregiver."""
+    summary = matcher.rebuild()
+    click.echo(
+        f"Matched {summary['jobs']} jobs against {summary['caregivers']} caregivers "
+        f"in {summary['seconds']:.2f}s (top {current_app.config['MATCH_TOP_K']})."
+    )
+    if output is not None:
+        for record in matcher.all_matches():
+            output.write(json.dumps(record) + "\n")
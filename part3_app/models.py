@@ -1,7 +1,9 @@
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import validates
 
-db = SQLAlchemy()
+from .replicas import RoutingSession
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 
 class User(db.Model):
@@ -17,10 +19,18 @@ class User(db.Model):
     password = db.Column(db.String(255), nullable=False)
 
     caregiver = db.relationship(
-        "Caregiver", back_populates="user", uselist=False, cascade="all, delete"
+        "Caregiver",
+        back_populates="user",
+        uselist=False,
+        cascade="all, delete",
+        passive_deletes=True,
     )
     member = db.relationship(
-        "Member", back_populates="user", uselist=False, cascade="all, delete"
+        "Member",
+        back_populates="user",
+        uselist=False,
+        cascade="all, delete",
+        passive_deletes=True,
     )
 
     @validates("email")
@@ -32,9 +42,10 @@ class User(db.Model):
 
 class Caregiver(db.Model):
     __tablename__ = "caregiver"
+    __table_args__ = (db.Index("ix_caregiver_type_rate", "caregiving_type", "hourly_rate"),)
 
     caregiver_user_id = db.Column(
-        db.Integer, db.ForeignKey("user.user_id"), primary_key=True
+        db.Integer, db.ForeignKey("user.user_id", ondelete="CASCADE"), primary_key=True
     )
     photo = db.Column(db.String(255))
     gender = db.Column(db.String(20))
@@ -46,11 +57,25 @@ class Caregiver(db.Model):
         "JobApplication",
         back_populates="caregiver",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     appointments = db.relationship(
         "Appointment",
         back_populates="caregiver",
         cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+    archived_job_applications = db.relationship(
+        "JobApplicationArchive",
+        back_populates="caregiver",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+    archived_appointments = db.relationship(
+        "AppointmentArchive",
+        back_populates="caregiver",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
 
@@ -58,22 +83,36 @@ class Member(db.Model):
     __tablename__ = "member"
 
     member_user_id = db.Column(
-        db.Integer, db.ForeignKey("user.user_id"), primary_key=True
+        db.Integer, db.ForeignKey("user.user_id", ondelete="CASCADE"), primary_key=True
     )
     house_rules = db.Column(db.Text)
     dependent_description = db.Column(db.Text)
 
     user = db.relationship("User", back_populates="member")
     address = db.relationship(
-        "Address", back_populates="member", uselist=False, cascade="all, delete-orphan"
+        "Address",
+        back_populates="member",
+        uselist=False,
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     jobs = db.relationship(
-        "Job", back_populates="member", cascade="all, delete-orphan"
+        "Job",
+        back_populates="member",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     appointments = db.relationship(
         "Appointment",
         back_populates="member",
         cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+    archived_appointments = db.relationship(
+        "AppointmentArchive",
+        back_populates="member",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
 
@@ -81,7 +120,7 @@ class Address(db.Model):
     __tablename__ = "address"
 
     member_user_id = db.Column(
-        db.Integer, db.ForeignKey("member.member_user_id"), primary_key=True
+        db.Integer, db.ForeignKey("member.member_user_id", ondelete="CASCADE"), primary_key=True
     )
     house_number = db.Column(db.String(20))
     street = db.Column(db.String(100))
@@ -92,10 +131,14 @@ class Address(db.Model):
 
 class Job(db.Model):
     __tablename__ = "job"
+    __table_args__ = (
+        db.Index("ix_job_member", "member_user_id"),
+        db.Index("ix_job_type_posted", "required_caregiving_type", "date_posted"),
+    )
 
     job_id = db.Column(db.Integer, primary_key=True)
     member_user_id = db.Column(
-        db.Integer, db.ForeignKey("member.member_user_id"), nullable=False
+        db.Integer, db.ForeignKey("member.member_user_id", ondelete="CASCADE"), nullable=False
     )
     required_caregiving_type = db.Column(db.String(50))
     other_requirements = db.Column(db.Text)
@@ -106,15 +149,24 @@ class Job(db.Model):
         "JobApplication",
         back_populates="job",
         cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+    archived_applications = db.relationship(
+        "JobApplicationArchive",
+        back_populates="job",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
 
 class JobApplication(db.Model):
     __tablename__ = "job_application"
+    __table_args__ = (db.Index("ix_job_application_job", "job_id"),)
+
     caregiver_user_id = db.Column(
-        db.Integer, db.ForeignKey("caregiver.caregiver_user_id"), primary_key=True
+        db.Integer, db.ForeignKey("caregiver.caregiver_user_id", ondelete="CASCADE"), primary_key=True
     )
-    job_id = db.Column(db.Integer, db.ForeignKey("job.job_id"), primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey("job.job_id", ondelete="CASCADE"), primary_key=True)
     date_applied = db.Column(db.Date)
 
     caregiver = db.relationship("Caregiver", back_populates="job_applications")
@@ -123,13 +175,21 @@ class JobApplication(db.Model):
 
 class Appointment(db.Model):
     __tablename__ = "appointment"
+    __table_args__ = (
+        db.Index("ix_appointment_caregiver_date", "caregiver_user_id", "appointment_date"),
+        db.Index("ix_appointment_date_caregiver", "appointment_date", "caregiver_user_id"),
+        db.Index("ix_appointment_member", "member_user_id"),
+        db.Index("ix_appointment_status_date", "status", "appointment_date"),
+        # Never hand out an id again once its row has moved to the archive.
+        {"sqlite_autoincrement": True},
+    )
 
     appointment_id = db.Column(db.Integer, primary_key=True)
     caregiver_user_id = db.Column(
-        db.Integer, db.ForeignKey("caregiver.caregiver_user_id"), nullable=False
+        db.Integer, db.ForeignKey("caregiver.caregiver_user_id", ondelete="CASCADE"), nullable=False
     )
     member_user_id = db.Column(
-        db.Integer, db.ForeignKey("member.member_user_id"), nullable=False
+        db.Integer, db.ForeignKey("member.member_user_id", ondelete="CASCADE"), nullable=False
     )
     appointment_date = db.Column(db.Date)
     appointment_time = db.Column(db.Time)
@@ -139,3 +199,46 @@ class Appointment(db.Model):
     caregiver = db.relationship("Caregiver", back_populates="appointments")
     member = db.relationship("Member", back_populates="appointments")
 
+
+# Cold tier: rows moved out of the hot tables by ``part3_app.archive``. Same
+# columns and cascading foreign keys, but only the indexes that cold reads
+# (list views, reports, cascades, booking checks) need.
+
+
+class JobApplicationArchive(db.Model):
+    __tablename__ = "job_application_archive"
+    __table_args__ = (db.Index("ix_job_application_archive_job", "job_id"),)
+
+    caregiver_user_id = db.Column(
+        db.Integer, db.ForeignKey("caregiver.caregiver_user_id", ondelete="CASCADE"), primary_key=True
+    )
+    job_id = db.Column(db.Integer, db.ForeignKey("job.job_id", ondelete="CASCADE"), primary_key=True)
+    date_applied = db.Column(db.Date)
+
+    caregiver = db.relationship("Caregiver", back_populates="archived_job_applications")
+    job = db.relationship("Job", back_populates="archived_applications")
+
+
+class AppointmentArchive(db.Model):
+    __tablename__ = "appointment_archive"
+    __table_args__ = (
+        db.Index("ix_appointment_archive_caregiver_date", "caregiver_user_id", "appointment_date"),
+        db.Index("ix_appointment_archive_date_caregiver", "appointment_date", "caregiver_user_id"),
+        db.Index("ix_appointment_archive_member", "member_user_id"),
+        {"info": {"archive_of": "appointment"}},
+    )
+
+    appointment_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    caregiver_user_id = db.Column(
+        db.Integer, db.ForeignKey("caregiver.caregiver_user_id", ondelete="CASCADE"), nullable=False
+    )
+    member_user_id = db.Column(
+        db.Integer, db.ForeignKey("member.member_user_id", ondelete="CASCADE"), nullable=False
+    )
+    appointment_date = db.Column(db.Date)
+    appointment_time = db.Column(db.Time)
+    work_hours = db.Column(db.Integer)
+    status = db.Column(db.String(20))
+
+    caregiver = db.relationship("Caregiver", back_populates="archived_appointments")
+    member = db.relationship("Member", back_populates="archived_appointments")
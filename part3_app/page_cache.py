@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+from flask import Response, current_app, request, session
+
+from .replicas import replica_router
+from .write_events import WriteEvent, subscribe
+
+
+class MemoryBackend:
+    """Per-process LRU. Fine for one worker; use a shared backend otherwise.
+
+    Versions only move on this process's writes, so they expire with
+    ``PAGE_CACHE_TTL`` too: with several workers a page, or a 304 for it, is
+    at most that many seconds stale.
+    """
+
+    def __init__(self, max_entries: int = 512) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[object, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def get_many(self, keys: List[str]) -> List[Optional[object]]:
+        return [self.get(key) for key in keys]
+
+    def set(self, key: str, value, ttl: Optional[int] = None) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl if ttl else None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def add(self, key: str, value, ttl: Optional[int] = None) -> None:
+        if self.get(key) is not None:
+            return
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (value, time.monotonic() + ttl if ttl else None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value, expires_at = self._entries.get(key, (0, None))
+            self._entries[key] = (int(value) + 1, expires_at)
+            return int(value) + 1
+
+
+class RedisBackend:
+    """Shared backend so every gunicorn worker sees the same versions/pages."""
+
+    def __init__(self, url: str) -> None:
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str):
+        return self._client.get(key)
+
+    def get_many(self, keys: List[str]) -> List[Optional[object]]:
+        return self._client.mget(keys)
+
+    def set(self, key: str, value, ttl: Optional[int] = None) -> None:
+        self._client.set(key, value, ex=ttl)
+
+    def add(self, key: str, value, ttl: Optional[int] = None) -> None:
+        self._client.set(key, value, nx=True, ex=ttl)
+
+    def incr(self, key: str) -> int:
+        return self._client.incr(key)
+
+
+class PageCache:
+    """Rendered-page cache and conditional GET keyed by per-table versions.
+
+    Every committed write increments the version of each table it touched
+    and records when it happened. A page's ETag is derived from its URL and
+    the versions of the tables it reads, so deciding between 304, a cached
+    body or a fresh render only needs the cache backend, never the database.
+    Versions are atomic counters rather than clock readings, so writes on
+    different hosts can't produce the same or a lower version.
+    """
+
+    def __init__(self) -> None:
+        self.backend = None
+        self.ttl: Optional[int] = None
+
+    def init_app(self, app, backend=None) -> None:
+        self.reset()
+        if not app.config["PAGE_CACHE_ENABLED"]:
+            return
+        if backend is None:
+            url = app.config["PAGE_CACHE_URL"]
+            backend = RedisBackend(url) if url else MemoryBackend(app.config["PAGE_CACHE_MAX_ENTRIES"])
+        self.backend = backend
+        self.ttl = app.config["PAGE_CACHE_TTL"]
+        subscribe(self._on_write)
+
+    def reset(self) -> None:
+        """Drop the backend, so pages cached for another app are never served."""
+        self.backend = None
+        self.ttl = None
+
+    def versions(self, tables: Iterable[str]) -> Tuple[List[int], int]:
+        """Each table's version and the newest write time (ns) among them."""
+        tables = list(tables)
+        keys = [f"version:{table}" for table in tables] + [f"modified:{table}" for table in tables]
+        values = self.backend.get_many(keys)
+        if any(value is None for value in values):
+            # Counters start from the clock, so one recreated after the cache
+            # was flushed is still above every version handed out before.
+            now = time.time_ns()
+            for key, value in zip(keys, values):
+                if value is None:
+                    self.backend.add(key, now, self.ttl)
+            values = self.backend.get_many(keys)
+        values = [int(value) for value in values]
+        return values[:len(tables)], max(values[len(tables):])
+
+    def bump(self, tables: Iterable[str]) -> None:
+        now = time.time_ns()
+        for table in set(tables):
+            # Seed from the clock first, as in ``versions``, never from zero.
+            self.backend.add(f"version:{table}", now, self.ttl)
+            self.backend.incr(f"version:{table}")
+            self.backend.set(f"modified:{table}", now, self.ttl)
+
+    def _on_write(self, events: List[WriteEvent]) -> None:
+        if self.backend is not None:
+            self.bump(write.model.__table__.name for write in events)
+
+    def _store_after(self, key: str, chunks: Iterable[str]) -> Iterator[str]:
+        """Pass a streamed body through and cache it once fully sent."""
+        body: List[str] = []
+        for chunk in chunks:
+            body.append(chunk)
+            yield chunk
+        self.backend.set(key, "".join(body), self.ttl)
+
+    def serve(
+        self,
+        tables: Iterable[str],
+        render: Callable[[], Union[str, Iterable[str]]],
+        variant: str = "",
+    ) -> Response:
+        """Return a 304, a cached body or a freshly rendered page for this URL.
+
+        ``render`` may return a string or an iterable of chunks; a streamed
+        page is cached after its last chunk has been sent.
+        """
+        # Pages carrying flashed messages are per-user; never share them.
+        if self.backend is None or "_flashes" in session:
+            return current_app.make_response(render())
+
+        versions, modified_ns = self.versions(sorted(set(tables)))
+        key = f"{request.full_path}|{variant}|{','.join(map(str, versions))}"
+        etag = hashlib.sha1(key.encode()).hexdigest()
+        last_modified = datetime.fromtimestamp(modified_ns // 10**9, tz=timezone.utc)
+
+        # Last-Modified is informational: at one-second resolution it cannot
+        # tell apart two writes in the same second, so only the ETag yields 304.
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            body = self.backend.get(f"page:{etag}")
+            if body is None:
+                body = render()
+                # A lagging replica may render the page as it was before the
+                # newest version; serve it but don't store it under that ETag.
+                if not replica_router.may_be_stale(modified_ns):
+                    if isinstance(body, str):
+                        self.backend.set(f"page:{etag}", body, self.ttl)
+                    else:
+                        body = self._store_after(f"page:{etag}", body)
+            response = current_app.make_response(body)
+        response.set_etag(etag)
+        response.last_modified = last_modified
+        response.cache_control.no_cache = True
+        response.cache_control.private = True
+        return response
+
+
+page_cache = PageCache()
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from flask import current_app, g, has_app_context, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.sql.dml import UpdateBase
+
+from .write_events import WriteEvent, subscribe
+
+_READ_METHODS = ("GET", "HEAD")
+_STICKY_KEY = "_primary_until"
+# Drivers that take a ``connect_timeout`` in whole seconds.
+_CONNECT_TIMEOUT_BACKENDS = ("postgresql", "mysql", "mariadb")
+
+
+def _engine_options(url: str, connect_timeout: float) -> Dict[str, Any]:
+    """The backend's engine options, plus a short connect timeout.
+
+    The health check runs on the request thread, so an unreachable replica
+    must fail fast instead of waiting out the TCP connect timeout.
+    """
+    from .config import Config
+
+    options = Config.engine_options(url)
+    if make_url(url).get_backend_name() in _CONNECT_TIMEOUT_BACKENDS:
+        connect_args = {**options.get("connect_args", {}), "connect_timeout": max(1, round(connect_timeout))}
+        options["connect_args"] = connect_args
+    return options
+
+
+class Replica:
+    def __init__(self, url: str, engine: Engine) -> None:
+        self.url = url
+        self.engine = engine
+        self.checked_at = 0.0
+        self.down_until = 0.0
+
+
+class ReplicaRouter:
+    """Sends read-only requests to replicas, everything else to the primary.
+
+    GET/HEAD requests pick a replica round-robin. A replica is pinged at most
+    every ``REPLICA_HEALTH_INTERVAL`` seconds; one that fails is skipped for
+    ``REPLICA_RETRY_SECONDS`` and, when none is healthy, reads fall back to
+    the primary. A client that just committed a write (typically a POST
+    followed by its redirect) reads from the primary for
+    ``REPLICA_STICKY_SECONDS`` so it never sees its change missing.
+    """
+
+    def __init__(self) -> None:
+        self.replicas: List[Replica] = []
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+        self._health_interval = 0.0
+        self._retry = 0.0
+        self._sticky = 0.0
+
+    def init_app(self, app) -> None:
+        self.reset()
+        timeout = app.config["REPLICA_CONNECT_TIMEOUT"]
+        self.replicas = [
+            Replica(url, create_engine(url, **_engine_options(url, timeout)))
+            for url in app.config["SQLALCHEMY_REPLICA_URLS"]
+        ]
+        if not self.replicas:
+            return
+        self._health_interval = app.config["REPLICA_HEALTH_INTERVAL"]
+        self._retry = app.config["REPLICA_RETRY_SECONDS"]
+        self._sticky = app.config["REPLICA_STICKY_SECONDS"]
+        app.before_request(self._route)
+        subscribe(self._on_write)
+        app.logger.info(
+            "Read replicas: %s",
+            ", ".join(replica.engine.url.render_as_string(hide_password=True) for replica in self.replicas),
+        )
+
+    def reset(self) -> None:
+        """Close and forget the replicas, e.g. before another app configures its own."""
+        for replica in self.replicas:
+            replica.engine.dispose()
+        self.replicas = []
+
+    def choose(self) -> Optional[Engine]:
+        """Return the next healthy replica engine, or None for the primary."""
+        with self._lock:
+            start = next(self._turn)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if self._healthy(replica):
+                return replica.engine
+        return None
+
+    def _healthy(self, replica: Replica) -> bool:
+        now = time.monotonic()
+        if replica.down_until > now:
+            return False
+        if now - replica.checked_at < self._health_interval:
+            return True
+        try:
+            with replica.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except DBAPIError as exc:
+            replica.down_until = now + self._retry
+            current_app.logger.warning("Replica %s unavailable: %s", replica.url, exc)
+            return False
+        replica.checked_at = now
+        return True
+
+    def _route(self) -> None:
+        if request.method not in _READ_METHODS or session.get(_STICKY_KEY, 0) > time.time():
+            return
+        g.db_replica = self.choose()
+
+    def _on_write(self, events: List[WriteEvent]) -> None:
+        if has_request_context():
+            session[_STICKY_KEY] = time.time() + self._sticky
+
+    def may_be_stale(self, version_ns: int) -> bool:
+        """True if this request reads a replica that may not have ``version_ns`` yet."""
+        return reading_from_replica() and time.time_ns() - version_ns < self._sticky * 10**9
+
+
+def reading_from_replica() -> bool:
+    return has_app_context() and g.get("db_replica") is not None
+
+
+@contextmanager
+def use_primary():
+    """Read from the primary inside this block, e.g. to fill a shared cache."""
+    if not has_app_context():
+        yield
+        return
+    previous = g.pop("db_replica", None)
+    try:
+        yield
+    finally:
+        if previous is not None:
+            g.db_replica = previous
+
+
+class RoutingSession(Session):
+    """Session whose plain reads go to the replica chosen for the request."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not isinstance(clause, UpdateBase):
+            replica = g.get("db_replica") if has_app_context() else None
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+replica_router = ReplicaRouter()
@@ -0,0 +1,491 @@
+"""Precomputed management reports.
+
+Summary tables are kept current from the session: a flush records which
+members, jobs and caregivers it touched and, once the transaction commits,
+only those keys are recomputed from the indexed base rows. Totals cover
+archived appointments and applications too, so ``flask archive`` does not
+change them. Caregiver utilisation is maintained by applying the difference
+between a caregiver's old and new totals to its (caregiving_type, city)
+group. Bulk loads, writes from other processes and any drift are repaired
+by a full rebuild every ``REPORT_REBUILD_SECONDS`` (or ``flask
+report-rebuild``); workers claim that periodic rebuild through
+``report_rebuild`` so only one of them runs it.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import click
+from flask import Blueprint, abort, current_app, jsonify, request
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.exc import IntegrityError
+
+from .archive import with_archived
+from .models import Appointment, Caregiver, Job, JobApplication, Member, User, db
+from .write_events import WriteEvent, subscribe
+
+bp = Blueprint("reporting", __name__, cli_group=None)
+
+ACCEPTED = "accepted"
+_INFO_KEY = "report_keys"
+_CHUNK = 500
+
+member_spend = db.Table(
+    "report_member_spend",
+    db.Column("member_user_id", db.Integer, db.ForeignKey("member.member_user_id", ondelete="CASCADE"), primary_key=True),
+    db.Column("appointments", db.Integer, nullable=False),
+    db.Column("hours", db.Integer, nullable=False),
+    db.Column("spend", db.Numeric(12, 2), nullable=False),
+    db.Index("ix_report_member_spend_spend", "spend"),
+)
+job_applications = db.Table(
+    "report_job_applications",
+    db.Column("job_id", db.Integer, db.ForeignKey("job.job_id", ondelete="CASCADE"), primary_key=True),
+    db.Column("applications", db.Integer, nullable=False),
+    db.Index("ix_report_job_applications_applications", "applications"),
+)
+# Per-caregiver totals; no foreign key, so a deleted caregiver's old totals
+# are still there to subtract from its group.
+caregiver_load = db.Table(
+    "report_caregiver_load",
+    db.Column("caregiver_user_id", db.Integer, primary_key=True),
+    db.Column("caregiving_type", db.String(50), nullable=False),
+    db.Column("city", db.String(100), nullable=False),
+    db.Column("appointments", db.Integer, nullable=False),
+    db.Column("hours", db.Integer, nullable=False),
+)
+utilisation = db.Table(
+    "report_caregiver_utilisation",
+    db.Column("caregiving_type", db.String(50), primary_key=True),
+    db.Column("city", db.String(100), primary_key=True),
+    db.Column("caregivers", db.Integer, nullable=False),
+    db.Column("appointments", db.Integer, nullable=False),
+    db.Column("hours", db.Integer, nullable=False),
+)
+# When the periodic rebuild last started, shared by every worker.
+rebuild_claims = db.Table(
+    "report_rebuild",
+    db.Column("name", db.String(50), primary_key=True),
+    db.Column("started_at", db.DateTime, nullable=False),
+)
+
+Group = Tuple[str, str]
+
+
+def _chunks(ids: Iterable[int]) -> Iterable[List[int]]:
+    ordered = sorted(ids)
+    for start in range(0, len(ordered), _CHUNK):
+        yield ordered[start:start + _CHUNK]
+
+
+def _accepted(entity):
+    return entity.status == ACCEPTED
+
+
+def _member_spend_query(member_ids: Optional[List[int]] = None):
+    conditions = [_accepted]
+    if member_ids is not None:
+        conditions.append(lambda entity: entity.member_user_id.in_(member_ids))
+    appointments = with_archived(Appointment, *conditions)
+    return (
+        select(
+            appointments.c.member_user_id,
+            func.count(),
+            func.sum(appointments.c.work_hours),
+            func.sum(appointments.c.work_hours * Caregiver.hourly_rate),
+        )
+        .join(Caregiver, Caregiver.caregiver_user_id == appointments.c.caregiver_user_id)
+        .group_by(appointments.c.member_user_id)
+    )
+
+
+def _job_applications_query(job_ids: Optional[List[int]] = None):
+    conditions = [] if job_ids is None else [lambda entity: entity.job_id.in_(job_ids)]
+    applications = with_archived(JobApplication, *conditions)
+    statement = (
+        select(Job.job_id, func.count(applications.c.caregiver_user_id))
+        .outerjoin(applications, applications.c.job_id == Job.job_id)
+        .group_by(Job.job_id)
+    )
+    return statement if job_ids is None else statement.where(Job.job_id.in_(job_ids))
+
+
+def _caregiver_load_query(caregiver_ids: Optional[List[int]] = None):
+    caregiving_type = func.coalesce(Caregiver.caregiving_type, "")
+    city = func.coalesce(User.city, "")
+    conditions = [_accepted]
+    if caregiver_ids is not None:
+        conditions.append(lambda entity: entity.caregiver_user_id.in_(caregiver_ids))
+    appointments = with_archived(Appointment, *conditions)
+    statement = (
+        select(
+            Caregiver.caregiver_user_id,
+            caregiving_type,
+            city,
+            func.count(appointments.c.appointment_id),
+            func.coalesce(func.sum(appointments.c.work_hours), 0),
+        )
+        .join(User, User.user_id == Caregiver.caregiver_user_id)
+        .outerjoin(appointments, appointments.c.caregiver_user_id == Caregiver.caregiver_user_id)
+        .group_by(Caregiver.caregiver_user_id, caregiving_type, city)
+    )
+    return statement if caregiver_ids is None else statement.where(Caregiver.caregiver_user_id.in_(caregiver_ids))
+
+
+def _refresh_members(connection, member_ids: Set[int]) -> None:
+    for chunk in _chunks(member_ids):
+        rows = connection.execute(_member_spend_query(chunk)).all()
+        connection.execute(member_spend.delete().where(member_spend.c.member_user_id.in_(chunk)))
+        if rows:
+            connection.execute(
+                member_spend.insert(),
+                [
+                    {"member_user_id": member_id, "appointments": count, "hours": hours or 0, "spend": spend or 0}
+                    for member_id, count, hours, spend in rows
+                ],
+            )
+
+
+def _refresh_jobs(connection, job_ids: Set[int]) -> None:
+    for chunk in _chunks(job_ids):
+        rows = connection.execute(_job_applications_query(chunk)).all()
+        connection.execute(job_applications.delete().where(job_applications.c.job_id.in_(chunk)))
+        if rows:
+            connection.execute(
+                job_applications.insert(),
+                [{"job_id": job_id, "applications": count} for job_id, count in rows],
+            )
+
+
+def _refresh_caregivers(connection, caregiver_ids: Set[int]) -> None:
+    deltas: Dict[Group, List[int]] = {}
+
+    def shift(group: Group, sign: int, appointments: int, hours: int) -> None:
+        delta = deltas.setdefault(group, [0, 0, 0])
+        delta[0] += sign
+        delta[1] += sign * appointments
+        delta[2] += sign * hours
+
+    load = caregiver_load.c
+    for chunk in _chunks(caregiver_ids):
+        old = connection.execute(
+            select(load.caregiving_type, load.city, load.appointments, load.hours).where(load.caregiver_user_id.in_(chunk))
+        )
+        for caregiving_type, city, appointments, hours in old:
+            shift((caregiving_type, city), -1, appointments, hours)
+        rows = connection.execute(_caregiver_load_query(chunk)).all()
+        for _, caregiving_type, city, appointments, hours in rows:
+            shift((caregiving_type, city), 1, appointments, hours)
+        connection.execute(caregiver_load.delete().where(load.caregiver_user_id.in_(chunk)))
+        if rows:
+            connection.execute(
+                caregiver_load.insert(),
+                [
+                    {"caregiver_user_id": caregiver_id, "caregiving_type": caregiving_type, "city": city,
+                     "appointments": appointments, "hours": hours}
+                    for caregiver_id, caregiving_type, city, appointments, hours in rows
+                ],
+            )
+
+    group = utilisation.c
+    for (caregiving_type, city), (caregivers, appointments, hours) in deltas.items():
+        if not (caregivers or appointments or hours):
+            continue
+        key = (group.caregiving_type == caregiving_type) & (group.city == city)
+        updated = connection.execute(
+            utilisation.update()
+            .where(key)
+            .values(
+                caregivers=group.caregivers + caregivers,
+                appointments=group.appointments + appointments,
+                hours=group.hours + hours,
+            )
+        )
+        if updated.rowcount == 0:
+            connection.execute(
+                utilisation.insert().values(
+                    caregiving_type=caregiving_type, city=city,
+                    caregivers=caregivers, appointments=appointments, hours=hours,
+                )
+            )
+    connection.execute(utilisation.delete().where(group.caregivers <= 0))
+
+
+def _accepted_members(caregiver_ids: Iterable[int]):
+    """Members with accepted appointments, hot or archived, with these caregivers."""
+    appointments = with_archived(
+        Appointment, _accepted, lambda entity: entity.caregiver_user_id.in_(caregiver_ids)
+    )
+    return select(appointments.c.member_user_id).distinct()
+
+
+def refresh(keys: Dict[str, Set[int]]) -> None:
+    """Recompute the summary rows for the given member, job and caregiver ids."""
+    with db.engine.begin() as connection:
+        members = set(keys.get("member", ()))
+        if keys.get("rate"):
+            members.update(connection.scalars(_accepted_members(keys["rate"])))
+        _refresh_members(connection, members)
+        _refresh_jobs(connection, set(keys.get("job", ())))
+        _refresh_caregivers(connection, set(keys.get("caregiver", ())))
+
+
+def rebuild() -> None:
+    """Recompute every summary table from the base tables in one transaction."""
+    load = caregiver_load.c
+    with db.engine.begin() as connection:
+        for table in (utilisation, caregiver_load, job_applications, member_spend):
+            connection.execute(table.delete())
+        connection.execute(
+            member_spend.insert().from_select(
+                ["member_user_id", "appointments", "hours", "spend"], _member_spend_query()
+            )
+        )
+        connection.execute(
+            job_applications.insert().from_select(["job_id", "applications"], _job_applications_query())
+        )
+        connection.execute(
+            caregiver_load.insert().from_select(
+                ["caregiver_user_id", "caregiving_type", "city", "appointments", "hours"], _caregiver_load_query()
+            )
+        )
+        connection.execute(
+            utilisation.insert().from_select(
+                ["caregiving_type", "city", "caregivers", "appointments", "hours"],
+                select(load.caregiving_type, load.city, func.count(), func.sum(load.appointments), func.sum(load.hours))
+                .group_by(load.caregiving_type, load.city),
+            )
+        )
+
+
+def claim_rebuild(interval: float) -> bool:
+    """Take the periodic rebuild unless a worker started one within ``interval`` seconds."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    claims = rebuild_claims.c
+    with db.engine.begin() as connection:
+        claimed = connection.execute(
+            rebuild_claims.update()
+            .where(claims.name == "reports", claims.started_at <= now - timedelta(seconds=interval))
+            .values(started_at=now)
+        ).rowcount
+        if claimed or connection.execute(select(claims.name)).first() is not None:
+            return bool(claimed)
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(rebuild_claims.insert().values(name="reports", started_at=now))
+    except IntegrityError:
+        # Another worker made the first claim at the same moment.
+        return False
+    return True
+
+
+def _values(instance, attribute: str) -> Set[int]:
+    """Current and previous values of ``attribute`` in this flush."""
+    history = inspect(instance).attrs[attribute].history
+    return {value for value in chain(history.sum(), history.deleted) if value is not None}
+
+
+def _pending(session) -> Dict[str, Set[int]]:
+    return session.info.setdefault(_INFO_KEY, {"member": set(), "job": set(), "caregiver": set(), "rate": set()})
+
+
+def _capture_deletes(session, flush_context, instances) -> None:
+    """Find rows the database will cascade away before they are gone."""
+    caregivers = {obj.caregiver_user_id for obj in session.deleted if isinstance(obj, Caregiver)}
+    members = {obj.member_user_id for obj in session.deleted if isinstance(obj, Member)}
+    users = {obj.user_id for obj in session.deleted if isinstance(obj, User)}
+    caregivers |= users
+    members |= users
+    if not caregivers and not members:
+        return
+    keys = _pending(session)
+    with session.no_autoflush:
+        if caregivers:
+            keys["caregiver"] |= caregivers
+            keys["member"].update(session.scalars(_accepted_members(caregivers)))
+            applications = with_archived(JobApplication, lambda entity: entity.caregiver_user_id.in_(caregivers))
+            keys["job"].update(session.scalars(select(applications.c.job_id)))
+        if members:
+            appointments = with_archived(
+                Appointment, _accepted, lambda entity: entity.member_user_id.in_(members)
+            )
+            keys["caregiver"].update(session.scalars(select(appointments.c.caregiver_user_id).distinct()))
+
+
+def _collect(session, flush_context) -> None:
+    keys = None
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if not isinstance(obj, (Appointment, JobApplication, Job, Caregiver, User)):
+            continue
+        keys = keys or _pending(session)
+        if isinstance(obj, Appointment):
+            keys["member"] |= _values(obj, "member_user_id")
+            keys["caregiver"] |= _values(obj, "caregiver_user_id")
+        elif isinstance(obj, JobApplication):
+            keys["job"] |= _values(obj, "job_id")
+        elif isinstance(obj, Job):
+            keys["job"].add(obj.job_id)
+        elif isinstance(obj, Caregiver):
+            keys["caregiver"].add(obj.caregiver_user_id)
+            if inspect(obj).attrs.hourly_rate.history.deleted:
+                keys["rate"].add(obj.caregiver_user_id)
+        elif obj in session.dirty and inspect(obj).attrs.city.history.deleted:
+            keys["caregiver"].add(obj.user_id)
+
+
+def _discard(session, *args) -> None:
+    session.info.pop(_INFO_KEY, None)
+
+
+class ReportScheduler:
+    """Applies committed changes and schedules periodic full rebuilds."""
+
+    def __init__(self) -> None:
+        self._app = None
+        self._interval = 0.0
+        self._rebuilt_at: Optional[float] = None
+        self._forced = False
+        self._lock = threading.Lock()
+        self._first = threading.Lock()
+        self._rebuilding = False
+
+    def init_app(self, app) -> None:
+        self.reset()
+        self._app = app
+        self._interval = app.config["REPORT_REBUILD_SECONDS"]
+        subscribe(self._on_write)
+
+    def reset(self) -> None:
+        """Forget past rebuilds, so another app's first report request rebuilds inline."""
+        self._rebuilt_at = None
+        self._forced = False
+
+    def install(self, session) -> None:
+        if event.contains(session, "after_flush", _collect):
+            return
+        event.listen(session, "before_flush", _capture_deletes)
+        event.listen(session, "after_flush", _collect)
+        event.listen(session, "after_commit", self._apply)
+        event.listen(session, "after_rollback", _discard)
+
+    def _apply(self, session) -> None:
+        keys = session.info.pop(_INFO_KEY, None)
+        if not keys or not any(keys.values()):
+            return
+        try:
+            refresh(keys)
+        except Exception:
+            # The write itself is committed; a rebuild will catch up.
+            current_app.logger.exception("Report refresh failed; scheduling a rebuild")
+            self._forced = True
+
+    def _on_write(self, events: List[WriteEvent]) -> None:
+        # Core loaders (import, datagen) report whole tables; ORM writes are
+        # handled by the session hooks above.
+        if any(write.op == "bulk" for write in events):
+            self._forced = True
+
+    def maybe_rebuild(self) -> None:
+        """Start a background rebuild if the last one is older than the interval.
+
+        A rebuild this process needs (after a bulk load or a failed refresh)
+        always runs. The periodic one runs in whichever worker claims it first.
+        The first call in a process runs inline: until then the summary tables
+        may never have been filled (say, right after a schema upgrade), and
+        answering from them would return empty reports.
+        """
+        if self._rebuilt_at is None:
+            with self._first:
+                if self._rebuilt_at is None and self._start():
+                    self._run()
+            return
+        if not self._forced and time.monotonic() - self._rebuilt_at < self._interval:
+            return
+        if self._start():
+            threading.Thread(target=self._run, name="report-rebuild", daemon=True).start()
+
+    def _start(self) -> bool:
+        with self._lock:
+            if self._rebuilding:
+                return False
+            self._rebuilding = True
+            return True
+
+    def _run(self) -> None:
+        forced, self._forced = self._forced, False
+        try:
+            with self._app.app_context():
+                if forced or claim_rebuild(self._interval):
+                    rebuild()
+            self._rebuilt_at = time.monotonic()
+        except Exception:
+            self._forced = self._forced or forced
+            raise
+        finally:
+            self._rebuilding = False
+
+
+reports = ReportScheduler()
+
+
+def _limit() -> int:
+    limit = request.args.get("limit", 50, type=int)
+    if not 0 < limit <= current_app.config["MAX_PAGE_SIZE"]:
+        abort(400)
+    return limit
+
+
+@bp.route("/reports/member-spend")
+def member_spend_report():
+    reports.maybe_rebuild()
+    columns = member_spend.c
+    statement = select(member_spend)
+    if (member_id := request.args.get("member_user_id", type=int)) is not None:
+        statement = statement.where(columns.member_user_id == member_id)
+    statement = statement.order_by(columns.spend.desc(), columns.member_user_id).limit(_limit())
+    return jsonify(
+        [
+            {"member_user_id": row.member_user_id, "appointments": row.appointments,
+             "hours": row.hours, "spend": f"{row.spend:.2f}"}
+            for row in db.session.execute(statement)
+        ]
+    )
+
+
+@bp.route("/reports/job-applications")
+def job_applications_report():
+    reports.maybe_rebuild()
+    columns = job_applications.c
+    statement = select(job_applications)
+    if (job_id := request.args.get("job_id", type=int)) is not None:
+        statement = statement.where(columns.job_id == job_id)
+    statement = statement.order_by(columns.applications.desc(), columns.job_id).limit(_limit())
+    return jsonify([row._asdict() for row in db.session.execute(statement)])
+
+
+@bp.route("/reports/caregiver-utilisation")
+def utilisation_report():
+    reports.maybe_rebuild()
+    columns = utilisation.c
+    statement = select(utilisation).order_by(columns.caregiving_type, columns.city)
+    if caregiving_type := request.args.get("caregiving_type"):
+        statement = statement.where(columns.caregiving_type == caregiving_type)
+    if city := request.args.get("city"):
+        statement = statement.where(columns.city == city)
+    return jsonify(
+        [
+            {**row._asdict(), "hours_per_caregiver": round(row.hours / row.caregivers, 2)}
+            for row in db.session.execute(statement)
+        ]
+    )
+
+
+@bp.cli.command("report-rebuild")
+def rebuild_command():
+    """Recompute every report summary table."""
+    rebuild()
+    click.echo("Reports rebuilt.")
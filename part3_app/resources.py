@@ -1,20 +1,46 @@
 from __future__ import annotations
 
+import base64
+import csv
+import io
+import json
+import operator
 from datetime import date, time
 from decimal import Decimal
-from typing import Any, Callable, Dict, Iterable, List
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
 from flask import (
     Blueprint,
+    Response,
     abort,
+    current_app,
     flash,
+    get_flashed_messages,
     redirect,
     render_template,
     request,
+    stream_template,
+    stream_with_context,
     url_for,
 )
+from sqlalchemy import and_, or_, select, tuple_
+from sqlalchemy.orm import aliased
 
-from .models import Appointment, Caregiver, Job, JobApplication, Member, User, Address, db
+from .availability import BookingError
+from .counters import counters
+from .models import (
+    Address,
+    Appointment,
+    AppointmentArchive,
+    Caregiver,
+    Job,
+    JobApplication,
+    JobApplicationArchive,
+    Member,
+    User,
+    db,
+)
+from .page_cache import page_cache
 
 bp = Blueprint("crud", __name__)
 
@@ -53,6 +79,303 @@ def _fetch_record(model, pk_fields: List[str], pk_values: Dict[str, Any]):
     return model.query.filter_by(**pk_values).first_or_404()
 
 
+def _list_query(cfg):
+    """Select the pk and list columns as plain tuples, joining dotted paths.
+
+    Rows are ``(*pk_values, *list_column_values)``; no ORM entities are
+    built and unlisted columns (long text fields) are never fetched. Also
+    returns the column expression behind each list column name.
+    """
+    model = cfg["model"]
+    aliases: Dict[Tuple[str, ...], Any] = {(): model}
+    joins = []
+    columns = [getattr(model, pk).label(pk) for pk in cfg["pk"]]
+    by_name: Dict[str, Any] = {}
+    for index, column in enumerate(cfg["list_columns"]):
+        *path, attr = column["name"].split(".")
+        for depth in range(1, len(path) + 1):
+            key = tuple(path[:depth])
+            if key not in aliases:
+                relationship = getattr(aliases[key[:-1]], key[-1])
+                aliases[key] = aliased(relationship.property.mapper.class_)
+                joins.append(relationship.of_type(aliases[key]))
+        by_name[column["name"]] = getattr(aliases[tuple(path)], attr)
+        columns.append(by_name[column["name"]].label(f"column_{index}"))
+    query = db.session.query(*columns).select_from(model)
+    for join in joins:
+        query = query.outerjoin(join)
+    return query, by_name
+
+
+PYTHON_PARSERS = {int: "int", Decimal: "decimal", date: "date", time: "time"}
+RANGE_PARSERS = ("int", "decimal", "date", "time")
+
+
+def _column_parser(cfg, name: str, column) -> str:
+    """The form parser for a list column, else one matching its SQL type."""
+    for field in cfg["form_fields"]:
+        if field["name"] == name:
+            return field.get("parser", "string")
+    if name in cfg["pk"]:
+        return "int"
+    try:
+        return PYTHON_PARSERS.get(column.type.python_type, "string")
+    except NotImplementedError:
+        return "string"
+
+
+def _list_controls(cfg, columns: Dict[str, Any]) -> Tuple[List[Any], Dict[str, str], Optional[ListSort]]:
+    """Parse ``?<column>=``, ``?<column>__gte=``/``__lte=`` and ``?sort=[-]<column>``.
+
+    Values are cast with the column's parser; anything invalid is a 400.
+    Returns the SQL conditions, the query args to carry into pager links and
+    the requested sort.
+    """
+    conditions: List[Any] = []
+    args: Dict[str, str] = {}
+    for list_column in cfg["list_columns"]:
+        name = list_column["name"]
+        column = columns[name]
+        parser = _column_parser(cfg, name, column)
+        for suffix, compare in (("", operator.eq), ("__gte", operator.ge), ("__lte", operator.le)):
+            if suffix and parser not in RANGE_PARSERS:
+                continue
+            raw = request.args.get(name + suffix, "").strip()
+            if not raw:
+                continue
+            try:
+                conditions.append(compare(column, _cast_value(raw, parser)))
+            except (ValueError, ArithmeticError):
+                abort(400)
+            args[name + suffix] = raw
+
+    sort = None
+    if raw_sort := request.args.get("sort"):
+        name = raw_sort.lstrip("-")
+        if name not in columns:
+            abort(400)
+        column = columns[name]
+        nullable = not all(getattr(c, "nullable", True) is False for c in column.property.columns)
+        sort = ListSort(column, f"column_{list(columns).index(name)}", _column_parser(cfg, name, column),
+                        raw_sort.startswith("-"), nullable)
+        args["sort"] = raw_sort
+    return conditions, args, sort
+
+
+class _ListPage:
+    """One list page, queried when the streamed template first reaches it.
+
+    The page header is sent before the query runs; cursors and the row count
+    are read by the template after the rows have been rendered.
+    """
+
+    def __init__(self, cfg, query, sort: Optional[ListSort], after, before, page_size: int) -> None:
+        self.cfg = cfg
+        self.query = query
+        self.sort = sort
+        self.after = after
+        self.before = before
+        self.page_size = page_size
+        self._rows = None
+        self._prev_cursor = self._next_cursor = None
+
+    def _load(self) -> List[Any]:
+        if self._rows is None:
+            self._rows, self._prev_cursor, self._next_cursor = _keyset_page(
+                self.cfg["model"],
+                self.cfg["pk"],
+                self.after,
+                self.before,
+                self.page_size,
+                query=self.query,
+                sort=self.sort,
+            )
+        return self._rows
+
+    def __iter__(self) -> Iterator[Tuple[Dict[str, Any], Tuple[Any, ...]]]:
+        pk_fields = self.cfg["pk"]
+        width = len(pk_fields)
+        for row in self._load():
+            yield dict(zip(pk_fields, row[:width])), row[width:]
+
+    @property
+    def count(self) -> int:
+        return len(self._load())
+
+    @property
+    def prev_cursor(self) -> Optional[str]:
+        self._load()
+        return self._prev_cursor
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        self._load()
+        return self._next_cursor
+
+
+def _buffered(chunks: Iterable[str], size: int = 16384) -> Iterator[str]:
+    """Join Jinja's many small fragments into fewer, larger writes."""
+    buffer: List[str] = []
+    length = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield "".join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def _list_tables(cfg) -> List[str]:
+    """Tables a list page reads: the model's plus those behind dotted columns."""
+    tables = [cfg["model"].__table__.name]
+    for column in cfg["list_columns"]:
+        entity = cfg["model"]
+        for attr in column["name"].split(".")[:-1]:
+            entity = getattr(entity, attr).property.mapper.class_
+            tables.append(entity.__table__.name)
+    return tables
+
+
+def _tier(cfg):
+    """``cfg`` reading the archive table instead when ``?archived=1`` asks."""
+    if request.args.get("archived") != "1":
+        return cfg
+    if "archive" not in cfg:
+        abort(404)
+    return {**cfg, "model": cfg["archive"]}
+
+
+def _parse_cursor(raw: str | None, pk_fields: List[str]) -> Optional[Tuple[int, ...]]:
+    if not raw:
+        return None
+    parts = raw.split(",")
+    if len(parts) != len(pk_fields):
+        abort(400)
+    try:
+        return tuple(int(part) for part in parts)
+    except ValueError:
+        abort(400)
+
+
+def _encode_cursor(record, pk_fields: List[str], sort: Optional["ListSort"] = None) -> str:
+    if sort is None:
+        return ",".join(str(getattr(record, pk)) for pk in pk_fields)
+    value = getattr(record, sort.label)
+    if isinstance(value, (date, time)):
+        value = value.isoformat()
+    elif isinstance(value, Decimal):
+        value = str(value)
+    payload = [value] + [getattr(record, pk) for pk in pk_fields]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+CURSOR_TYPES = {"int": int, "decimal": str, "date": str, "time": str, "string": str}
+CURSOR_DECODERS = {"decimal": Decimal, "date": date.fromisoformat, "time": time.fromisoformat}
+
+
+def _parse_sort_cursor(raw: str | None, pk_fields: List[str], sort: "ListSort"):
+    """Decode a sorted-view cursor into ``(sort_value, pk_values)``.
+
+    The sort value is the raw column value (ISO strings for dates and times,
+    exact strings for decimals), not the form's rendering: ``""`` stays
+    ``""`` and times keep their seconds.
+    """
+    if not raw:
+        return None
+    try:
+        value, *pk = json.loads(base64.urlsafe_b64decode(raw + "=" * (-len(raw) % 4)))
+        if len(pk) != len(pk_fields) or not all(isinstance(part, int) for part in pk):
+            abort(400)
+        if value is not None:
+            if not isinstance(value, CURSOR_TYPES[sort.parser]) or isinstance(value, bool):
+                abort(400)
+            value = CURSOR_DECODERS.get(sort.parser, lambda raw: raw)(value)
+        return value, tuple(pk)
+    except (ValueError, TypeError, ArithmeticError):
+        abort(400)
+
+
+def _page_size() -> int:
+    default = current_app.config["PAGE_SIZE"]
+    try:
+        size = int(request.args.get("per_page", default))
+    except ValueError:
+        abort(400)
+    return max(1, min(size, current_app.config["MAX_PAGE_SIZE"]))
+
+
+class ListSort(NamedTuple):
+    """A list column to order by; cursors then carry its value too."""
+
+    column: Any
+    label: str
+    parser: str
+    descending: bool
+    nullable: bool
+
+
+def _seek(column, key, bound, cursor, sort: ListSort, forward: bool, greater: bool):
+    """Rows after ``cursor`` in (sort column, key) order, NULLs sorting last."""
+    value, pk = cursor
+    past = operator.gt if greater else operator.lt
+    tie = past(key, bound(pk))
+    if not sort.nullable:
+        return or_(past(column, value), and_(column == value, tie))
+    if value is None:
+        # Walking forward from a NULL only NULLs remain; backward, every
+        # non-NULL row still lies ahead.
+        return and_(column.is_(None), tie) if forward else or_(column.isnot(None), and_(column.is_(None), tie))
+    ahead = or_(past(column, value), and_(column == value, tie))
+    return or_(ahead, column.is_(None)) if forward else ahead
+
+
+def _keyset_page(model, pk_fields: List[str], after, before, page_size: int, query, sort=None):
+    """Return one page of ``query``'s rows ordered by primary key plus prev/next cursors.
+
+    Seeks past the cursor with a (composite) key comparison so the database
+    walks the primary key index instead of counting off an OFFSET. ``query``
+    selects plain rows, e.g. ``db.session.query(*columns)``.
+    With a ``ListSort`` the sort column leads the ordering, the key breaks
+    ties, and cursors are ``(sort_value, pk_values)`` pairs.
+    """
+    pk_columns = [getattr(model, pk) for pk in pk_fields]
+    key = tuple_(*pk_columns) if len(pk_columns) > 1 else pk_columns[0]
+
+    def bound(values):
+        return tuple_(*values) if len(values) > 1 else values[0]
+
+    forward = before is None
+    cursor = after if forward else before
+    greater = forward != bool(sort and sort.descending)
+    direction = (lambda column: column.asc()) if greater else (lambda column: column.desc())
+    if sort is None:
+        if cursor is not None:
+            query = query.filter(key > bound(cursor) if greater else key < bound(cursor))
+        query = query.order_by(*[direction(column) for column in pk_columns])
+    else:
+        if cursor is not None:
+            query = query.filter(_seek(sort.column, key, bound, cursor, sort, forward, greater))
+        leading = direction(sort.column)
+        if sort.nullable:
+            leading = leading.nulls_last() if forward else leading.nulls_first()
+        query = query.order_by(leading, *[direction(column) for column in pk_columns])
+
+    records = query.limit(page_size + 1).all()
+    has_more = len(records) > page_size
+    records = records[:page_size]
+    if not forward:
+        records.reverse()
+        has_prev, has_next = has_more, True
+    else:
+        has_prev, has_next = after is not None, has_more
+
+    prev_cursor = _encode_cursor(records[0], pk_fields, sort) if records and has_prev else None
+    next_cursor = _encode_cursor(records[-1], pk_fields, sort) if records and has_next else None
+    return records, prev_cursor, next_cursor
+
+
 RESOURCES: Dict[str, Dict[str, Any]] = {
     "users": {
         "title": "Users",
@@ -72,7 +395,8 @@ RESOURCES: Dict[str, Dict[str, Any]] = {
             {"name": "city", "label": "City", "input_type": "text", "parser": "string"},
             {"name": "phone_number", "label": "Phone Number", "input_type": "text", "parser": "string"},
             {"name": "profile_description", "label": "Profile Description", "input_type": "textarea", "parser": "string"},
-            {"name": "password", "label": "Password", "input_type": "text", "parser": "string", "required": True},
+            {"name": "password", "label": "Password", "input_type": "text", "parser": "string", "required": True,
+             "export": False},
         ],
     },
     "caregivers": {
@@ -81,6 +405,9 @@ RESOURCES: Dict[str, Dict[str, Any]] = {
         "pk": ["caregiver_user_id"],
         "list_columns": [
             {"name": "caregiver_user_id", "label": "User ID"},
+            {"name": "user.given_name", "label": "Given Name"},
+            {"name": "user.surname", "label": "Surname"},
+            {"name": "user.city", "label": "City"},
             {"name": "gender", "label": "Gender"},
             {"name": "caregiving_type", "label": "Type"},
             {"name": "hourly_rate", "label": "Hourly Rate"},
@@ -99,6 +426,8 @@ RESOURCES: Dict[str, Dict[str, Any]] = {
         "pk": ["member_user_id"],
         "list_columns": [
             {"name": "member_user_id", "label": "User ID"},
+            {"name": "user.given_name", "label": "Given Name"},
+            {"name": "user.surname", "label": "Surname"},
             {"name": "house_rules", "label": "House Rules"},
             {"name": "dependent_description", "label": "Dependent"},
         ],
@@ -114,6 +443,7 @@ RESOURCES: Dict[str, Dict[str, Any]] = {
         "pk": ["member_user_id"],
         "list_columns": [
             {"name": "member_user_id", "label": "Member ID"},
+            {"name": "member.user.surname", "label": "Member"},
             {"name": "house_number", "label": "House #"},
             {"name": "street", "label": "Street"},
             {"name": "town", "label": "Town"},
@@ -132,6 +462,7 @@ RESOURCES: Dict[str, Dict[str, Any]] = {
         "list_columns": [
             {"name": "job_id", "label": "Job ID"},
             {"name": "member_user_id", "label": "Member ID"},
+            {"name": "member.user.surname", "label": "Member"},
             {"name": "required_caregiving_type", "label": "Type"},
             {"name": "date_posted", "label": "Posted"},
         ],
@@ -145,10 +476,13 @@ RESOURCES: Dict[str, Dict[str, Any]] = {
     "job_applications": {
         "title": "Job Applications",
         "model": JobApplication,
+        "archive": JobApplicationArchive,
         "pk": ["caregiver_user_id", "job_id"],
         "list_columns": [
             {"name": "caregiver_user_id", "label": "Caregiver ID"},
+            {"name": "caregiver.user.surname", "label": "Caregiver"},
             {"name": "job_id", "label": "Job ID"},
+            {"name": "job.required_caregiving_type", "label": "Job Type"},
             {"name": "date_applied", "label": "Applied"},
         ],
         "form_fields": [
@@ -160,11 +494,14 @@ RESOURCES: Dict[str, Dict[str, Any]] = {
     "appointments": {
         "title": "Appointments",
         "model": Appointment,
+        "archive": AppointmentArchive,
         "pk": ["appointment_id"],
         "list_columns": [
             {"name": "appointment_id", "label": "Appointment ID"},
             {"name": "caregiver_user_id", "label": "Caregiver ID"},
+            {"name": "caregiver.user.surname", "label": "Caregiver"},
             {"name": "member_user_id", "label": "Member ID"},
+            {"name": "member.user.surname", "label": "Member"},
             {"name": "appointment_date", "label": "Date"},
             {"name": "status", "label": "Status"},
         ],
@@ -182,11 +519,81 @@ RESOURCES: Dict[str, Dict[str, Any]] = {
 
 @bp.route("/")
 def dashboard():
-    counts = {
-        name: cfg["model"].query.count()
-        for name, cfg in RESOURCES.items()
+    counts = counters.snapshot()
+    return page_cache.serve(
+        [cfg["model"].__table__.name for cfg in RESOURCES.values()],
+        lambda: render_template("dashboard.html", counts=counts, resources=RESOURCES),
+        variant=f"counts-{counters.generation}",
+    )
+
+
+def _export_columns(cfg) -> List[Tuple[str, str]]:
+    """Primary key plus form fields, leaving out secrets marked ``"export": False``."""
+    columns = [(pk, "int") for pk in cfg["pk"]]
+    columns += [
+        (field["name"], field.get("parser", "string"))
+        for field in cfg["form_fields"]
+        if field["name"] not in cfg["pk"] and field.get("export", True)
+    ]
+    return columns
+
+
+def _export_rows(cfg, columns: List[Tuple[str, str]]) -> Iterator[Tuple[Any, ...]]:
+    model = cfg["model"]
+    statement = (
+        select(*[getattr(model, name) for name, _ in columns])
+        .order_by(*[getattr(model, pk) for pk in cfg["pk"]])
+        .execution_options(yield_per=current_app.config["EXPORT_BATCH_SIZE"])
+    )
+    yield from db.session.execute(statement)
+
+
+def _export_csv(cfg) -> Iterator[str]:
+    columns = _export_columns(cfg)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in columns])
+    yield buffer.getvalue()
+
+    flush_every = current_app.config["EXPORT_BATCH_SIZE"]
+    buffer.seek(0)
+    buffer.truncate()
+    for index, row in enumerate(_export_rows(cfg, columns), start=1):
+        writer.writerow(
+            [_format_value(value, parser) for value, (_, parser) in zip(row, columns)]
+        )
+        if index % flush_every == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _json_record(row: Iterable[Any], columns: List[Tuple[str, str]]) -> Dict[str, Any]:
+    """Map a row of column values to JSON types: ints stay numbers, None is null."""
+    return {
+        name: value if value is None or parser == "int" else _format_value(value, parser)
+        for value, (name, parser) in zip(row, columns)
     }
-    return render_template("dashboard.html", counts=counts, resources=RESOURCES)
+
+
+def _export_jsonl(cfg) -> Iterator[str]:
+    columns = _export_columns(cfg)
+    flush_every = current_app.config["EXPORT_BATCH_SIZE"]
+    lines: List[str] = []
+    for row in _export_rows(cfg, columns):
+        lines.append(json.dumps(_json_record(row, columns)))
+        if len(lines) >= flush_every:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+EXPORT_FORMATS = {
+    "csv": (_export_csv, "text/csv"),
+    "jsonl": (_export_jsonl, "application/x-ndjson"),
+}
 
 
 def _upsert_record(model, fields, form_data, instance=None):
@@ -211,35 +618,62 @@ def register_resource_routes(app):
         pk_segment = _pk_path(pk_fields)
 
         def list_view(resource=resource_name, cfg=config):
-            records = cfg["model"].query.order_by(
-                *[getattr(cfg["model"], pk) for pk in cfg["pk"]]
-            ).all()
-            rows = [
-                {
-                    "record": record,
-                    "pk": {pk: getattr(record, pk) for pk in cfg["pk"]},
-                }
-                for record in records
-            ]
-            return render_template(
-                "resource_list.html",
-                resource=resource,
-                config=cfg,
-                rows=rows,
-                resources=RESOURCES,
-                getattr_fn=getattr,
-            )
+            page_size = _page_size()
+            cfg = _tier(cfg)
+            archived = cfg["model"] is cfg.get("archive")
+            query, columns = _list_query(cfg)
+            conditions, list_args, sort = _list_controls(cfg, columns)
+            if archived:
+                list_args["archived"] = "1"
+            if sort is None:
+                after = _parse_cursor(request.args.get("after"), cfg["pk"])
+                before = _parse_cursor(request.args.get("before"), cfg["pk"])
+            else:
+                after = _parse_sort_cursor(request.args.get("after"), cfg["pk"], sort)
+                before = _parse_sort_cursor(request.args.get("before"), cfg["pk"], sort)
+            page = _ListPage(cfg, query.filter(*conditions), sort, after, before, page_size)
+
+            def render():
+                # Pop flashed messages before streaming: the session cookie is
+                # sent with the headers, before the template would pop them.
+                get_flashed_messages()
+                return _buffered(
+                    stream_template(
+                        "resource_list.html",
+                        resource=resource,
+                        config=cfg,
+                        page=page,
+                        columns=[
+                            {**column, "parser": _column_parser(cfg, column["name"], columns[column["name"]])}
+                            for column in cfg["list_columns"]
+                        ],
+                        list_args=list_args,
+                        sort=list_args.get("sort"),
+                        archived=archived,
+                        resources=RESOURCES,
+                        per_page=page_size if "per_page" in request.args else None,
+                    )
+                )
+
+            return page_cache.serve(_list_tables(cfg), render)
 
         def create_view(resource=resource_name, cfg=config):
+            form_values = {}
             if request.method == "POST":
-                _upsert_record(cfg["model"], cfg["form_fields"], request.form)
-                flash(f"{cfg['title']} record created.", "success")
-                return redirect(url_for(f"{resource}_list"))
+                try:
+                    _upsert_record(cfg["model"], cfg["form_fields"], request.form)
+                except BookingError as exc:
+                    db.session.rollback()
+                    flash(str(exc), "error")
+                    form_values = request.form
+                else:
+                    flash(f"{cfg['title']} record created.", "success")
+                    return redirect(url_for(f"{resource}_list"))
             return render_template(
                 "resource_form.html",
                 resource=resource,
                 config=cfg,
-                form_values={},
+                form_values=form_values,
                 action="Create",
                 resources=RESOURCES,
             )
@@ -248,7 +682,20 @@ def register_resource_routes(app):
             pk_values = {field: kwargs[field] for field in pk_fields}
             record = _fetch_record(cfg["model"], pk_fields, pk_values)
             if request.method == "POST":
-                _upsert_record(cfg["model"], cfg["form_fields"], request.form, record)
+                try:
+                    _upsert_record(cfg["model"], cfg["form_fields"], request.form, record)
+                except BookingError as exc:
+                    db.session.rollback()
+                    flash(str(exc), "error")
+                    return render_template(
+                        "resource_form.html",
+                        resource=resource,
+                        config=cfg,
+                        form_values=request.form,
+                        action="Edit",
+                        pk_values=pk_values,
+                        resources=RESOURCES,
+                    )
                 flash(f"{cfg['title']} record updated.", "success")
                 return redirect(url_for(f"{resource}_list"))
             form_values = {
@@ -282,6 +729,25 @@ def register_resource_routes(app):
             view_func=list_view,
             methods=["GET"],
         )
+
+        def export_view(resource=resource_name, cfg=config, fmt="csv"):
+            generate, mimetype = EXPORT_FORMATS[fmt]
+            cfg = _tier(cfg)
+            filename = f"{resource}_archive" if cfg["model"] is cfg.get("archive") else resource
+            return Response(
+                stream_with_context(generate(cfg)),
+                mimetype=mimetype,
+                headers={"Content-Disposition": f"attachment; filename={filename}.{fmt}"},
+            )
+
+        for fmt in EXPORT_FORMATS:
+            app.add_url_rule(
+                f"/{resource_name}/export.{fmt}",
+                endpoint=f"{resource_name}_export_{fmt}",
+                view_func=export_view,
+                defaults={"fmt": fmt},
+                methods=["GET"],
+            )
         app.add_url_rule(
             f"/{resource_name}/create",
             endpoint=f"{resource_name}_create",
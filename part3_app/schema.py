@@ -0,0 +1,225 @@
+"""Schema setup, versioning and upgrades for older databases."""
+from __future__ import annotations
+
+import hashlib
+from typing import Dict, List
+
+import click
+from flask import Blueprint
+from sqlalchemy import delete, inspect, insert, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from . import fulltext
+from .models import db
+
+bp = Blueprint("schema", __name__, cli_group=None)
+
+schema_version = db.Table(
+    "schema_version",
+    db.Column("fingerprint", db.String(64), primary_key=True),
+)
+
+
+def _missing_cascades(connection) -> Dict[str, List[dict]]:
+    """Foreign keys the models declare ON DELETE CASCADE but the database doesn't."""
+    inspector = inspect(connection)
+    stale: Dict[str, List[dict]] = {}
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        cascading = {fk.parent.name for fk in table.foreign_keys if fk.ondelete == "CASCADE"}
+        for fk in inspector.get_foreign_keys(table.name):
+            ondelete = (fk["options"].get("ondelete") or "").upper()
+            if ondelete != "CASCADE" and cascading & set(fk["constrained_columns"]):
+                stale.setdefault(table.name, []).append(fk)
+    return stale
+
+
+def _missing_autoincrement(connection) -> List[str]:
+    """SQLite tables the models declare AUTOINCREMENT but the database doesn't."""
+    if connection.dialect.name != "sqlite":
+        return []
+    stale = []
+    for table in db.metadata.sorted_tables:
+        if not table.dialect_options["sqlite"]["autoincrement"]:
+            continue
+        sql = connection.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table.name,)
+        ).scalar()
+        if sql and "AUTOINCREMENT" not in sql.upper():
+            stale.append(table.name)
+    return stale
+
+
+def _sqlite_sequence_floor(raw, table, quote) -> None:
+    """Start an AUTOINCREMENT table's ids above any id it or its archives used."""
+    (pk,) = table.primary_key.columns
+    tables = [table.name] + [
+        other.name for other in db.metadata.sorted_tables if other.info.get("archive_of") == table.name
+    ]
+    existing = {row[0] for row in raw.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    floor = max(
+        raw.execute(f"SELECT COALESCE(MAX({quote(pk.name)}), 0) FROM {quote(name)}").fetchone()[0]
+        for name in tables
+        if name in existing
+    )
+    raw.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table.name,))
+    raw.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table.name, floor))
+
+
+def _alter_postgresql(connection, stale: Dict[str, List[dict]]) -> None:
+    # NOT VALID + VALIDATE keeps the strong lock short: existing rows already
+    # satisfy the old constraint and are checked without blocking writes.
+    quote = connection.dialect.identifier_preparer.quote
+    for table_name, fks in stale.items():
+        for fk in fks:
+            name = quote(fk["name"])
+            connection.exec_driver_sql(
+                f"ALTER TABLE {quote(table_name)} DROP CONSTRAINT {name}, "
+                f"ADD CONSTRAINT {name} FOREIGN KEY ({', '.join(map(quote, fk['constrained_columns']))}) "
+                f"REFERENCES {quote(fk['referred_table'])} ({', '.join(map(quote, fk['referred_columns']))}) "
+                "ON DELETE CASCADE NOT VALID"
+            )
+            connection.exec_driver_sql(f"ALTER TABLE {quote(table_name)} VALIDATE CONSTRAINT {name}")
+
+
+def _rebuild_sqlite(connection, table_names: List[str]) -> None:
+    """SQLite can't alter a foreign key or add AUTOINCREMENT, so copy each table into a new one.
+
+    Follows SQLite's documented procedure: foreign keys off, create
+    ``<table>_new``, copy, drop, rename, recreate indexes, check, commit.
+    Triggers on the old table go with it; ``fulltext.install`` recreates them.
+    """
+    dialect = connection.dialect
+    quote = dialect.identifier_preparer.quote
+    existing = {name: {c["name"] for c in inspect(connection).get_columns(name)} for name in table_names}
+    raw = connection.connection.driver_connection
+    isolation_level = raw.isolation_level
+    raw.isolation_level = None
+    try:
+        raw.execute("PRAGMA foreign_keys=OFF")
+        raw.execute("BEGIN")
+        try:
+            for name in table_names:
+                table = db.metadata.tables[name]
+                new_name = quote(f"{name}_new")
+                create = str(CreateTable(table).compile(dialect=dialect))
+                raw.execute(create.replace(f"CREATE TABLE {quote(name)}", f"CREATE TABLE {new_name}", 1))
+                columns = ", ".join(quote(c.name) for c in table.columns if c.name in existing[name])
+                raw.execute(f"INSERT INTO {new_name} ({columns}) SELECT {columns} FROM {quote(name)}")
+                raw.execute(f"DROP TABLE {quote(name)}")
+                raw.execute(f"ALTER TABLE {new_name} RENAME TO {quote(name)}")
+                for index in table.indexes:
+                    raw.execute(str(CreateIndex(index).compile(dialect=dialect)))
+                if table.dialect_options["sqlite"]["autoincrement"]:
+                    _sqlite_sequence_floor(raw, table, quote)
+            violations = raw.execute("PRAGMA foreign_key_check").fetchall()
+            if violations:
+                raise RuntimeError(f"Foreign key violations after rebuild: {violations[:5]}")
+        except BaseException:
+            raw.execute("ROLLBACK")
+            raise
+        raw.execute("COMMIT")
+    finally:
+        raw.execute("PRAGMA foreign_keys=ON")
+        raw.isolation_level = isolation_level
+
+
+def create_missing_indexes(engine) -> List[str]:
+    """Create indexes declared on the models but absent from existing tables.
+
+    ``create_all`` only creates indexes along with a new table, so indexes
+    added to a model later are created here. Returns their names.
+    """
+    created: List[str] = []
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        for table in db.metadata.sorted_tables:
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in sorted(table.indexes, key=lambda index: index.name):
+                if index.name not in existing:
+                    index.create(connection)
+                    created.append(index.name)
+    return created
+
+
+def upgrade_tables(engine) -> List[str]:
+    """Give existing tables the models' ON DELETE CASCADE foreign keys and,
+    on SQLite, AUTOINCREMENT primary keys.
+
+    Returns the names of the tables that were changed; a no-op for databases
+    created by ``create_all`` with the current models.
+    """
+    with engine.connect() as connection:
+        stale = _missing_cascades(connection)
+        autoincrement = _missing_autoincrement(connection)
+        if not stale and not autoincrement:
+            return []
+        if connection.dialect.name == "sqlite":
+            tables = [table.name for table in db.metadata.sorted_tables if table.name in stale or table.name in autoincrement]
+            _rebuild_sqlite(connection, tables)
+            return tables
+        _alter_postgresql(connection, stale)
+        connection.commit()
+    return list(stale)
+
+
+def fingerprint(dialect: str, language: str) -> str:
+    """Hash of everything ``ensure_schema`` would create for this dialect.
+
+    Derived from the metadata and the search DDL, so any model change gets a
+    new fingerprint without anyone remembering to bump a version number.
+    """
+    parts: List[str] = []
+    for table in db.metadata.sorted_tables:
+        parts.append(f"table {table.name} autoincrement={table.dialect_options['sqlite']['autoincrement']}")
+        for column in table.columns:
+            parts.append(f"  {column.name} {column.type!r} null={column.nullable} pk={column.primary_key}")
+        for fk in sorted(table.foreign_keys, key=lambda fk: fk.parent.name):
+            parts.append(f"  fk {fk.parent.name} {fk.target_fullname} {fk.ondelete}")
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            parts.append(f"  index {index.name} {[c.name for c in index.columns]} {index.unique}")
+    if dialect == "sqlite":
+        parts += fulltext._sqlite_ddl()
+    elif dialect == "postgresql":
+        parts += fulltext._postgresql_ddl(language)
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def _recorded_fingerprint(engine) -> str | None:
+    try:
+        with engine.connect() as connection:
+            return connection.execute(select(schema_version.c.fingerprint)).scalar()
+    except DBAPIError:
+        # No schema_version table yet: a new or pre-versioning database.
+        return None
+
+
+def ensure_schema(engine, language: str = "english") -> List[str]:
+    """Create, upgrade and index the schema unless it is already current.
+
+    A matching fingerprint costs one single-row SELECT, so workers start
+    without reflecting the database. Returns what was done, empty if nothing.
+    """
+    expected = fingerprint(engine.dialect.name, language)
+    if _recorded_fingerprint(engine) == expected:
+        return []
+    db.metadata.create_all(engine)
+    done = ["create_all"]
+    if upgraded := upgrade_tables(engine):
+        done.append(f"rebuilt {', '.join(upgraded)}")
+    if indexed := create_missing_indexes(engine):
+        done.append(f"indexes {', '.join(indexed)}")
+    fulltext.install(engine, language)
+    with engine.begin() as connection:
+        connection.execute(delete(schema_version))
+        connection.execute(insert(schema_version).values(fingerprint=expected))
+    return done
+
+
+@bp.cli.command("upgrade-schema")
+def upgrade_command():
+    """Bring an existing database up to the current models."""
+    changed = upgrade_tables(db.engine) + create_missing_indexes(db.engine)
+    click.echo(f"Upgraded: {', '.join(changed)}" if changed else "Schema is up to date.")
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import heapq
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from flask import Blueprint, abort, jsonify, request
+from sqlalchemy import select
+
+from .models import Caregiver, User, db
+from .replicas import use_primary
+from .write_events import WriteEvent, subscribe
+
+bp = Blueprint("search", __name__)
+
+FACETS = ("caregiving_type", "gender", "city")
+
+
+class CaregiverSearchIndex:
+    """Inverted index over caregiver attributes used for faceted search.
+
+    Each facet value maps to the set of caregiver ids carrying it and hourly
+    rates are kept in a sorted list for range lookups, so a query is a few set
+    intersections instead of a table scan. Committed writes to caregivers or
+    their users mark ids stale; stale ids are re-read before the next search.
+    Writes made by other processes are picked up by a background rebuild once
+    ``SEARCH_RECONCILE_SECONDS`` have elapsed, as ``CounterCache`` does.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._loaded_at = 0.0
+        self._interval = 0.0
+        self._refreshing = False
+        self._app = None
+        self._stale: Set[int] = set()
+        self._docs: Dict[int, Dict[str, Any]] = {}
+        self._postings: Dict[str, Dict[str, Set[int]]] = {}
+        self._rates: List[Tuple[float, int]] = []
+
+    def init_app(self, app) -> None:
+        self.reset()
+        self._app = app
+        self._interval = app.config["SEARCH_RECONCILE_SECONDS"]
+        subscribe(self._on_write)
+
+    def reset(self) -> None:
+        """Empty the index, e.g. before serving another app's database."""
+        with self._lock:
+            self._loaded = False
+            self._stale = set()
+            self._docs, self._postings, self._rates = {}, {}, []
+
+    def invalidate(self) -> None:
+        """Drop the index so the next search rebuilds it from the database."""
+        with self._lock:
+            self._loaded = False
+
+    def search(
+        self,
+        filters: Dict[str, List[str]],
+        min_rate: Optional[Decimal] = None,
+        max_rate: Optional[Decimal] = None,
+        limit: int = 50,
+    ) -> Dict[str, Any]:
+        if self._loaded and time.monotonic() - self._loaded_at > self._interval:
+            self._reconcile_in_background()
+        with self._lock:
+            self._sync()
+            constraints: Dict[str, Set[int]] = {}
+            for facet, values in filters.items():
+                if values:
+                    postings = self._postings[facet]
+                    constraints[facet] = set().union(*(postings.get(v, ()) for v in values))
+            if min_rate is not None or max_rate is not None:
+                constraints["hourly_rate"] = self._rate_range(min_rate, max_rate)
+
+            facets = {
+                facet: self._facet_counts(
+                    facet, [ids for name, ids in constraints.items() if name != facet]
+                )
+                for facet in FACETS
+            }
+            if constraints:
+                matches = self._intersect(constraints.values())
+                total = len(matches)
+                ordered = heapq.nsmallest(limit, (self._docs[caregiver_id] for caregiver_id in matches), key=_by_rate)
+            else:
+                total, ordered = len(self._docs), self._cheapest(limit)
+            return {
+                "total": total,
+                "results": [dict(doc) for doc in ordered],
+                "facets": facets,
+            }
+
+    def _cheapest(self, limit: int) -> List[Dict[str, Any]]:
+        """The first ``limit`` docs in result order, read off the sorted rates."""
+        docs = [self._docs[caregiver_id] for _, caregiver_id in self._rates[:limit]]
+        if len(docs) < limit:
+            # Unrated caregivers sort last; only scanned when a page reaches them.
+            unrated = (doc for doc in self._docs.values() if doc["hourly_rate"] is None)
+            docs += heapq.nsmallest(limit - len(docs), unrated, key=_by_rate)
+        return docs
+
+    def _intersect(self, sets: Iterable[Set[int]]) -> Set[int]:
+        sets = sorted(sets, key=len)
+        result = set(sets[0])
+        for other in sets[1:]:
+            result &= other
+        return result
+
+    def _facet_counts(self, facet: str, others: List[Set[int]]) -> Dict[str, int]:
+        postings = self._postings[facet]
+        if not others:
+            counts = {value: len(ids) for value, ids in postings.items()}
+        else:
+            base = self._intersect(others)
+            counts = {value: len(ids & base) for value, ids in postings.items()}
+        return {value: count for value, count in sorted(counts.items()) if count}
+
+    def _rate_range(self, min_rate, max_rate) -> Set[int]:
+        lo = 0 if min_rate is None else bisect_left(self._rates, (float(min_rate), -1))
+        hi = (
+            len(self._rates)
+            if max_rate is None
+            else bisect_right(self._rates, (float(max_rate), float("inf")))
+        )
+        return {caregiver_id for _, caregiver_id in self._rates[lo:hi]}
+
+    def _sync(self) -> None:
+        # The index is shared by every request, so fill it from the primary.
+        with use_primary():
+            self._sync_from_primary()
+
+    def _load(self) -> None:
+        self._docs, self._postings, self._rates = {}, {f: defaultdict(set) for f in FACETS}, []
+        for row in db.session.execute(self._statement()):
+            self._add(row._asdict(), keep_sorted=False)
+        self._rates.sort()
+        self._loaded = True
+        self._loaded_at = time.monotonic()
+
+    def _reconcile_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                # Build a fresh copy without the lock, so searches keep being
+                # served from the current one, then swap it in.
+                fresh = CaregiverSearchIndex()
+                with self._app.app_context(), use_primary():
+                    fresh._load()
+                with self._lock:
+                    self._docs, self._postings, self._rates = fresh._docs, fresh._postings, fresh._rates
+                    self._loaded_at = fresh._loaded_at
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="search-reconcile", daemon=True).start()
+
+    def _sync_from_primary(self) -> None:
+        if not self._loaded:
+            self._stale.clear()
+            self._load()
+        elif self._stale:
+            stale, self._stale = self._stale, set()
+            for caregiver_id in stale:
+                self._remove(caregiver_id)
+            rows = db.session.execute(
+                self._statement().where(Caregiver.caregiver_user_id.in_(stale))
+            )
+            for row in rows:
+                self._add(row._asdict())
+
+    @staticmethod
+    def _statement():
+        return select(
+            Caregiver.caregiver_user_id,
+            User.given_name,
+            User.surname,
+            User.city,
+            Caregiver.gender,
+            Caregiver.caregiving_type,
+            Caregiver.hourly_rate,
+        ).join(User, User.user_id == Caregiver.caregiver_user_id)
+
+    def _add(self, doc: Dict[str, Any], keep_sorted: bool = True) -> None:
+        """Index ``doc``; a full load passes ``keep_sorted=False`` and sorts the rates once."""
+        caregiver_id = doc["caregiver_user_id"]
+        if doc["hourly_rate"] is not None:
+            doc["hourly_rate"] = float(doc["hourly_rate"])
+            if keep_sorted:
+                insort(self._rates, (doc["hourly_rate"], caregiver_id))
+            else:
+                self._rates.append((doc["hourly_rate"], caregiver_id))
+        self._docs[caregiver_id] = doc
+        for facet in FACETS:
+            if doc[facet] is not None:
+                self._postings[facet][doc[facet]].add(caregiver_id)
+
+    def _remove(self, caregiver_id: int) -> None:
+        doc = self._docs.pop(caregiver_id, None)
+        if doc is None:
+            return
+        if doc["hourly_rate"] is not None:
+            position = bisect_left(self._rates, (doc["hourly_rate"], caregiver_id))
+            del self._rates[position]
+        for facet in FACETS:
+            ids = self._postings[facet].get(doc[facet])
+            if ids is not None:
+                ids.discard(caregiver_id)
+                if not ids:
+                    del self._postings[facet][doc[facet]]
+
+    def _on_write(self, events: List[WriteEvent]) -> None:
+        if any(write.op == "bulk" and write.model in (Caregiver, User) for write in events):
+            self.invalidate()
+            return
+        stale = {
+            write.pk[0]
+            for write in events
+            # A cascaded caregiver delete arrives with its user's delete event.
+            if (write.model is Caregiver and write.op != "cascade")
+            or (write.model is User and write.op != "insert")
+        }
+        if stale:
+            with self._lock:
+                self._stale |= stale
+
+
+def _by_rate(doc: Dict[str, Any]) -> Tuple[bool, float, int]:
+    """Result order: cheapest first, unrated last, ties by caregiver id."""
+    return doc["hourly_rate"] is None, doc["hourly_rate"] or 0, doc["caregiver_user_id"]
+
+
+caregiver_index = CaregiverSearchIndex()
+
+
+def _rate_arg(name: str) -> Optional[Decimal]:
+    raw = request.args.get(name)
+    if not raw:
+        return None
+    try:
+        return Decimal(raw)
+    except InvalidOperation:
+        abort(400)
+
+
+@bp.route("/caregivers/search")
+def caregivers():
+    try:
+        limit = int(request.args.get("limit", 50))
+    except ValueError:
+        abort(400)
+    result = caregiver_index.search(
+        {facet: request.args.getlist(facet) for facet in FACETS},
+        min_rate=_rate_arg("min_rate"),
+        max_rate=_rate_arg("max_rate"),
+        limit=max(0, limit),
+    )
+    return jsonify(result)
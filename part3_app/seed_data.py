@@ -3,10 +3,9 @@ from datetime import date, time
 from .app import create_app, db
 from .models import Appointment, Caregiver, Job, JobApplication, Member, User, Address
 
-app = create_app()
 
-
-def seed():
+def seed(app=None):
+    app = app or create_app()
     with app.app_context():
         if User.query.first():
             print("Database already seeded.")
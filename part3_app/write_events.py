@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Callable, List, NamedTuple, Tuple
+
+from sqlalchemy import event, inspect
+
+_INFO_KEY = "write_events"
+_subscribers: List[Callable[[List["WriteEvent"]], None]] = []
+
+
+class WriteEvent(NamedTuple):
+    model: type
+    op: str
+    pk: Tuple[Any, ...]
+
+
+def subscribe(callback: Callable[[List[WriteEvent]], None]) -> None:
+    """Call ``callback`` with the ORM writes of every committed transaction."""
+    if callback not in _subscribers:
+        _subscribers.append(callback)
+
+
+def _primary_key(instance) -> Tuple[Any, ...]:
+    return tuple(inspect(instance).mapper.primary_key_from_instance(instance))
+
+
+@lru_cache(maxsize=None)
+def cascaded_models(model: type) -> Tuple[type, ...]:
+    """Models whose rows the database deletes along with ``model``'s.
+
+    Relationships with ``passive_deletes`` leave children to ON DELETE
+    CASCADE, so the session never sees those rows go away.
+    """
+    found: List[type] = []
+    pending = [model]
+    while pending:
+        for relationship in inspect(pending.pop()).relationships:
+            target = relationship.mapper.class_
+            if relationship.passive_deletes and relationship.cascade.delete and target not in found:
+                found.append(target)
+                pending.append(target)
+    return tuple(found)
+
+
+def flush_events(session) -> List[WriteEvent]:
+    """The writes of the flush that just ran, for ``after_flush`` listeners."""
+    events: List[WriteEvent] = []
+    for instance in session.new:
+        events.append(WriteEvent(type(instance), "insert", _primary_key(instance)))
+    for instance in session.dirty:
+        if session.is_modified(instance, include_collections=False):
+            events.append(WriteEvent(type(instance), "update", _primary_key(instance)))
+    for instance in session.deleted:
+        events.append(WriteEvent(type(instance), "delete", _primary_key(instance)))
+        events.extend(WriteEvent(model, "cascade", ()) for model in cascaded_models(type(instance)))
+    return events
+
+
+def _collect(session, flush_context) -> None:
+    session.info.setdefault(_INFO_KEY, []).extend(flush_events(session))
+
+
+def publish(events: List[WriteEvent]) -> None:
+    """Deliver writes made outside the ORM (e.g. Core bulk statements).
+
+    Use ``op="bulk"`` with an empty pk when the affected rows are unknown;
+    subscribers treat it as "anything in this table may have changed".
+    ORM deletes report the tables the database cascades into the same way,
+    as ``op="cascade"`` next to the parent's ``delete`` event.
+    """
+    for callback in _subscribers:
+        callback(events)
+
+
+def _dispatch(session) -> None:
+    pending = session.info.pop(_INFO_KEY, None)
+    if pending:
+        publish(pending)
+
+
+def _discard(session, *args) -> None:
+    session.info.pop(_INFO_KEY, None)
+
+
+def install(session) -> None:
+    """Attach the collectors to a (scoped) session factory."""
+    if event.contains(session, "after_flush", _collect):
+        return
+    event.listen(session, "after_flush", _collect)
+    event.listen(session, "after_commit", _dispatch)
+    event.listen(session, "after_rollback", _discard)
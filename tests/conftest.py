@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import pytest
+
+from part3_app.app import create_app
+from part3_app.changes import feed
+from part3_app.config import Config
+from part3_app.counters import counters
+from part3_app.matching import matcher
+from part3_app.models import db
+from part3_app.page_cache import page_cache
+from part3_app.replicas import replica_router
+from part3_app.reporting import reports
+from part3_app.search import caregiver_index
+from part3_app.seed_data import seed
+
+
+def _reset_singletons() -> None:
+    # Module-level caches outlive an app; start every test from a cold one.
+    counters.reset()
+    page_cache.reset()
+    caregiver_index.reset()
+    matcher.reset()
+    reports.reset()
+    feed.reset()
+    replica_router.reset()
+
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    """Build an app on a fresh SQLite file; keyword arguments override Config."""
+    apps = []
+
+    def make(**overrides):
+        monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+        for name, value in overrides.items():
+            monkeypatch.setattr(Config, name, value)
+        _reset_singletons()
+        app = create_app()
+        app.config["TESTING"] = True
+        apps.append(app)
+        return app
+
+    yield make
+    for app in apps:
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+    _reset_singletons()
+
+
+@pytest.fixture
+def app(make_app):
+    """An app seeded with ``seed_data``'s ten users."""
+    app = make_app()
+    seed(app)
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
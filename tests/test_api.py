@@ -0,0 +1,116 @@
+import pytest
+
+from part3_app.models import Appointment, Caregiver, User, db
+
+NEW_USER = {"email": "new@mail.com", "given_name": "New", "surname": "User", "password": "secret"}
+
+
+def test_list_pages_by_key_without_secrets(client):
+    first = client.get("/api/users?per_page=4").get_json()
+    assert [row["user_id"] for row in first["data"]] == [1, 2, 3, 4]
+    assert first["prev"] is None and first["next"] == "4"
+    assert all("password" not in row for row in first["data"])
+    last = client.get("/api/users?per_page=4&after=8").get_json()
+    assert [row["user_id"] for row in last["data"]] == [9, 10]
+    assert last["next"] is None
+
+
+def test_fields_selects_columns(client):
+    row = client.get("/api/users/1?fields=email").get_json()
+    assert row == {"user_id": 1, "email": "raim@mail.com"}
+    rate = client.get("/api/caregivers/3?fields=hourly_rate").get_json()
+    assert rate == {"caregiver_user_id": 3, "hourly_rate": "7.50"}
+
+
+@pytest.mark.parametrize("url", ["/api/users?fields=password", "/api/users?fields=nope", "/api/users/x"])
+def test_bad_reads_are_400(client, url):
+    response = client.get(url)
+    assert response.status_code == 400
+    assert "errors" in response.get_json()
+
+
+def test_missing_records_and_resources_are_404(client):
+    assert client.get("/api/users/99").status_code == 404
+    assert client.get("/api/nothing").status_code == 404
+
+
+def test_composite_keys(client):
+    row = client.get("/api/job_applications/3,1").get_json()
+    assert row == {"caregiver_user_id": 3, "job_id": 1, "date_applied": "2025-09-05"}
+
+
+def test_create_accepts_write_only_fields(app, client):
+    response = client.post("/api/users", json=NEW_USER)
+    assert response.status_code == 201
+    (key,) = response.get_json()["created"]
+    with app.app_context():
+        assert db.session.get(User, key["user_id"]).password == "secret"
+    assert "secret" not in client.get(f"/api/users/{key['user_id']}").get_data(as_text=True)
+
+
+def test_invalid_creates_write_nothing(app, client):
+    response = client.post("/api/users", json=[NEW_USER, {**NEW_USER, "email": "broken"}, {"email": "x@y"}])
+    assert response.status_code == 422
+    errors = response.get_json()["errors"]
+    assert [(error["op"], error["index"]) for error in errors] == [("create", 1), ("create", 2)]
+    with app.app_context():
+        assert db.session.query(User).count() == 10
+
+
+def test_patch_changes_only_the_given_fields(app, client):
+    assert client.patch("/api/caregivers/3", json={"hourly_rate": "9.25"}).get_json()["updated"] == 1
+    with app.app_context():
+        caregiver = db.session.get(Caregiver, 3)
+        assert str(caregiver.hourly_rate) == "9.25"
+        assert caregiver.caregiving_type == "babysitter"
+
+
+@pytest.mark.parametrize("value", ["abc", "NaN-ish", "1.2.3"])
+def test_non_numeric_values_are_422(client, value):
+    response = client.patch("/api/caregivers/3", json={"hourly_rate": value})
+    assert response.status_code == 422
+    assert response.get_json()["errors"][0]["error"] == "hourly_rate: invalid number"
+
+
+def test_delete_and_missing_delete(client):
+    assert client.delete("/api/appointments/4").get_json()["deleted"] == 1
+    response = client.delete("/api/appointments/4")
+    assert response.status_code == 422
+    assert response.get_json()["errors"][0]["error"] == "record not found"
+
+
+def test_batch_is_one_transaction(app, client):
+    response = client.post("/api/appointments/batch", json={
+        "create": [{"caregiver_user_id": 4, "member_user_id": 1, "appointment_date": "2025-11-01",
+                    "appointment_time": "09:00", "work_hours": 2, "status": "pending"}],
+        "update": [{"appointment_id": 2, "status": "accepted"}],
+        "delete": [{"appointment_id": 4}],
+    })
+    assert response.status_code == 200
+    assert response.get_json()["updated"] == 1
+    with app.app_context():
+        assert db.session.get(Appointment, 2).status == "accepted"
+        assert db.session.get(Appointment, 4) is None
+
+
+def test_batch_conflicts_roll_back(app, client):
+    overlapping = {"caregiver_user_id": 3, "member_user_id": 2, "appointment_date": "2025-10-10",
+                   "appointment_time": "10:00", "work_hours": 1}
+    response = client.post("/api/appointments/batch", json={"create": [overlapping], "delete": [{"appointment_id": 4}]})
+    assert response.status_code == 422
+    assert "already booked" in response.get_json()["errors"][0]["error"]
+    duplicate = client.post("/api/users", json={**NEW_USER, "email": "raim@mail.com"})
+    assert duplicate.status_code == 409
+    with app.app_context():
+        assert db.session.get(Appointment, 4) is not None
+
+
+def test_batch_size_is_limited(app, client):
+    app.config["API_MAX_BATCH"] = 2
+    response = client.post("/api/users", json=[NEW_USER] * 3)
+    assert response.status_code == 413
+
+
+@pytest.mark.parametrize("body", [{"create": {}}, {"drop": []}, [1]])
+def test_malformed_batches_are_400(client, body):
+    assert client.post("/api/users/batch", json=body).status_code == 400
@@ -0,0 +1,84 @@
+from datetime import date, time
+
+import pytest
+from sqlalchemy import func, select
+
+from part3_app.archive import archive
+from part3_app.availability import BookingError
+from part3_app.models import Appointment, AppointmentArchive, JobApplication, JobApplicationArchive, User, db
+from part3_app.reporting import caregiver_load, job_applications, member_spend, rebuild, utilisation
+
+CUTOFF = date(2025, 10, 12)
+
+
+def _count(model):
+    return db.session.scalar(select(func.count()).select_from(model))
+
+
+def _reports():
+    tables = (member_spend, job_applications, caregiver_load, utilisation)
+    return {table.name: sorted(tuple(row) for row in db.session.execute(select(table))) for table in tables}
+
+
+def test_rows_move_in_batches(app):
+    with app.app_context():
+        assert archive(CUTOFF, batch_size=1) == {"appointments": 2, "job_applications": 6}
+        assert sorted(row.appointment_id for row in AppointmentArchive.query) == [1, 2]
+        assert sorted(row.appointment_id for row in Appointment.query) == [3, 4]
+        assert (_count(JobApplication), _count(JobApplicationArchive)) == (0, 6)
+        assert archive(CUTOFF) == {"appointments": 0, "job_applications": 0}
+
+
+def test_archive_command(app):
+    result = app.test_cli_runner().invoke(args=["archive", "--before", "2025-10-12", "--batch-size", "1"])
+    assert result.output.strip() == "Archived 2 appointments and 6 job applications before 2025-10-12."
+
+
+def test_archived_rows_stay_readable(app, client):
+    with app.app_context():
+        archive(CUTOFF)
+    hot = client.get("/appointments").get_data(as_text=True)
+    assert "/appointments/edit/1" not in hot
+    cold = client.get("/appointments?archived=1&sort=-appointment_id").get_data(as_text=True)
+    assert "(archived)" in cold and "/appointments/edit/" not in cold
+    assert cold.index("<td>2</td>") < cold.index("<td>1</td>")
+    exported = client.get("/appointments/export.csv?archived=1")
+    assert "appointments_archive" in exported.headers["Content-Disposition"]
+    assert exported.get_data(as_text=True).splitlines()[1].startswith("1,3,1,2025-10-10")
+    assert client.get("/users?archived=1").status_code == 404
+
+
+def test_ids_are_not_reused_after_archiving(app):
+    with app.app_context():
+        archive(date(2025, 10, 14))
+        assert _count(Appointment) == 0
+        db.session.add(Appointment(caregiver_user_id=4, member_user_id=2, appointment_date=date(2025, 11, 1)))
+        db.session.commit()
+        assert Appointment.query.one().appointment_id == 5
+
+
+def test_bookings_conflict_with_archived_appointments(app):
+    with app.app_context():
+        archive(CUTOFF)
+        db.session.add(Appointment(caregiver_user_id=3, member_user_id=2, appointment_date=date(2025, 10, 10),
+                                   appointment_time=time(10, 0), work_hours=1))
+        with pytest.raises(BookingError):
+            db.session.commit()
+
+
+def test_reports_are_unchanged_by_archiving(app):
+    with app.app_context():
+        rebuild()
+        before = _reports()
+        archive(CUTOFF)
+        rebuild()
+        assert _reports() == before
+
+
+def test_archived_rows_cascade_with_their_caregiver(app):
+    with app.app_context():
+        archive(CUTOFF)
+        db.session.delete(db.session.get(User, 3))
+        db.session.commit()
+        assert [row.appointment_id for row in AppointmentArchive.query] == [2]
+        assert {row.caregiver_user_id for row in JobApplicationArchive.query} == {5, 7, 8, 10}
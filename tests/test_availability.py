@@ -0,0 +1,99 @@
+import threading
+import time as clock
+from datetime import date, time
+
+import pytest
+
+from part3_app import availability
+from part3_app.availability import BookingError
+from part3_app.models import Appointment, db
+
+SLOT = {"caregiver_user_id": "3", "member_user_id": "2", "appointment_date": "2025-10-10", "work_hours": "2"}
+
+
+def _count(app, **filters):
+    with app.app_context():
+        return db.session.query(Appointment).filter_by(**filters).count()
+
+
+def test_form_rejects_an_overlapping_booking(app, client):
+    response = client.post("/appointments/create", data={**SLOT, "appointment_time": "11:00", "status": "pending"})
+    assert response.status_code == 200
+    assert "Caregiver 3 is already booked from 2025-10-10 09:00 to 2025-10-10 12:00." in response.get_data(as_text=True)
+    assert _count(app, caregiver_user_id=3) == 1
+
+
+def test_adjacent_and_inactive_bookings_are_allowed(app, client):
+    assert client.post("/appointments/create", data={**SLOT, "appointment_time": "12:00"}).status_code == 302
+    declined = {**SLOT, "appointment_time": "10:00", "status": "declined"}
+    assert client.post("/appointments/create", data=declined).status_code == 302
+    assert _count(app, caregiver_user_id=3) == 3
+
+
+def test_editing_a_booking_does_not_clash_with_itself(client):
+    data = {**SLOT, "member_user_id": "1", "appointment_time": "09:30", "work_hours": "3", "status": "accepted"}
+    assert client.post("/appointments/edit/1", data=data).status_code == 302
+
+
+def test_overnight_bookings_block_the_next_morning(app):
+    with app.app_context():
+        db.session.add(Appointment(caregiver_user_id=4, member_user_id=1, appointment_date=date(2025, 11, 1),
+                                   appointment_time=time(22, 0), work_hours=8))
+        db.session.commit()
+        db.session.add(Appointment(caregiver_user_id=4, member_user_id=2, appointment_date=date(2025, 11, 2),
+                                   appointment_time=time(5, 0), work_hours=1))
+        with pytest.raises(BookingError):
+            db.session.commit()
+        db.session.rollback()
+
+
+def test_work_hours_are_bounded(app):
+    with app.app_context():
+        db.session.add(Appointment(caregiver_user_id=4, member_user_id=1, appointment_date=date(2025, 11, 1),
+                                   appointment_time=time(8, 0), work_hours=25))
+        with pytest.raises(BookingError, match="Work hours"):
+            db.session.commit()
+        db.session.rollback()
+
+
+def test_concurrent_bookings_cannot_both_succeed(app, monkeypatch):
+    booked_intervals = availability._booked_intervals
+
+    def slow(*args, **kwargs):
+        found = list(booked_intervals(*args, **kwargs))
+        # Widen the window between reading the bookings and inserting.
+        clock.sleep(0.2)
+        return iter(found)
+
+    monkeypatch.setattr(availability, "_booked_intervals", slow)
+    results = []
+
+    def book(member_id):
+        with app.app_context():
+            db.session.add(Appointment(caregiver_user_id=4, member_user_id=member_id,
+                                       appointment_date=date(2025, 12, 1), appointment_time=time(9, 0), work_hours=2))
+            try:
+                db.session.commit()
+                results.append("booked")
+            except BookingError:
+                db.session.rollback()
+                results.append("rejected")
+
+    threads = [threading.Thread(target=book, args=(member_id,)) for member_id in (1, 2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(results) == ["booked", "rejected"]
+    assert _count(app, caregiver_user_id=4, appointment_date=date(2025, 12, 1)) == 1
+
+
+def test_availability_lists_free_caregivers(client):
+    response = client.get("/availability?date=2025-10-10&start=10:00&hours=1&caregiving_type=babysitter")
+    assert [row["caregiver_user_id"] for row in response.get_json()] == [7, 10]
+    assert response.get_json()[0]["hourly_rate"] == "8.00"
+
+
+@pytest.mark.parametrize("query", ["date=2025-10-10&start=10:00", "date=x&start=10:00&hours=1", "date=2025-10-10&start=10:00&hours=30"])
+def test_availability_validates_arguments(client, query):
+    assert client.get(f"/availability?{query}").status_code == 400
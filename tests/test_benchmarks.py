@@ -0,0 +1,34 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from part3_app.resources import RESOURCES
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_route_benchmark_covers_every_route(tmp_path):
+    output = tmp_path / "bench.json"
+    completed = subprocess.run(
+        [
+            sys.executable, "-m", "benchmarks.bench_routes",
+            "--scale", "20", "--requests", "2", "--memory-samples", "1",
+            "--database-url", f"sqlite:///{tmp_path / 'bench.db'}",
+            "--output", str(output),
+        ],
+        cwd=ROOT, capture_output=True, text=True, timeout=300,
+    )
+    assert completed.returncode == 0, completed.stderr
+    assert "Traceback" not in completed.stderr
+
+    (run,) = json.loads(output.read_text())["runs"]
+    assert run["scale"] == 20
+    routes = {(result["resource"], result["route"]) for result in run["results"]}
+    expected = {("*", "dashboard")}
+    expected |= {(name, route) for name in RESOURCES for route in ("list", "create", "edit", "delete")}
+    assert routes == expected
+    for result in run["results"]:
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+        if result["route"] == "list":
+            assert result["queries_avg"] is not None
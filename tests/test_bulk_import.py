@@ -0,0 +1,146 @@
+import io
+
+from sqlalchemy.dialects import sqlite
+
+from part3_app import bulk_import
+from part3_app.bulk_import import ImportReport, _write, import_rows, open_text, read_rows
+from part3_app.models import Appointment, Caregiver, JobApplication, User, db
+
+
+def _rows(data: bytes, fmt: str):
+    return read_rows(open_text(io.BytesIO(data)), fmt)
+
+
+def test_csv_rows_are_written_and_bad_rows_reported(app):
+    data = (
+        b"email,given_name,surname,city,password\n"
+        b"a@mail.com,Ann,One,Almaty,x\n"
+        b"not-an-email,Bob,Two,Almaty,x\n"
+        b"c@mail.com,,Three,Almaty,x\n"
+        b"raim@mail.com,Dup,Four,Almaty,x\n"
+        b"e@mail.com,Eve,Five,Oral,x\n"
+    )
+    with app.app_context():
+        report = import_rows("users", _rows(data, "csv"), batch_size=10)
+        assert report.written == 2
+        assert [number for number, _ in report.errors] == [2, 3, 4]
+        assert "Email must contain @" in report.errors[0][1]
+        assert report.errors[1][1] == "given_name: value is required"
+        assert "UNIQUE" in report.errors[2][1]
+        assert db.session.query(User).count() == 12
+
+
+def test_unreadable_lines_are_reported_and_the_rest_loaded(app):
+    data = (
+        b'{"email": "a@mail.com", "given_name": "Ann", "surname": "One", "password": "x"}\n'
+        b"{not json\n"
+        b"[1, 2]\n"
+        b'{"email": "b@mail.com", "given_name": "B\xff", "surname": "Two", "password": "x"}\n'
+        b"\n"
+        b'{"email": "c@mail.com", "given_name": "Cy", "surname": "Three", "password": "x"}\n'
+    )
+    with app.app_context():
+        report = import_rows("users", _rows(data, "jsonl"))
+    assert report.written == 2
+    assert [number for number, _ in report.errors] == [2, 3, 4]
+    assert report.errors[0][1].startswith("invalid JSON")
+    assert report.errors[1][1] == "expected a JSON object"
+    assert report.errors[2][1] == "line is not valid UTF-8"
+
+
+def test_invalid_numbers_are_row_errors(app):
+    rows = [
+        {"caregiver_user_id": 1, "hourly_rate": "cheap"},
+        {"caregiver_user_id": "two"},
+    ]
+    with app.app_context():
+        report = import_rows("caregivers", rows)
+    assert report.written == 0
+    assert report.errors[0] == (1, "hourly_rate: invalid number")
+    assert report.errors[1][0] == 2
+    assert report.errors[1][1].startswith("caregiver_user_id:")
+
+
+def test_upsert_updates_existing_rows(app):
+    rows = [{"caregiver_user_id": 3, "gender": "Male", "caregiving_type": "elderly", "hourly_rate": "20"}]
+    with app.app_context():
+        assert import_rows("caregivers", rows).failed == 1
+        report = import_rows("caregivers", rows, upsert=True)
+        assert (report.written, report.failed) == (1, 0)
+        assert db.session.get(Caregiver, 3).caregiving_type == "elderly"
+
+
+def test_appointment_imports_get_the_booking_check(app):
+    rows = [
+        # Overlaps caregiver 3's seeded 09:00-12:00 booking.
+        {"caregiver_user_id": 3, "member_user_id": 2, "appointment_date": "2025-10-10",
+         "appointment_time": "10:00", "work_hours": 2, "status": "accepted"},
+        {"caregiver_user_id": 3, "member_user_id": 2, "appointment_date": "2025-10-10",
+         "appointment_time": "13:00", "work_hours": 2, "status": "accepted"},
+        # Overlaps the row above, which is in the same import.
+        {"caregiver_user_id": 3, "member_user_id": 1, "appointment_date": "2025-10-10",
+         "appointment_time": "14:00", "work_hours": 1, "status": "pending"},
+        {"caregiver_user_id": 3, "member_user_id": 1, "appointment_date": "2025-10-10",
+         "appointment_time": "14:00", "work_hours": 1, "status": "declined"},
+    ]
+    with app.app_context():
+        report = import_rows("appointments", rows)
+        assert report.written == 2
+        assert [number for number, _ in report.errors] == [1, 3]
+        assert report.errors[0][1].startswith("Caregiver 3 is already booked")
+        assert db.session.query(Appointment).filter_by(caregiver_user_id=3).count() == 3
+
+
+def test_overlaps_across_column_groups_are_caught(app):
+    rows = [
+        # An explicit id puts this row in a different column group.
+        {"appointment_id": 50, "caregiver_user_id": 4, "member_user_id": 2, "appointment_date": "2025-11-01",
+         "appointment_time": "13:00", "work_hours": 2},
+        {"caregiver_user_id": 4, "member_user_id": 1, "appointment_date": "2025-11-01",
+         "appointment_time": "14:00", "work_hours": 1},
+    ]
+    with app.app_context():
+        report = import_rows("appointments", rows)
+        assert report.written == 1
+        assert [number for number, _ in report.errors] == [2]
+
+
+def test_retries_relock_the_caregivers(app, monkeypatch):
+    locked = []
+    monkeypatch.setattr(bulk_import, "lock_caregivers", lambda connection, ids: locked.append(sorted(ids)))
+    rows = [
+        {"appointment_id": 50, "caregiver_user_id": 4, "member_user_id": 2, "appointment_date": "2025-11-01",
+         "appointment_time": "09:00", "work_hours": 1},
+        # A taken id: the insert fails and is retried half by half.
+        {"appointment_id": 1, "caregiver_user_id": 9, "member_user_id": 2, "appointment_date": "2025-11-01",
+         "appointment_time": "09:00", "work_hours": 1},
+    ]
+    with app.app_context():
+        report = import_rows("appointments", rows)
+    assert report.written == 1 and [number for number, _ in report.errors] == [2]
+    # The batch check, then each half of the failed insert.
+    assert locked == [[4, 9], [4], [9]]
+
+
+def test_skipped_conflicts_are_not_counted(app):
+    table = JobApplication.__table__
+    statement = (
+        sqlite.insert(table)
+        .on_conflict_do_nothing(index_elements=["caregiver_user_id", "job_id"])
+        .returning(table.c.caregiver_user_id, table.c.job_id)
+    )
+    rows = [(1, {"caregiver_user_id": 3, "job_id": 1}), (2, {"caregiver_user_id": 4, "job_id": 1})]
+    report, logged = ImportReport(), []
+    with app.app_context(), db.engine.connect() as connection:
+        _write(connection, statement, rows, report, lambda connection, keys: logged.extend(keys))
+    assert report.written == 1
+    assert [tuple(key) for key in logged] == [(4, 1)]
+
+
+def test_upload_renders_the_report(client):
+    data = {"file": (io.BytesIO(b"email,given_name,surname,password\nx,Ann,One,p\n"), "users.csv")}
+    response = client.post("/users/import", data=data, content_type="multipart/form-data")
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    assert "0 rows written, 1 failed" in body
+    assert "Email must contain @" in body
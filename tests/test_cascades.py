@@ -0,0 +1,72 @@
+from sqlalchemy import event, func, inspect, select, text
+
+from part3_app import write_events
+from part3_app.models import Address, Appointment, Job, JobApplication, Member, User, db
+
+
+def _count(model, *conditions):
+    return db.session.scalar(select(func.count()).select_from(model).where(*conditions))
+
+
+def _assert_member_1_is_gone():
+    assert _count(Member, Member.member_user_id == 1) == 0
+    assert _count(Address, Address.member_user_id == 1) == 0
+    assert _count(Job, Job.member_user_id == 1) == 0
+    assert _count(JobApplication, JobApplication.job_id == 1) == 0
+    assert _count(Appointment, Appointment.member_user_id == 1) == 0
+    # Other members' rows are untouched.
+    assert _count(Job) == 4
+    assert _count(Appointment) == 2
+
+
+def test_every_foreign_key_cascades(app):
+    with app.app_context():
+        inspector = inspect(db.engine)
+        for table in db.metadata.sorted_tables:
+            for foreign_key in inspector.get_foreign_keys(table.name):
+                assert foreign_key["options"].get("ondelete") == "CASCADE", (table.name, foreign_key)
+
+
+def test_orm_delete_leaves_children_to_the_database(app):
+    model_tables = {table.name for table in db.metadata.sorted_tables if not table.name.startswith("report_")}
+    deletes = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        words = statement.split()
+        if words[:2] == ["DELETE", "FROM"] and words[2].strip('"') in model_tables:
+            deletes.append(words[2].strip('"'))
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", capture)
+        try:
+            db.session.delete(db.session.get(User, 1))
+            db.session.commit()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", capture)
+        assert deletes == ["user"]
+        _assert_member_1_is_gone()
+
+
+def test_raw_deletes_cascade_too(app):
+    with app.app_context():
+        db.session.execute(text('DELETE FROM "user" WHERE user_id = 1'))
+        db.session.commit()
+        _assert_member_1_is_gone()
+
+
+def test_form_delete_reports_cascaded_tables(app, client, monkeypatch):
+    seen = []
+    monkeypatch.setattr(write_events, "_subscribers", [seen.append])
+    client.post("/users/delete/1")
+    (events,) = seen
+    cascaded = {write.model for write in events if write.op == "cascade"}
+    assert {Member, Address, Job, JobApplication, Appointment} <= cascaded
+    with app.app_context():
+        _assert_member_1_is_gone()
+
+
+def test_deleting_a_job_removes_its_applications(app, client):
+    assert client.post("/jobs/delete/1").status_code == 302
+    with app.app_context():
+        assert _count(JobApplication, JobApplication.job_id == 1) == 0
+        assert _count(JobApplication) == 4
@@ -0,0 +1,184 @@
+import time
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select
+
+from part3_app.archive import archive
+from part3_app.bulk_import import import_rows
+from part3_app.changes import change_log, trim
+from part3_app.models import User, db
+from part3_app.seed_data import seed
+
+NEW_USER = {"email": "new@mail.com", "given_name": "New", "surname": "User", "password": "x"}
+
+
+def _newest(app):
+    with app.app_context():
+        return db.session.scalar(select(func.max(change_log.c.seq))) or 0
+
+
+def _changes(client, since, **args):
+    response = client.get("/changes", query_string={"since": since, **args})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def _ops(changes):
+    return [(change["resource"], change["op"], change["pk"]) for change in changes]
+
+
+def test_form_writes_are_logged_in_order(app, client):
+    since = _newest(app)
+    client.post("/users/create", data=NEW_USER)
+    client.post("/users/edit/11", data={**NEW_USER, "surname": "Renamed"})
+    client.post("/users/delete/11")
+    body = _changes(client, since)
+    assert _ops(body["changes"]) == [
+        ("users", "insert", {"user_id": 11}),
+        ("users", "update", {"user_id": 11}),
+        ("users", "delete", {"user_id": 11}),
+    ]
+    seqs = [change["seq"] for change in body["changes"]]
+    assert seqs == sorted(seqs) and body["next"] == seqs[-1] and not body["more"]
+    assert _changes(client, body["next"])["changes"] == []
+
+
+def test_cascaded_rows_are_logged_as_deletes(app, client):
+    since = _newest(app)
+    client.post("/users/delete/1")
+    deleted = {(change["resource"], tuple(change["pk"].values())) for change in _changes(client, since)["changes"]}
+    assert deleted == {
+        ("users", (1,)), ("members", (1,)), ("addresses", (1,)), ("jobs", (1,)), ("jobs", (4,)),
+        ("job_applications", (3, 1)), ("job_applications", (7, 1)),
+        ("appointments", (1,)), ("appointments", (2,)),
+    }
+
+
+def test_api_writes_use_the_resource_key_order(app, client):
+    since = _newest(app)
+    client.post("/api/job_applications", json={"caregiver_user_id": 4, "job_id": 4})
+    client.patch("/api/job_applications/4,4", json={"date_applied": "2025-10-06"})
+    assert _ops(_changes(client, since)["changes"]) == [
+        ("job_applications", "insert", {"caregiver_user_id": 4, "job_id": 4}),
+        ("job_applications", "update", {"caregiver_user_id": 4, "job_id": 4}),
+    ]
+
+
+def test_rolled_back_writes_are_not_logged(app, client):
+    since = _newest(app)
+    client.post("/api/users", json=[NEW_USER, {"email": "broken"}])
+    assert _changes(client, since)["changes"] == []
+
+
+def test_imports_and_archiving_are_logged(app, client):
+    since = _newest(app)
+    with app.app_context():
+        import_rows("users", [NEW_USER])
+        import_rows("caregivers", [{"caregiver_user_id": 3, "hourly_rate": "9.00"}], upsert=True)
+        archive(date(2025, 10, 11))
+    changes = _ops(_changes(client, since)["changes"])
+    assert changes[:3] == [
+        ("users", "insert", {"user_id": 11}),
+        ("caregivers", "upsert", {"caregiver_user_id": 3}),
+        ("appointments", "archive", {"appointment_id": 1}),
+    ]
+    # Every seeded job was posted before the cutoff, so all applications moved.
+    assert [(resource, op) for resource, op, _ in changes[3:]] == [("job_applications", "archive")] * 6
+
+
+def test_limit_pages_and_resource_filters(app, client):
+    since = _newest(app)
+    for number in range(3):
+        client.post("/api/users", json={**NEW_USER, "email": f"new{number}@mail.com"})
+    client.delete("/api/appointments/4")
+    first = _changes(client, since, limit=2)
+    assert len(first["changes"]) == 2 and first["more"]
+    rest = _changes(client, first["next"], limit=2)
+    assert [change["pk"] for change in rest["changes"]] == [{"user_id": 13}, {"appointment_id": 4}]
+    assert not rest["more"]
+    only = _changes(client, since, resource="appointments")["changes"]
+    assert _ops(only) == [("appointments", "delete", {"appointment_id": 4})]
+
+
+@pytest.mark.parametrize("query", ["since=-1", "since=x", "resource=nothing", "limit=0", "limit=100000"])
+def test_bad_arguments_are_400(client, query):
+    assert client.get(f"/changes?{query}").status_code == 400
+
+
+def test_trimmed_history_is_a_410(app, client):
+    client.post("/users/create", data=NEW_USER)
+    newest = _newest(app)
+    with app.app_context():
+        assert trim(0, 1) > 0
+        assert trim(0, 1) == 0
+    gone = client.get("/changes?since=0")
+    assert gone.status_code == 410
+    assert (gone.get_json()["oldest"], gone.get_json()["head"]) == (newest, newest)
+    assert _changes(client, newest - 1)["changes"][0]["seq"] == newest
+    body = _changes(client, newest)
+    assert body["changes"] == [] and (body["oldest"], body["head"]) == (newest, newest)
+
+
+def test_since_past_the_head_is_a_410(app, client):
+    assert client.get(f"/changes?since={_newest(app) + 1}").status_code == 410
+
+
+def test_mirror_recovers_from_a_410(app, client):
+    mirror = {row["user_id"] for row in client.get("/api/users?per_page=100").get_json()["data"]}
+    since = _changes(client, 0)["head"]
+    client.post("/users/create", data=NEW_USER)
+    client.post("/users/create", data={**NEW_USER, "email": "other@mail.com"})
+    with app.app_context():
+        trim(0, 1)
+
+    gone = client.get(f"/changes?since={since}")
+    assert gone.status_code == 410
+    head = gone.get_json()["head"]
+    mirror = {row["user_id"] for row in client.get("/api/users?per_page=100").get_json()["data"]}
+    client.post("/users/delete/1")
+    for change in _changes(client, head, resource="users")["changes"]:
+        if change["op"] == "delete":
+            mirror.discard(change["pk"]["user_id"])
+    assert mirror == set(range(2, 13))
+
+
+def test_sequence_numbers_are_not_reused_after_trimming(app, client):
+    newest = _newest(app)
+    with app.app_context():
+        db.session.execute(change_log.delete())
+        db.session.commit()
+    client.post("/users/create", data=NEW_USER)
+    assert _newest(app) > newest
+
+
+def test_writes_trim_the_log_in_the_background(make_app):
+    app = make_app(CHANGE_LOG_MAX_ROWS=5, CHANGE_LOG_TRIM_SECONDS=0)
+    seed(app)
+    with app.app_context():
+        deadline = time.monotonic() + 5
+        while db.session.scalar(select(func.count()).select_from(change_log)) > 5 and time.monotonic() < deadline:
+            db.session.remove()
+            time.sleep(0.01)
+        assert db.session.scalar(select(func.count()).select_from(change_log)) == 5
+
+
+def test_stream_sends_events_and_resumes_from_last_event_id(make_app):
+    app = make_app(CHANGES_STREAM_SECONDS=0.2, CHANGES_POLL_SECONDS=0.05)
+    seed(app)
+    client = app.test_client()
+    newest = _newest(app)
+    with app.app_context():
+        db.session.get(User, 2).city = "Oral"
+        db.session.commit()
+    response = client.get("/changes/stream", headers={"Last-Event-ID": str(newest)})
+    assert response.mimetype == "text/event-stream"
+    body = response.get_data(as_text=True)
+    assert body.startswith("retry: 50\n\n")
+    assert f"id: {newest + 1}\nevent: change\n" in body
+    assert '"op": "update"' in body and f"id: {newest}\n" not in body
+    with app.app_context():
+        trim(0, 1)
+    head = _newest(app)
+    reset = client.get("/changes/stream?since=0").get_data(as_text=True)
+    assert f'event: reset\ndata: {{"oldest": {head}, "head": {head}}}' in reset
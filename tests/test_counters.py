@@ -0,0 +1,66 @@
+import time
+
+from sqlalchemy import text
+
+from part3_app.app import create_app
+from part3_app.counters import counters
+from part3_app.models import db
+
+
+def _wait_for_generation(generation, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while counters.generation == generation and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return counters.generation != generation
+
+
+def test_snapshot_counts_every_resource(app):
+    with app.app_context():
+        counts = counters.snapshot()
+    assert counts["users"] == 10
+    assert counts["caregivers"] == 7
+    assert counts["appointments"] == 4
+
+
+def test_orm_writes_adjust_counts_without_recounting(app, client):
+    with app.app_context():
+        counters.snapshot()
+    generation = counters.generation
+
+    client.post("/users/create", data={"email": "new@mail.com", "given_name": "New", "surname": "User", "password": "x"})
+    client.post("/appointments/delete/4")
+
+    with app.app_context():
+        counts = counters.snapshot()
+    assert counts["users"] == 11
+    assert counts["appointments"] == 3
+    assert counters.generation == generation
+
+
+def test_invalidate_recounts_in_background(app):
+    with app.app_context():
+        counters.snapshot()
+        db.session.execute(text("DELETE FROM address"))
+        db.session.commit()
+        generation = counters.generation
+        counters.invalidate()
+        counters.snapshot()
+    assert _wait_for_generation(generation)
+    with app.app_context():
+        assert counters.snapshot()["addresses"] == 0
+
+
+def test_dashboard_shows_counts(client):
+    body = client.get("/").get_data(as_text=True)
+    assert "10 records" in body
+
+
+def test_a_new_app_starts_from_fresh_counts(app, tmp_path, monkeypatch):
+    with app.app_context():
+        assert counters.snapshot()["users"] == 10
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'other.db'}")
+    other = create_app()
+    with other.app_context():
+        assert counters.snapshot()["users"] == 0
+        db.session.remove()
+        db.engine.dispose()
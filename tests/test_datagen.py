@@ -0,0 +1,56 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from part3_app.datagen import Generator, generate
+from part3_app.models import Address, Appointment, Caregiver, Job, JobApplication, Member, User, db
+from part3_app.seed_data import seed
+
+
+def _dump(generator):
+    rows = list(generator.user_rows()) + list(generator.caregiver_rows()) + list(generator.member_rows())
+    return rows + list(generator.address_rows()) + list(generator.job_rows()) + list(generator.appointment_rows())
+
+
+def test_same_seed_same_rows():
+    assert _dump(Generator(200, 7, 0.4)) == _dump(Generator(200, 7, 0.4))
+    assert _dump(Generator(200, 7, 0.4)) != _dump(Generator(200, 8, 0.4))
+
+
+def test_generate_fills_every_table_consistently(make_app):
+    app = make_app()
+    with app.app_context():
+        counts = generate(300, seed=3, batch_size=64)
+        models = {"user": User, "caregiver": Caregiver, "member": Member, "address": Address,
+                  "job": Job, "job_application": JobApplication, "appointment": Appointment}
+        for table, model in models.items():
+            assert db.session.scalar(select(func.count()).select_from(model)) == counts[table]
+        assert counts["user"] == 300
+        assert counts["caregiver"] + counts["member"] == 300
+        assert counts["address"] == counts["member"]
+
+        mismatched = db.session.scalar(
+            select(func.count())
+            .select_from(JobApplication)
+            .join(Job)
+            .join(Caregiver)
+            .where(Caregiver.caregiving_type != Job.required_caregiving_type)
+        )
+        assert mismatched == 0
+
+        shifts = defaultdict(list)
+        for row in db.session.execute(select(Appointment)).scalars():
+            start = datetime.combine(row.appointment_date, row.appointment_time)
+            shifts[row.caregiver_user_id].append((start, start + timedelta(hours=row.work_hours)))
+        for intervals in shifts.values():
+            intervals.sort()
+            assert all(earlier[1] <= later[0] for earlier, later in zip(intervals, intervals[1:]))
+
+
+def test_generate_refuses_a_populated_database(make_app):
+    app = make_app()
+    seed(app)
+    with app.app_context(), pytest.raises(RuntimeError, match="already contains users"):
+        generate(10)
@@ -0,0 +1,39 @@
+import csv
+import io
+import json
+
+
+def test_csv_export_streams_every_row_without_secrets(client):
+    response = client.get("/users/export.csv")
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    assert response.headers["Content-Disposition"] == "attachment; filename=users.csv"
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0] == ["user_id", "email", "given_name", "surname", "city", "phone_number", "profile_description"]
+    assert [row[0] for row in rows[1:]] == [str(n) for n in range(1, 11)]
+    assert "password1" not in response.get_data(as_text=True)
+
+
+def test_csv_export_formats_values(client):
+    rows = list(csv.DictReader(io.StringIO(client.get("/appointments/export.csv").get_data(as_text=True))))
+    assert rows[0]["appointment_date"] == "2025-10-10"
+    assert rows[0]["appointment_time"] == "09:00"
+    caregivers = list(csv.DictReader(io.StringIO(client.get("/caregivers/export.csv").get_data(as_text=True))))
+    assert caregivers[0]["hourly_rate"] == "7.50"
+
+
+def test_jsonl_export_keeps_ints_as_numbers(client, app):
+    app.config["EXPORT_BATCH_SIZE"] = 2
+    response = client.get("/jobs/export.jsonl")
+    assert response.mimetype == "application/x-ndjson"
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(records) == 6
+    assert records[0] == {
+        "job_id": 1,
+        "member_user_id": 1,
+        "required_caregiving_type": "babysitter",
+        "other_requirements": "punctual",
+        "date_posted": "2025-10-01",
+    }
+    users = client.get("/users/export.jsonl").get_data(as_text=True)
+    assert "password" not in users
@@ -0,0 +1,40 @@
+import pytest
+
+
+def _refs(client, query):
+    return [(row["kind"], row["ref"]) for row in client.get(f"/search?{query}").get_json()]
+
+
+def test_finds_documents_across_kinds(client):
+    found = _refs(client, "q=babysitter")
+    assert {("user", 2), ("user", 10), ("job", 1), ("job", 2), ("job", 5)} <= set(found)
+    assert sorted(_refs(client, "q=babysitter&kind=job")) == [("job", 1), ("job", 2), ("job", 5)]
+
+
+def test_results_link_to_the_record_and_mark_the_match(client):
+    (row,) = client.get("/search?q=mother&kind=member").get_json()
+    assert row["ref"] == 6
+    assert row["url"] == "/members/edit/6"
+    assert "[mother]" in row["snippet"]
+
+
+def test_terms_are_stemmed(client):
+    assert ("member", 6) in _refs(client, "q=supports")
+
+
+def test_writes_keep_the_index_current(client):
+    client.post("/users/edit/4", data={"email": "ali@mail.com", "given_name": "Ali", "surname": "Mukha",
+                                      "profile_description": "Chess tutor", "password": "password4"})
+    assert _refs(client, "q=chess") == [("user", 4)]
+    client.post("/users/delete/4")
+    assert _refs(client, "q=chess") == []
+
+
+@pytest.mark.parametrize("query", ['"', "NEAR(", "a OR", "col:x*"])
+def test_query_syntax_is_treated_as_text(client, query):
+    assert client.get("/search", query_string={"q": query}).status_code == 200
+
+
+@pytest.mark.parametrize("query", ["q=", "q=%20", "q=kind&limit=0", "q=kind&limit=101"])
+def test_bad_arguments_are_400(client, query):
+    assert client.get(f"/search?{query}").status_code == 400
@@ -0,0 +1,58 @@
+import logging
+
+import pytest
+
+from part3_app.instrumentation import recent_requests
+from part3_app.seed_data import seed
+
+
+@pytest.fixture
+def instrumented(make_app):
+    def make(**overrides):
+        app = make_app(SQL_INSTRUMENTATION=True, **overrides)
+        seed(app)
+        return app.test_client()
+
+    return make
+
+
+def test_off_by_default(client):
+    assert "Server-Timing" not in client.get("/caregivers/search").headers
+
+
+def test_summarises_queries_per_request(instrumented):
+    client = instrumented()
+    response = client.get("/caregivers/search?gender=Male")
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    summary = recent_requests()[0]
+    assert summary["method"] == "GET"
+    assert summary["path"] == "/caregivers/search?gender=Male"
+    assert summary["count"] >= 1
+    assert summary["slowest"][0]["statement"].lstrip().upper().startswith("SELECT")
+
+
+def test_flags_repeated_statements(instrumented, caplog):
+    client = instrumented(SQL_REPEAT_THRESHOLD=1)
+    with caplog.at_level(logging.WARNING):
+        client.get("/caregivers/search")
+    assert recent_requests()[0]["repeated"]
+    assert "possible N+1" in caplog.text
+
+
+def test_streamed_pages_are_summarised_on_close(instrumented):
+    client = instrumented()
+    response = client.get("/users?per_page=5")
+    assert "Server-Timing" not in response.headers
+    response.get_data()
+    response.close()
+    summary = recent_requests()[0]
+    assert summary["path"] == "/users?per_page=5"
+    assert summary["count"] >= 1
+
+
+def test_debug_page_lists_recent_requests(instrumented):
+    client = instrumented(SQL_DEBUG_PAGE=True)
+    client.get("/caregivers/search")
+    body = client.get("/_debug/queries").get_data(as_text=True)
+    assert "/caregivers/search" in body
+    assert recent_requests()[0]["path"] == "/caregivers/search"
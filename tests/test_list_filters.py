@@ -0,0 +1,137 @@
+import re
+from datetime import time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+
+from part3_app.models import User, db
+from part3_app.resources import ListSort, _encode_cursor, _parse_sort_cursor
+
+
+def _keys(response, resource):
+    return [
+        tuple(int(part) for part in key.split("/"))
+        for key in re.findall(rf'/{resource}/edit/([\d/]+)"', response.get_data(as_text=True))
+    ]
+
+
+def _after(response):
+    return re.search(r'after=([^&"]+)', response.get_data(as_text=True)).group(1)
+
+
+def test_equality_filters(client):
+    assert _keys(client.get("/appointments?status=accepted"), "appointments") == [(1,), (3,)]
+    assert _keys(client.get("/jobs?member_user_id=6"), "jobs") == [(3,), (6,)]
+    assert _keys(client.get("/jobs?required_caregiving_type=elderly&member_user_id=6"), "jobs") == [(3,), (6,)]
+
+
+def test_range_filters_on_dates(client):
+    response = client.get("/appointments?appointment_date__gte=2025-10-11&appointment_date__lte=2025-10-12")
+    assert _keys(response, "appointments") == [(2,), (3,)]
+
+
+def test_filters_on_related_columns(client):
+    assert _keys(client.get("/caregivers?user.city=Shymkent"), "caregivers") == [(3,), (5,)]
+
+
+def test_filters_are_carried_into_pager_links(client):
+    response = client.get("/jobs?required_caregiving_type=babysitter&per_page=2")
+    assert _keys(response, "jobs") == [(1,), (2,)]
+    (link,) = re.findall(r'href="(/jobs\?[^"]*after=[^"]*)"', response.get_data(as_text=True))
+    assert _keys(client.get(link.replace("&amp;", "&")), "jobs") == [(5,)]
+
+
+def test_descending_sort_breaks_ties_by_key_and_pages(client):
+    first = client.get("/caregivers?sort=-hourly_rate&per_page=3")
+    assert _keys(first, "caregivers") == [(8,), (5,), (4,)]
+    second = client.get(f"/caregivers?sort=-hourly_rate&per_page=3&after={_after(first)}")
+    assert _keys(second, "caregivers") == [(9,), (7,), (10,)]
+    before = re.search(r'before=([^&"]+)', second.get_data(as_text=True)).group(1)
+    assert _keys(client.get(f"/caregivers?sort=-hourly_rate&per_page=3&before={before}"), "caregivers") == [
+        (8,), (5,), (4,)
+    ]
+
+
+@pytest.mark.parametrize("sort", ["city", "-city"])
+def test_nulls_sort_last_either_way(app, client, sort):
+    with app.app_context():
+        db.session.add(User(email="nocity@mail.com", given_name="No", surname="City", password="x"))
+        db.session.commit()
+    keys = []
+    url = f"/users?sort={sort}&per_page=4"
+    while url:
+        response = client.get(url)
+        keys += _keys(response, "users")
+        found = re.search(r'after=([^&"]+)', response.get_data(as_text=True))
+        url = found and f"/users?sort={sort}&per_page=4&after={found.group(1)}"
+    assert len(keys) == 11
+    assert keys[-1] == (11,)
+
+
+def _link(response, name):
+    found = re.search(rf'{name}=([^&"]+)', response.get_data(as_text=True))
+    return found and found.group(1)
+
+
+@pytest.mark.parametrize("sort", ["city", "-city", "surname", "-surname"])
+def test_every_row_appears_once_walking_both_ways(app, client, sort):
+    with app.app_context():
+        for number, city in enumerate(["", "", None, None, None, "Almaty", "Oral", "Oral"]):
+            db.session.add(User(email=f"walk{number}@mail.com", given_name="Walk", surname="Oral" if number % 2 else "",
+                                city=city, password="x"))
+        db.session.commit()
+    pages = []
+    url = f"/users?sort={sort}&per_page=2"
+    while url:
+        response = client.get(url)
+        pages.append(_keys(response, "users"))
+        after = _link(response, "after")
+        url = after and f"/users?sort={sort}&per_page=2&after={after}"
+    forward = [key for page in pages for key in page]
+    assert sorted(forward) == [(user_id,) for user_id in range(1, 19)]
+
+    backward = []
+    before = _link(response, "before")
+    while before:
+        response = client.get(f"/users?sort={sort}&per_page=2&before={before}")
+        backward = _keys(response, "users") + backward
+        before = _link(response, "before")
+    assert backward + pages[-1] == forward
+
+
+def test_sort_cursors_keep_exact_values():
+    sort = ListSort(None, "column_0", "time", False, True)
+    for value in (time(9, 30, 15), time(9, 30, 15, 250)):
+        record = SimpleNamespace(column_0=value, appointment_id=4)
+        assert _parse_sort_cursor(_encode_cursor(record, ["appointment_id"], sort), ["appointment_id"], sort) == (
+            value, (4,)
+        )
+    text_sort = sort._replace(parser="string")
+    record = SimpleNamespace(column_0="", appointment_id=4)
+    assert _parse_sort_cursor(_encode_cursor(record, ["appointment_id"], text_sort), ["appointment_id"], text_sort) == (
+        "", (4,)
+    )
+
+
+@pytest.mark.parametrize("url", [
+    "/appointments?appointment_date__gte=yesterday",
+    "/jobs?member_user_id=six",
+    "/users?sort=password",
+    "/caregivers?sort=-nope",
+    "/caregivers?sort=hourly_rate&after=3",
+])
+def test_bad_filters_and_sorts_are_400(client, url):
+    assert client.get(url).status_code == 400
+
+
+@pytest.mark.parametrize("query, index", [
+    ("SELECT * FROM appointment WHERE status = 'accepted' AND appointment_date >= '2025-10-01'",
+     "ix_appointment_status_date"),
+    ("SELECT * FROM job WHERE member_user_id = 1", "ix_job_member"),
+    ("SELECT * FROM job_application WHERE job_id = 1", "ix_job_application_job"),
+])
+def test_filtered_views_use_an_index(app, query, index):
+    with app.app_context():
+        plan = " ".join(row[-1] for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {query}")))
+    assert index in plan
@@ -0,0 +1,65 @@
+import re
+
+import pytest
+from sqlalchemy import event
+
+from part3_app.models import db
+from part3_app.seed_data import seed
+
+
+@pytest.fixture
+def uncached(make_app):
+    app = make_app(PAGE_CACHE_ENABLED=False)
+    seed(app)
+    return app
+
+
+def _selects(app, client, url):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        body = client.get(url).get_data(as_text=True)
+    finally:
+        with app.app_context():
+            event.remove(db.engine, "before_cursor_execute", capture)
+    return body, statements
+
+
+def test_list_is_streamed(uncached):
+    response = uncached.test_client().get("/users")
+    assert response.is_streamed
+    assert "Content-Length" not in response.headers
+    body = response.get_data(as_text=True)
+    assert body.rstrip().endswith("</html>")
+    assert body.count('href="/users/edit/') == 10
+
+
+def test_list_selects_only_the_shown_columns(uncached):
+    body, statements = _selects(uncached, uncached.test_client(), "/users")
+    (listing,) = [statement for statement in statements if 'FROM "user"' in statement or "FROM user" in statement]
+    assert "profile_description" not in listing
+    assert "password" not in listing
+    assert "Sultan" in body
+
+
+def test_related_columns_are_joined_into_one_query(uncached):
+    body, statements = _selects(uncached, uncached.test_client(), "/appointments")
+    assert len([statement for statement in statements if "appointment" in statement]) == 1
+    assert re.search(r"<td>\s*Beka\s*</td>", body)
+
+
+def test_flashed_message_is_shown_once(uncached):
+    client = uncached.test_client()
+    created = client.post(
+        "/users/create",
+        data={"email": "new@mail.com", "given_name": "New", "surname": "User", "password": "x"},
+        follow_redirects=True,
+    )
+    assert "Users record created." in created.get_data(as_text=True)
+    assert "Users record created." not in client.get("/users").get_data(as_text=True)
@@ -0,0 +1,129 @@
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from part3_app import matching  # noqa: E402
+from part3_app.datagen import generate  # noqa: E402
+from part3_app.matching import APPLIED_WEIGHT, CITY_WEIGHT, RATE_REFERENCE, RATE_WEIGHT, matcher  # noqa: E402
+from part3_app.models import Address, Caregiver, Job, JobApplication, User, db  # noqa: E402
+
+TOP_K = 3
+
+
+def _expected():
+    """Every job's top-k, scored one pair at a time in plain Python."""
+    caregivers = [
+        (caregiver.caregiver_user_id, caregiver.caregiving_type, caregiver.user.city, caregiver.hourly_rate)
+        for caregiver in Caregiver.query
+    ]
+    applied = {(row.job_id, row.caregiver_user_id) for row in JobApplication.query}
+    towns = {address.member_user_id: address.town for address in Address.query}
+    expected = {}
+    for job in Job.query:
+        town = towns.get(job.member_user_id)
+        scored = []
+        for caregiver_id, kind, city, rate in caregivers:
+            if job.required_caregiving_type is not None and kind != job.required_caregiving_type:
+                continue
+            score = 0.0 if rate is None else RATE_WEIGHT * RATE_REFERENCE / (RATE_REFERENCE + float(rate))
+            score += CITY_WEIGHT * (town is not None and city == town)
+            score += APPLIED_WEIGHT * ((job.job_id, caregiver_id) in applied)
+            scored.append((-round(score, 9), caregiver_id))
+        expected[job.job_id] = [caregiver_id for _, caregiver_id in sorted(scored)[:TOP_K]]
+    return expected
+
+
+def _actual():
+    return {row["job_id"]: [match["caregiver_user_id"] for match in row["matches"]] for row in matcher.all_matches()}
+
+
+@pytest.fixture
+def generated(make_app):
+    app = make_app(MATCH_TOP_K=TOP_K)
+    with app.app_context():
+        generate(400, seed=11, batch_size=128)
+    return app
+
+
+def test_vectorised_scores_match_pairwise_scoring(generated):
+    with generated.app_context():
+        assert _actual() == _expected()
+
+
+def _change_rates():
+    for caregiver in Caregiver.query.limit(20):
+        caregiver.hourly_rate = Decimal("5.00")
+
+
+def _move_caregivers():
+    town = Address.query.first().town
+    for caregiver in Caregiver.query.offset(20).limit(10):
+        caregiver.user.city = town
+
+
+def _apply():
+    job = Job.query.first()
+    for caregiver in Caregiver.query.filter_by(caregiving_type=job.required_caregiving_type).limit(5):
+        db.session.merge(JobApplication(caregiver_user_id=caregiver.caregiver_user_id, job_id=job.job_id))
+
+
+def _retype_jobs():
+    for job in Job.query.limit(10):
+        job.required_caregiving_type = None if job.job_id % 2 else "elderly"
+
+
+def _move_a_member():
+    address = Address.query.first()
+    address.town = "Nowhere"
+
+
+def _delete_caregivers():
+    for caregiver in Caregiver.query.order_by(Caregiver.hourly_rate).limit(5):
+        db.session.delete(db.session.get(User, caregiver.caregiver_user_id))
+
+
+def _add_a_job():
+    address = Address.query.first()
+    db.session.add(Job(member_user_id=address.member_user_id, required_caregiving_type="babysitter"))
+
+
+@pytest.mark.parametrize(
+    "change", [_change_rates, _move_caregivers, _apply, _retype_jobs, _move_a_member, _delete_caregivers, _add_a_job]
+)
+def test_writes_refresh_matches_incrementally(generated, change):
+    with generated.app_context():
+        _actual()
+        change()
+        db.session.commit()
+        assert _actual() == _expected()
+        assert not matcher._stale_jobs and not matcher._stale_caregivers
+
+
+def test_job_matches_route(client):
+    response = client.get("/jobs/3/matches?limit=2")
+    assert response.status_code == 200
+    matches = response.get_json()["matches"]
+    # Job 3 wants elderly care in Astana; both elderly caregivers applied.
+    assert [match["caregiver_user_id"] for match in matches] == [5, 8]
+    assert client.get("/jobs/99/matches").status_code == 404
+
+
+def test_missing_numpy_is_a_503(client, monkeypatch):
+    def unavailable():
+        raise matching.MatchingUnavailable("Job matching needs NumPy: pip install numpy")
+
+    monkeypatch.setattr(matcher, "np", None)
+    monkeypatch.setattr(matching, "_numpy", unavailable)
+    matcher.invalidate()
+    assert client.get("/jobs/1/matches").status_code == 503
+    assert client.get("/users").status_code == 200
+
+
+def test_match_command_writes_every_job(app, tmp_path):
+    output = tmp_path / "matches.jsonl"
+    result = app.test_cli_runner().invoke(args=["match-jobs", "--output", str(output)])
+    assert result.exit_code == 0, result.output
+    assert result.output.startswith("Matched 6 jobs against 7 caregivers")
+    assert len(output.read_text().splitlines()) == 6
@@ -0,0 +1,93 @@
+from part3_app import page_cache as page_cache_module
+from part3_app.page_cache import MemoryBackend, PageCache
+from part3_app.seed_data import seed
+
+
+def _body(response):
+    return response.get_data(as_text=True)
+
+
+def test_matching_etag_is_a_304(client):
+    first = client.get("/users")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert "no-cache" in first.headers["Cache-Control"]
+    assert "Last-Modified" in first.headers
+    again = client.get("/users", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+
+
+def test_cached_body_is_served_again(client):
+    first = _body(client.get("/users"))
+    cached = client.get("/users")
+    assert "Content-Length" in cached.headers
+    assert _body(cached) == first
+
+
+def test_writes_change_only_the_pages_that_read_the_table(client):
+    users = client.get("/users").headers["ETag"]
+    jobs = client.get("/jobs").headers["ETag"]
+    client.post("/appointments/delete/4", follow_redirects=True)
+    assert client.get("/users").headers["ETag"] == users
+    client.post(
+        "/users/create",
+        data={"email": "new@mail.com", "given_name": "New", "surname": "User", "password": "x"},
+        follow_redirects=True,
+    )
+    assert client.get("/users", headers={"If-None-Match": users}).status_code == 200
+    # The jobs list shows the member's surname, so it reads "user" too.
+    assert client.get("/jobs").headers["ETag"] != jobs
+
+
+def test_flashed_pages_are_not_cached(client):
+    client.get("/users")
+    response = client.post(
+        "/users/create",
+        data={"email": "new@mail.com", "given_name": "New", "surname": "User", "password": "x"},
+        follow_redirects=True,
+    )
+    assert "Users record created." in _body(response)
+    assert "ETag" not in response.headers
+    assert "Users record created." not in _body(client.get("/users"))
+
+
+def test_disabled_cache_sends_no_etag(make_app):
+    app = make_app(PAGE_CACHE_ENABLED=False)
+    seed(app)
+    assert "ETag" not in app.test_client().get("/users").headers
+
+
+def test_bump_increments_versions_by_one(app):
+    cache = PageCache()
+    with app.app_context():
+        cache.init_app(app, MemoryBackend())
+    (before,), _ = cache.versions(["user"])
+    cache.bump(["user", "user"])
+    (after,), modified = cache.versions(["user"])
+    assert after == before + 1
+    assert modified >= before
+
+
+def test_memory_backend_honors_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(page_cache_module.time, "monotonic", lambda: now[0])
+    backend = MemoryBackend()
+    backend.set("page", "body", ttl=10)
+    backend.set("forever", "body")
+    backend.add("version", 5, ttl=10)
+    backend.add("version", 9, ttl=10)
+    assert backend.incr("version") == 6
+    now[0] += 11
+    assert backend.get("page") is None
+    assert backend.get("version") is None
+    assert backend.get("forever") == "body"
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(max_entries=2)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    backend.get("a")
+    backend.set("c", 3)
+    assert backend.get_many(["a", "b", "c"]) == [1, None, 3]
@@ -0,0 +1,51 @@
+import re
+
+import pytest
+
+
+def _keys(response, resource):
+    return [
+        tuple(int(part) for part in key.split("/"))
+        for key in re.findall(rf'/{resource}/edit/([\d/]+)"', response.get_data(as_text=True))
+    ]
+
+
+def _cursor(response, name):
+    found = re.search(rf'[?&;]{name}=([^&"]+)', response.get_data(as_text=True))
+    return found and found.group(1).replace("%2C", ",")
+
+
+def test_first_page_links_forward_only(client):
+    response = client.get("/users?per_page=3")
+    assert response.status_code == 200
+    assert _keys(response, "users") == [(1,), (2,), (3,)]
+    assert _cursor(response, "after") == "3"
+    assert _cursor(response, "before") is None
+
+
+def test_after_and_before_walk_the_key(client):
+    middle = client.get("/users?per_page=3&after=3")
+    assert _keys(middle, "users") == [(4,), (5,), (6,)]
+    assert _cursor(middle, "before") == "4"
+    assert _cursor(middle, "after") == "6"
+
+    back = client.get("/users?per_page=3&before=4")
+    assert _keys(back, "users") == [(1,), (2,), (3,)]
+
+
+def test_last_page_has_no_next(client):
+    response = client.get("/users?per_page=3&after=9")
+    assert _keys(response, "users") == [(10,)]
+    assert _cursor(response, "after") is None
+    assert _cursor(response, "before") == "10"
+
+
+def test_composite_key_cursor(client):
+    response = client.get("/job_applications?per_page=2&after=3,2")
+    assert _keys(response, "job_applications") == [(5, 3), (7, 1)]
+    assert _cursor(response, "after") == "7,1"
+
+
+@pytest.mark.parametrize("url", ["/users?after=abc", "/job_applications?after=3", "/users?per_page=x"])
+def test_bad_cursor_is_400(client, url):
+    assert client.get(url).status_code == 400
@@ -0,0 +1,34 @@
+import re
+
+import pytest
+
+from part3_app.instrumentation import recent_requests
+from part3_app.seed_data import seed
+
+
+def _cells(response):
+    rows = re.findall(r"<tr>(.*?)</tr>", response.get_data(as_text=True), re.S)
+    return [re.findall(r"<td>(.*?)</td>", row, re.S) for row in rows[1:]]
+
+
+def test_dotted_columns_follow_relationships(client):
+    caregivers = _cells(client.get("/caregivers?per_page=1"))
+    assert caregivers[0][:4] == ["3", "Beks", "Beka", "Shymkent"]
+    addresses = _cells(client.get("/addresses?per_page=1"))
+    assert addresses[0][:2] == ["1", "Sultan"]
+
+
+def test_two_hop_columns_use_separate_aliases(client):
+    # caregiver.user and member.user both join "user"; each needs its own alias.
+    rows = _cells(client.get("/appointments?per_page=1"))
+    assert rows[0][:5] == ["1", "3", "Beka", "1", "Sultan"]
+
+
+@pytest.mark.parametrize("resource", ["caregivers", "addresses", "jobs", "job_applications", "appointments"])
+def test_list_page_is_one_query(make_app, resource):
+    app = make_app(SQL_INSTRUMENTATION=True)
+    seed(app)
+    response = app.test_client().get(f"/{resource}")
+    response.get_data()
+    response.close()
+    assert recent_requests()[0]["count"] == 1
@@ -0,0 +1,71 @@
+import logging
+import sqlite3
+
+import pytest
+
+from part3_app.replicas import _engine_options, replica_router
+from part3_app.seed_data import seed
+
+NEW_USER = {"email": "new@mail.com", "given_name": "New", "surname": "User", "password": "x"}
+
+
+@pytest.fixture
+def replicated(make_app, tmp_path):
+    """An app whose replica is a copy of the seeded primary, with two surnames changed."""
+    primary = make_app()
+    seed(primary)
+    replica = tmp_path / "replica.db"
+    with sqlite3.connect(tmp_path / "test.db") as source, sqlite3.connect(replica) as target:
+        source.backup(target)
+        target.execute("UPDATE user SET surname = 'OnReplica' WHERE user_id IN (1, 3)")
+    return make_app(SQLALCHEMY_REPLICA_URLS=[f"sqlite:///{replica}"], REPLICA_HEALTH_INTERVAL=0.0)
+
+
+def _export(client):
+    return client.get("/users/export.csv").get_data(as_text=True)
+
+
+def test_reads_go_to_the_replica(replicated):
+    assert "OnReplica" in _export(replicated.test_client())
+
+
+def test_writes_go_to_the_primary_and_stick_to_it(replicated):
+    client = replicated.test_client()
+    assert client.post("/users/create", data=NEW_USER).status_code == 302
+    # The writer now reads its own change from the primary...
+    body = _export(client)
+    assert "new@mail.com" in body
+    assert "OnReplica" not in body
+    # ...while other clients keep reading the replica.
+    assert "OnReplica" in _export(replicated.test_client())
+
+
+def test_sticky_window_expires(replicated):
+    replica_router._sticky = 0.0
+    client = replicated.test_client()
+    client.post("/users/create", data=NEW_USER)
+    assert "OnReplica" in _export(client)
+
+
+def test_unreachable_replica_falls_back_to_primary(make_app, tmp_path, caplog):
+    app = make_app(SQLALCHEMY_REPLICA_URLS=[f"sqlite:///{tmp_path}/missing/replica.db"])
+    seed(app)
+    with caplog.at_level(logging.WARNING):
+        response = app.test_client().get("/users/export.csv")
+    assert response.status_code == 200
+    assert "raim@mail.com" in response.get_data(as_text=True)
+    assert "unavailable" in caplog.text
+
+
+def test_shared_caches_fill_from_the_primary(replicated):
+    client = replicated.test_client()
+    results = client.get("/caregivers/search?caregiving_type=babysitter").get_json()["results"]
+    assert {doc["surname"] for doc in results} == {"Beka", "Temir", "Neartur"}
+
+
+def test_replica_connects_time_out_quickly():
+    postgres = _engine_options("postgresql://db-replica/app", 1.5)
+    assert postgres["connect_args"]["connect_timeout"] == 2
+    assert "application_name" in postgres["connect_args"]["options"]
+    assert _engine_options("mysql+pymysql://db-replica/app", 0.2)["connect_args"] == {"connect_timeout": 1}
+    assert "connect_timeout" not in _engine_options("sqlite:///replica.db", 2)["connect_args"]
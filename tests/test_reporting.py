@@ -0,0 +1,127 @@
+import time
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from part3_app.models import Appointment, Caregiver, JobApplication, User, db
+from part3_app.reporting import (
+    caregiver_load,
+    claim_rebuild,
+    job_applications,
+    member_spend,
+    rebuild,
+    reports,
+    utilisation,
+)
+from part3_app.write_events import WriteEvent, publish
+
+TABLES = (member_spend, job_applications, caregiver_load, utilisation)
+
+
+def _snapshot():
+    return {table.name: sorted(tuple(row) for row in db.session.execute(select(table))) for table in TABLES}
+
+
+def _assert_incremental_matches_rebuild():
+    db.session.remove()
+    incremental = _snapshot()
+    rebuild()
+    assert incremental == _snapshot()
+
+
+def _accept_appointment_2():
+    db.session.get(Appointment, 2).status = "accepted"
+
+
+def _raise_a_rate():
+    db.session.get(Caregiver, 3).hourly_rate = Decimal("10.00")
+
+
+def _move_a_caregiver():
+    db.session.get(User, 5).city = "Almaty"
+
+
+def _book_and_apply():
+    db.session.add(Appointment(caregiver_user_id=9, member_user_id=2, appointment_date=date(2025, 10, 20),
+                               work_hours=2, status="accepted"))
+    db.session.add(JobApplication(caregiver_user_id=4, job_id=4, date_applied=date(2025, 10, 5)))
+
+
+def _delete_a_caregiver():
+    db.session.delete(db.session.get(User, 3))
+
+
+def _delete_a_member():
+    db.session.delete(db.session.get(User, 6))
+
+
+@pytest.mark.parametrize(
+    "change",
+    [_accept_appointment_2, _raise_a_rate, _move_a_caregiver, _book_and_apply, _delete_a_caregiver, _delete_a_member],
+)
+def test_committed_writes_refresh_the_summaries(app, change):
+    with app.app_context():
+        change()
+        db.session.commit()
+        _assert_incremental_matches_rebuild()
+
+
+def test_member_spend_report(client):
+    rows = client.get("/reports/member-spend").get_json()
+    assert rows == [
+        {"member_user_id": 6, "appointments": 1, "hours": 5, "spend": "60.00"},
+        {"member_user_id": 1, "appointments": 1, "hours": 3, "spend": "22.50"},
+    ]
+    assert client.get("/reports/member-spend?member_user_id=1").get_json()[0]["spend"] == "22.50"
+
+
+def test_job_applications_and_utilisation_reports(client):
+    jobs = client.get("/reports/job-applications?limit=3").get_json()
+    assert [(row["job_id"], row["applications"]) for row in jobs] == [(1, 2), (2, 2), (3, 2)]
+    groups = client.get("/reports/caregiver-utilisation?caregiving_type=elderly").get_json()
+    shymkent = next(row for row in groups if row["city"] == "Shymkent")
+    assert (shymkent["caregivers"], shymkent["appointments"], shymkent["hours"]) == (1, 1, 5)
+    assert shymkent["hours_per_caregiver"] == 5.0
+
+
+@pytest.mark.parametrize("limit", ["0", "-1", "100000"])
+def test_limit_is_bounded(client, limit):
+    assert client.get(f"/reports/member-spend?limit={limit}").status_code == 400
+
+
+def test_only_one_worker_claims_the_periodic_rebuild(app):
+    with app.app_context():
+        assert claim_rebuild(3600)
+        assert not claim_rebuild(3600)
+        assert claim_rebuild(0)
+
+
+def test_first_report_waits_for_a_rebuild(app, client):
+    with app.app_context():
+        # As after a schema upgrade: base rows exist, summaries don't yet.
+        for table in TABLES:
+            db.session.execute(table.delete())
+        db.session.commit()
+    rows = client.get("/reports/member-spend").get_json()
+    assert [row["member_user_id"] for row in rows] == [6, 1]
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_bulk_loads_force_a_rebuild(app, client):
+    client.get("/reports/member-spend")
+    assert _wait_for(lambda: not reports._rebuilding and reports._rebuilt_at is not None)
+    with app.app_context():
+        # A Core write the session hooks can't see, as bulk import does.
+        db.session.execute(Appointment.__table__.update().where(Appointment.appointment_id == 2).values(status="accepted"))
+        db.session.commit()
+    publish([WriteEvent(Appointment, "bulk", ())])
+    client.get("/reports/member-spend")
+    assert _wait_for(lambda: client.get("/reports/member-spend?member_user_id=1").get_json()[0]["hours"] == 7)
@@ -0,0 +1,94 @@
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+from sqlalchemy import inspect
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.schema import CreateTable
+
+from part3_app import schema
+from part3_app.models import db
+
+ROOT = Path(__file__).resolve().parent.parent
+LEGACY_TABLES = ["user", "caregiver", "member", "address", "job", "job_application", "appointment"]
+
+
+def _legacy_database(path):
+    """The original schema: no ON DELETE CASCADE, no AUTOINCREMENT, no extra tables."""
+    with sqlite3.connect(path) as connection:
+        for name in LEGACY_TABLES:
+            ddl = str(CreateTable(db.metadata.tables[name]).compile(dialect=sqlite.dialect()))
+            connection.execute(ddl.replace(" ON DELETE CASCADE", "").replace(" AUTOINCREMENT", ""))
+        connection.executescript(
+            """
+            INSERT INTO user (user_id, email, given_name, surname, password) VALUES
+                (1, 'member@mail.com', 'Mem', 'Ber', 'x'), (2, 'carer@mail.com', 'Care', 'Giver', 'x');
+            INSERT INTO member (member_user_id) VALUES (1);
+            INSERT INTO caregiver (caregiver_user_id, caregiving_type) VALUES (2, 'elderly');
+            INSERT INTO job (job_id, member_user_id, required_caregiving_type) VALUES (1, 1, 'elderly');
+            INSERT INTO job_application (caregiver_user_id, job_id) VALUES (2, 1);
+            INSERT INTO appointment (appointment_id, caregiver_user_id, member_user_id, status) VALUES
+                (1, 2, 1, 'pending'), (7, 2, 1, 'pending');
+            """
+        )
+
+
+def test_new_database_is_created_once(make_app):
+    app = make_app()
+    with app.app_context():
+        assert schema.ensure_schema(db.engine) == []
+        tables = set(inspect(db.engine).get_table_names())
+    assert {"schema_version", "appointment_archive", "fts_document"} <= tables
+
+
+def test_fingerprint_tracks_the_models_and_dialect():
+    sqlite_print = schema.fingerprint("sqlite", "english")
+    assert sqlite_print == schema.fingerprint("sqlite", "english")
+    assert sqlite_print != schema.fingerprint("postgresql", "english")
+    index = db.Index("ix_test_only", db.metadata.tables["user"].c.city)
+    try:
+        assert schema.fingerprint("sqlite", "english") != sqlite_print
+    finally:
+        db.metadata.tables["user"].indexes.discard(index)
+    assert schema.fingerprint("sqlite", "english") == sqlite_print
+
+
+def test_legacy_database_is_upgraded_in_place(make_app, tmp_path):
+    _legacy_database(tmp_path / "test.db")
+    app = make_app()
+    with app.app_context():
+        inspector = inspect(db.engine)
+        for name in LEGACY_TABLES:
+            for foreign_key in inspector.get_foreign_keys(name):
+                assert foreign_key["options"].get("ondelete") == "CASCADE", name
+        with db.engine.connect() as connection:
+            assert schema._missing_autoincrement(connection) == []
+            assert connection.exec_driver_sql(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'appointment'"
+            ).scalar() == 7
+            assert connection.exec_driver_sql("SELECT count(*) FROM job_application").scalar() == 1
+        assert schema.ensure_schema(db.engine) == []
+
+    client = app.test_client()
+    # Search triggers are recreated on the rebuilt tables and the rows backfilled.
+    assert [row["ref"] for row in client.get("/search?q=Giver&kind=user").get_json()] == [2]
+    client.post("/users/delete/1")
+    with sqlite3.connect(tmp_path / "test.db") as connection:
+        assert connection.execute("SELECT count(*) FROM appointment").fetchone() == (0,)
+        assert connection.execute("SELECT count(*) FROM job").fetchone() == (0,)
+
+
+def test_upgrade_command_reports_a_current_schema(app):
+    result = app.test_cli_runner().invoke(args=["upgrade-schema"])
+    assert result.output.strip() == "Schema is up to date."
+
+
+def test_importing_the_app_module_builds_nothing():
+    code = (
+        "import sys, part3_app.app as module;"
+        "assert module._app is None;"
+        "assert 'sqlalchemy.dialects.postgresql' not in sys.modules;"
+        "assert 'numpy' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
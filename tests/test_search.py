@@ -0,0 +1,71 @@
+import time
+
+from sqlalchemy import text
+
+from part3_app.models import db
+from part3_app.seed_data import seed
+
+
+def _ids(response):
+    return [doc["caregiver_user_id"] for doc in response.get_json()["results"]]
+
+
+def test_facet_filter_orders_by_rate_then_id(client):
+    response = client.get("/caregivers/search?caregiving_type=babysitter")
+    body = response.get_json()
+    assert body["total"] == 3
+    assert _ids(response) == [3, 10, 7]
+    # A facet's counts ignore its own filter, so the other types stay visible.
+    assert body["facets"]["caregiving_type"] == {"babysitter": 3, "elderly": 2, "playmate": 2}
+    assert body["facets"]["gender"] == {"Male": 3}
+
+
+def test_rate_range_and_limit(client):
+    assert _ids(client.get("/caregivers/search?min_rate=9&max_rate=12")) == [9, 4, 5]
+    limited = client.get("/caregivers/search?min_rate=9&max_rate=12&limit=1").get_json()
+    assert limited["total"] == 3
+    assert len(limited["results"]) == 1
+
+
+def test_unfiltered_search_reads_the_sorted_rates(client):
+    client.post(
+        "/caregivers/edit/4",
+        data={"caregiver_user_id": "4", "gender": "Male", "caregiving_type": "playmate", "hourly_rate": ""},
+    )
+    body = client.get("/caregivers/search").get_json()
+    assert body["total"] == 7
+    assert _ids(client.get("/caregivers/search")) == [3, 10, 7, 9, 5, 8, 4]
+    assert _ids(client.get("/caregivers/search?limit=2")) == [3, 10]
+
+
+def test_bad_arguments_are_400(client):
+    assert client.get("/caregivers/search?min_rate=cheap").status_code == 400
+    assert client.get("/caregivers/search?limit=all").status_code == 400
+
+
+def test_committed_edits_are_searchable(client):
+    client.get("/caregivers/search")
+    client.post(
+        "/caregivers/edit/3",
+        data={"caregiver_user_id": "3", "gender": "Male", "caregiving_type": "elderly", "hourly_rate": "20"},
+    )
+    body = client.get("/caregivers/search?caregiving_type=elderly").get_json()
+    assert [doc["caregiver_user_id"] for doc in body["results"]] == [5, 8, 3]
+    assert body["results"][-1]["hourly_rate"] == 20.0
+
+
+def test_writes_from_elsewhere_are_reconciled(make_app):
+    app = make_app(SEARCH_RECONCILE_SECONDS=0.0)
+    seed(app)
+    client = app.test_client()
+    assert client.get("/caregivers/search?gender=Female").get_json()["total"] == 2
+    with app.app_context():
+        db.session.execute(text("UPDATE caregiver SET gender = 'Female' WHERE caregiver_user_id = 3"))
+        db.session.commit()
+
+    deadline = time.monotonic() + 5
+    total = None
+    while time.monotonic() < deadline and total != 3:
+        total = client.get("/caregivers/search?gender=Female").get_json()["total"]
+        time.sleep(0.02)
+    assert total == 3